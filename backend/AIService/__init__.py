@@ -8,39 +8,19 @@ import os
 import sys
 import re
 from typing import Optional, Dict, Any, List, Tuple
-import dotenv
-from pathlib import Path
 
-# Load environment variables from .env file in backend directory
-backend_dir = Path(__file__).parent.parent
-dotenv_path = backend_dir / '.env'
-print(f"DEBUG: Looking for .env file at: {dotenv_path}")
-dotenv.load_dotenv(dotenv_path)
+from backend.openai_client import openai_configured, get_openai_client
 
-# Check if OpenAI is available; if not, use simulated responses
+# The OpenAI client is created lazily on the first call that needs it
+OPENAI_AVAILABLE = openai_configured()
+
+# The n-gram matcher needs NumPy/SciPy; without them every pattern is scored one by one
 try:
-    from openai import AsyncOpenAI
-    OPENAI_AVAILABLE = True
-    print("DEBUG: OpenAI module imported successfully")
-    
-    # Initialize OpenAI client
-    openai_api_key = os.environ.get('OPENAI_API_KEY')
-    print(f"DEBUG: OpenAI API key found: {openai_api_key is not None}")
-    if openai_api_key:
-        try:
-            # Create the client as a global variable
-            global openai_client
-            openai_client = AsyncOpenAI(api_key=openai_api_key)
-            print("DEBUG: OpenAI client initialized with API key")
-        except Exception as e:
-            print(f"ERROR: Failed to initialize OpenAI client: {e}")
-            OPENAI_AVAILABLE = False
-    else:
-        print("DEBUG: OpenAI API key not found in environment variables")
-        OPENAI_AVAILABLE = False
+    from .ngram_index import FaqPatternIndex
+    NGRAM_INDEX_AVAILABLE = True
 except ImportError:
-    OPENAI_AVAILABLE = False
-    print("DEBUG: OpenAI module not installed, using simulated responses")
+    NGRAM_INDEX_AVAILABLE = False
+    print("DEBUG: NumPy/SciPy not installed, n-gram FAQ matching disabled")
 
 
 # Load the FAQ data from the JSON file
@@ -62,6 +42,24 @@ def load_faq_data():
 # Global variable to store FAQ data
 FAQ_DATA = load_faq_data()
 
+# Minimum confidence for a non-exact FAQ match, per language
+FAQ_MATCH_THRESHOLDS = {"en": 0.25, "he": 0.2}
+
+# Minimum n-gram TF-IDF cosine similarity for a paraphrase match, per language
+NGRAM_MATCH_THRESHOLDS = {"en": 0.5, "he": 0.5}
+
+# How many of the best n-gram candidates get the full keyword/substring scoring
+NGRAM_CANDIDATE_LIMIT = 25
+
+# Character n-gram lengths used by the TF-IDF index
+NGRAM_RANGE = (2, 4)
+
+# Artificial delay (seconds) before returning a non-exact FAQ answer
+FAQ_RESPONSE_DELAY = 0.2
+
+# Pattern indexes keyed by (id(faqs), language); the faqs list is kept alongside to pin its id
+_faq_indexes: Dict[Tuple[int, str], Tuple[List[Dict[str, Any]], Any]] = {}
+
 
 def process_keywords(text: str, language: str = "en") -> List[str]:
     """
@@ -150,6 +148,103 @@ def calculate_match_score(query: str, pattern: str, language: str = "en") -> Tup
     return 0.0, "no_match"
 
 
+def get_faq_index(faqs: List[Dict[str, Any]], language: str):
+    """Return the (cached) pattern index for a FAQ list and language, or None if unavailable."""
+    if not NGRAM_INDEX_AVAILABLE:
+        return None
+
+    key = (id(faqs), language)
+    cached = _faq_indexes.get(key)
+    if cached is None or cached[0] is not faqs:
+        if len(_faq_indexes) >= 16:
+            _faq_indexes.clear()
+        cached = (faqs, FaqPatternIndex(faqs, language, NGRAM_RANGE))
+        _faq_indexes[key] = cached
+    return cached[1]
+
+
+def match_faq(message: str, language: str, faqs: Optional[List[Dict[str, Any]]] = None) -> Tuple[Optional[Dict[str, Any]], float, str]:
+    """
+    Find the FAQ entry that answers a message
+    
+    Exact matches are looked up directly. Otherwise the message is scored
+    against every pattern at once with the n-gram TF-IDF index; the best
+    candidates get the keyword/substring scoring of calculate_match_score,
+    and a close enough n-gram similarity counts as an "ngram" match.
+    
+    Args:
+        message: The user's message
+        language: The language code (en or he)
+        faqs: FAQ entries to search (defaults to FAQ_DATA)
+        
+    Returns:
+        Tuple of (matching FAQ or None if nothing passes the threshold, confidence score, match type)
+    """
+    if faqs is None:
+        faqs = FAQ_DATA
+
+    normalized_message = message.lower().strip()
+    index = get_faq_index(faqs, language)
+    if index is None:
+        return _match_faq_by_scan(normalized_message, language, faqs)
+
+    position = index.exact.get(normalized_message)
+    if position is not None:
+        return faqs[index.owners[position]], 1.0, "exact"
+
+    scores = index.scores(normalized_message)
+    best_match = None
+    highest_confidence = 0
+    match_type = ""
+
+    for position in index.top_candidates(scores, NGRAM_CANDIDATE_LIMIT):
+        confidence, match_method = calculate_match_score(normalized_message, index.patterns[position], language)
+        if confidence > highest_confidence:
+            highest_confidence = confidence
+            best_match = faqs[index.owners[position]]
+            match_type = match_method
+
+    threshold = FAQ_MATCH_THRESHOLDS.get(language, FAQ_MATCH_THRESHOLDS["en"])
+    if highest_confidence <= threshold:
+        best_match = None
+
+    if len(scores):
+        position = int(scores.argmax())
+        ngram_score = float(scores[position])
+        ngram_threshold = NGRAM_MATCH_THRESHOLDS.get(language, NGRAM_MATCH_THRESHOLDS["en"])
+        if ngram_score >= ngram_threshold and (best_match is None or ngram_score > highest_confidence):
+            return faqs[index.owners[position]], ngram_score, "ngram"
+
+    return best_match, highest_confidence, match_type
+
+
+def _match_faq_by_scan(normalized_message: str, language: str, faqs: List[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], float, str]:
+    """Score every pattern one by one (used when the n-gram index is unavailable)."""
+    best_match = None
+    highest_confidence = 0
+    match_type = ""
+
+    for faq in faqs:
+        patterns = faq.get('patterns', {}).get(language, []) or faq.get('patterns', {}).get('en', [])
+        for pattern in patterns:
+            confidence, match_method = calculate_match_score(normalized_message, pattern, language)
+
+            # Early return on exact match
+            if match_method == "exact":
+                return faq, confidence, match_method
+
+            if confidence > highest_confidence:
+                highest_confidence = confidence
+                best_match = faq
+                match_type = match_method
+
+    # Only accept the best match if it is good enough (lower threshold for Hebrew)
+    threshold = FAQ_MATCH_THRESHOLDS.get(language, FAQ_MATCH_THRESHOLDS["en"])
+    if highest_confidence <= threshold:
+        return None, highest_confidence, match_type
+    return best_match, highest_confidence, match_type
+
+
 async def call_openai_api(message: str, language: str) -> Dict[str, Any]:
     """
     Call the OpenAI API to generate a response
@@ -162,8 +257,9 @@ async def call_openai_api(message: str, language: str) -> Dict[str, Any]:
         Response data
     """
     try:
-        # Check if we have a client available in the module's global scope
-        client_available = OPENAI_AVAILABLE and 'openai_client' in globals()
+        # A client set on the module (e.g. by tests) takes precedence over the shared one
+        client = (globals().get('openai_client') or get_openai_client()) if OPENAI_AVAILABLE else None
+        client_available = client is not None
         print(f"DEBUG: OpenAI client available: {client_available}")
         
         # If OpenAI is available and configured, use it
@@ -178,7 +274,7 @@ async def call_openai_api(message: str, language: str) -> Dict[str, Any]:
                     system_message = "אתה עוזר מועיל לפורטל אקדמי. שמור על תשובות קצרות וממוקדות."
                 
                 # Call the API
-                response = await openai_client.chat.completions.create(
+                response = await client.chat.completions.create(
                     model="gpt-4o-mini",
                     messages=[
                         {"role": "system", "content": system_message},
@@ -203,7 +299,7 @@ async def call_openai_api(message: str, language: str) -> Dict[str, Any]:
             missing_reasons = []
             if not OPENAI_AVAILABLE:
                 missing_reasons.append("OpenAI module not configured properly")
-            if 'openai_client' not in globals():
+            elif not client_available:
                 missing_reasons.append("OpenAI client not initialized")
                 
             print(f"DEBUG: Using fallback response because: {', '.join(missing_reasons)}")
@@ -272,45 +368,15 @@ async def processMessage(message: str, language: Optional[str] = None) -> Dict[s
         print(f"DEBUG: Detected language: {detected_language}")
             
         # Check if message matches any FAQ patterns
-        normalized_message = message.lower().strip()
-        best_match = None
-        highest_confidence = 0
-        match_type = ""
-        
-        print(f"DEBUG: Checking {len(FAQ_DATA)} FAQs")
-        
-        for faq in FAQ_DATA:
-            patterns = faq.get('patterns', {}).get(detected_language, []) or faq.get('patterns', {}).get('en', [])
-            for pattern in patterns:
-                confidence, match_method = calculate_match_score(normalized_message, pattern, detected_language)
-                
-                if confidence > highest_confidence:
-                    highest_confidence = confidence
-                    best_match = faq
-                    match_type = match_method
-                
-                # Early return on exact match
-                if match_method == "exact":
-                    print(f"DEBUG: Exact match found for: {normalized_message}")
-                    response_text = faq.get('response', {}).get(detected_language) or faq.get('response', {}).get('en')
-                    return {
-                        "text": response_text,
-                        "source": "faq",
-                        "confidence": confidence,
-                        "language": detected_language,
-                        "match_type": match_method,
-                        "success": True
-                    }
-                        
-        # Return FAQ response if good match found (lower threshold for Hebrew)
-        threshold = 0.2 if detected_language == "he" else 0.25
+        best_match, highest_confidence, match_type = match_faq(message, detected_language)
         print(f"DEBUG: Best match: {best_match['id'] if best_match else 'None'}, confidence: {highest_confidence}, match_type: {match_type}")
-        
-        if best_match and highest_confidence > threshold:
+
+        if best_match:
             response_text = best_match.get('response', {}).get(detected_language) or best_match.get('response', {}).get('en')
             if response_text:
-                # Simulate processing delay
-                await asyncio.sleep(0.2)
+                if match_type != "exact" and FAQ_RESPONSE_DELAY:
+                    # Simulate processing delay
+                    await asyncio.sleep(FAQ_RESPONSE_DELAY)
                 print(f"DEBUG: Returning FAQ response with confidence {highest_confidence}")
                 return {
                     "text": response_text,
@@ -0,0 +1,270 @@
+"""
+Offline benchmark and accuracy harness for the FAQ matcher.
+
+Generates labeled English and Hebrew query corpora from faq_data.json (and
+scaled-up copies of it padded with distractor FAQs), runs them through the
+matcher and reports throughput, latency percentiles and precision/recall.
+OpenAI is stubbed out, so no network access is needed.
+
+Usage:
+    python -m backend.AIService.benchmark --scales 1 10 50
+    python -m backend.AIService.benchmark --end-to-end --min-recall 0.9
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, List, Iterable
+
+import backend.AIService as ai_service
+
+
+# Phrasings wrapped around FAQ patterns to build positive queries
+QUERY_TEMPLATES = {
+    "en": [
+        "{pattern}",
+        "{pattern_upper}",
+        "how do i {pattern}?",
+        "i need help with {pattern}",
+        "can you tell me about {pattern} please",
+    ],
+    "he": [
+        "{pattern}",
+        "איך {pattern}?",
+        "אני צריך עזרה עם {pattern}",
+        "{pattern} בבקשה",
+    ],
+}
+
+# Off-topic queries that should fall through to OpenAI
+NEGATIVE_QUERIES = {
+    "en": [
+        "what is the weather today",
+        "who won the football game yesterday",
+        "recommend a good movie to watch",
+        "what is the meaning of life?",
+        "tell me a joke about cats",
+        "how tall is mount everest",
+    ],
+    "he": [
+        "מה מזג האוויר היום",
+        "מי ניצח במשחק אתמול",
+        "תמליץ לי על סרט טוב",
+        "ספר לי בדיחה על חתולים",
+        "כמה גבוה הר האוורסט",
+    ],
+}
+
+# Letters used to build distractor pseudo-words for scaled-up FAQ sets
+_DISTRACTOR_ALPHABETS = {
+    "en": ("bdfgkmpqvxz", "aeiou"),
+    "he": ("בגדזטכסצקש", "ויא"),
+}
+
+
+@dataclass
+class LabeledQuery:
+    text: str
+    language: str
+    expected_id: Optional[str]  # None means no FAQ should answer it
+
+
+@dataclass
+class BenchmarkReport:
+    scale: int
+    faqs: int
+    patterns: int
+    queries: int
+    qps: float
+    p50_ms: float
+    p99_ms: float
+    precision: float
+    recall: float
+
+
+@dataclass
+class BenchmarkThresholds:
+    min_precision: float = 0.95
+    min_recall: float = 0.9
+    min_qps: float = 0.0
+    max_p99_ms: Optional[float] = None
+
+
+def build_query_corpus(faqs: List[Dict[str, Any]], languages: Iterable[str] = ("en", "he")) -> List[LabeledQuery]:
+    """Build labeled queries from every FAQ pattern plus off-topic negatives."""
+    corpus = []
+    for language in languages:
+        for faq in faqs:
+            for pattern in faq.get('patterns', {}).get(language, []):
+                for template in QUERY_TEMPLATES[language]:
+                    text = template.format(pattern=pattern, pattern_upper=pattern.upper())
+                    corpus.append(LabeledQuery(text, language, faq['id']))
+        for text in NEGATIVE_QUERIES[language]:
+            corpus.append(LabeledQuery(text, language, None))
+    return corpus
+
+
+def _pseudo_word(rng: random.Random, language: str) -> str:
+    consonants, vowels = _DISTRACTOR_ALPHABETS[language]
+    return "".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(3, 4)))
+
+
+def scale_faq_data(faqs: List[Dict[str, Any]], factor: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Return the FAQs padded with distractor entries to `factor` times the original size.
+
+    Distractors use pseudo-word patterns so they grow the search space
+    without changing which FAQ a labeled query should match.
+    """
+    if factor <= 1:
+        return list(faqs)
+
+    rng = random.Random(seed)
+    scaled = list(faqs)
+    for i in range(len(faqs) * (factor - 1)):
+        patterns = {
+            language: [
+                " ".join(_pseudo_word(rng, language) for _ in range(rng.randint(2, 4)))
+                for _ in range(5)
+            ]
+            for language in ("en", "he")
+        }
+        scaled.append({
+            "id": f"distractor_{i}",
+            "patterns": patterns,
+            "response": {"en": f"Distractor answer {i}", "he": f"תשובה {i}"},
+        })
+    return scaled
+
+
+async def _offline_openai(message: str, language: str) -> Dict[str, Any]:
+    return {
+        "text": "offline",
+        "source": "openai_fallback",
+        "model": "benchmark_stub",
+        "language": language,
+        "success": True,
+    }
+
+
+@contextmanager
+def offline_ai_service(faqs: List[Dict[str, Any]]):
+    """Point the AI service at `faqs`, stub OpenAI and drop the artificial delay."""
+    saved = (ai_service.FAQ_DATA, ai_service.FAQ_RESPONSE_DELAY, ai_service.call_openai_api)
+    ai_service.FAQ_DATA = faqs
+    ai_service.FAQ_RESPONSE_DELAY = 0
+    ai_service.call_openai_api = _offline_openai
+    try:
+        yield
+    finally:
+        ai_service.FAQ_DATA, ai_service.FAQ_RESPONSE_DELAY, ai_service.call_openai_api = saved
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_benchmark(faqs: List[Dict[str, Any]], queries: List[LabeledQuery], scale: int = 1, end_to_end: bool = False) -> BenchmarkReport:
+    """
+    Run every query through the matcher and collect timing and accuracy.
+
+    With end_to_end=True each query goes through processMessage (OpenAI
+    stubbed); otherwise match_faq is timed directly.
+    """
+    answer_ids = {}
+    for faq in faqs:
+        for language, text in faq.get('response', {}).items():
+            answer_ids[(language, text)] = faq['id']
+
+    latencies = []
+    predictions = []
+
+    with offline_ai_service(faqs):
+        loop = asyncio.new_event_loop() if end_to_end else None
+        try:
+            started = time.perf_counter()
+            for query in queries:
+                t0 = time.perf_counter()
+                if end_to_end:
+                    response = loop.run_until_complete(ai_service.processMessage(query.text, query.language))
+                    predicted = answer_ids.get((query.language, response.get("text"))) if response.get("source") == "faq" else None
+                else:
+                    faq, _, _ = ai_service.match_faq(query.text, query.language, faqs)
+                    predicted = faq['id'] if faq else None
+                latencies.append(time.perf_counter() - t0)
+                predictions.append(predicted)
+            elapsed = time.perf_counter() - started
+        finally:
+            if loop is not None:
+                loop.close()
+
+    answered = [(q, p) for q, p in zip(queries, predictions) if p is not None]
+    correct = sum(1 for q, p in answered if p == q.expected_id)
+    labeled = [(q, p) for q, p in zip(queries, predictions) if q.expected_id is not None]
+    recalled = sum(1 for q, p in labeled if p == q.expected_id)
+
+    latencies.sort()
+    return BenchmarkReport(
+        scale=scale,
+        faqs=len(faqs),
+        patterns=sum(len(v) for faq in faqs for v in faq.get('patterns', {}).values()),
+        queries=len(queries),
+        qps=len(queries) / elapsed if elapsed > 0 else float("inf"),
+        p50_ms=statistics.median(latencies) * 1000 if latencies else 0.0,
+        p99_ms=_percentile(latencies, 0.99) * 1000,
+        precision=correct / len(answered) if answered else 1.0,
+        recall=recalled / len(labeled) if labeled else 1.0,
+    )
+
+
+def check_regressions(report: BenchmarkReport, thresholds: BenchmarkThresholds) -> List[str]:
+    """Return a description of every threshold the report violates."""
+    failures = []
+    if report.precision < thresholds.min_precision:
+        failures.append(f"scale {report.scale}: precision {report.precision:.3f} < {thresholds.min_precision:.3f}")
+    if report.recall < thresholds.min_recall:
+        failures.append(f"scale {report.scale}: recall {report.recall:.3f} < {thresholds.min_recall:.3f}")
+    if report.qps < thresholds.min_qps:
+        failures.append(f"scale {report.scale}: {report.qps:.0f} queries/sec < {thresholds.min_qps:.0f}")
+    if thresholds.max_p99_ms is not None and report.p99_ms > thresholds.max_p99_ms:
+        failures.append(f"scale {report.scale}: p99 {report.p99_ms:.2f} ms > {thresholds.max_p99_ms:.2f} ms")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the FAQ matcher offline.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--end-to-end", action="store_true", help="time processMessage instead of match_faq")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-precision", type=float, default=BenchmarkThresholds.min_precision)
+    parser.add_argument("--min-recall", type=float, default=BenchmarkThresholds.min_recall)
+    parser.add_argument("--min-qps", type=float, default=BenchmarkThresholds.min_qps)
+    parser.add_argument("--max-p99-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    thresholds = BenchmarkThresholds(args.min_precision, args.min_recall, args.min_qps, args.max_p99_ms)
+    base_faqs = ai_service.load_faq_data()
+    queries = build_query_corpus(base_faqs)
+
+    failures = []
+    print(f"{'scale':>5} {'faqs':>6} {'patterns':>8} {'queries':>7} {'qps':>9} {'p50 ms':>8} {'p99 ms':>8} {'prec':>6} {'recall':>6}")
+    for scale in args.scales:
+        faqs = scale_faq_data(base_faqs, scale, args.seed)
+        report = run_benchmark(faqs, queries, scale=scale, end_to_end=args.end_to_end)
+        print("{scale:>5} {faqs:>6} {patterns:>8} {queries:>7} {qps:>9.0f} {p50_ms:>8.3f} {p99_ms:>8.3f} {precision:>6.3f} {recall:>6.3f}".format(**asdict(report)))
+        failures.extend(check_regressions(report, thresholds))
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Character n-gram TF-IDF index over FAQ patterns.
+
+All patterns of one language are vectorized into a single sparse matrix, so
+a query is scored against every pattern with one sparse matrix-vector
+product. Requires NumPy and SciPy.
+"""
+import math
+import re
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+
+def char_ngrams(text: str, ngram_range: Tuple[int, int]) -> Counter:
+    """Count the character n-grams of each word, padded with spaces at the edges."""
+    grams = Counter()
+    low, high = ngram_range
+    for word in normalize_text(text).split():
+        padded = f" {word} "
+        for n in range(low, high + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class NgramIndex:
+    """Sublinear TF-IDF vectors of a fixed list of texts, L2-normalized per row."""
+
+    def __init__(self, texts: List[str], ngram_range: Tuple[int, int] = (2, 4)):
+        self.ngram_range = ngram_range
+        self.vocabulary: Dict[str, int] = {}
+
+        rows, cols, values = [], [], []
+        for row, text in enumerate(texts):
+            for gram, count in char_ngrams(text, ngram_range).items():
+                col = self.vocabulary.setdefault(gram, len(self.vocabulary))
+                rows.append(row)
+                cols.append(col)
+                values.append(1.0 + math.log(count))
+
+        n_texts = len(texts)
+        document_frequency = np.bincount(np.asarray(cols, dtype=np.int64), minlength=len(self.vocabulary))
+        self.idf = np.log((1.0 + n_texts) / (1.0 + document_frequency)) + 1.0
+        # Weight given to query n-grams that never occur in any pattern
+        self.unseen_idf = math.log(1.0 + n_texts) + 1.0
+
+        weights = np.asarray(values, dtype=np.float64) * self.idf[np.asarray(cols, dtype=np.int64)]
+        matrix = csr_matrix((weights, (rows, cols)), shape=(n_texts, len(self.vocabulary)))
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        self.matrix = csr_matrix(matrix.multiply(1.0 / norms[:, None]))
+
+    def scores(self, query: str) -> np.ndarray:
+        """Cosine similarity between the query and every indexed text."""
+        cols, weights = [], []
+        unseen_sq = 0.0
+        for gram, count in char_ngrams(query, self.ngram_range).items():
+            tf = 1.0 + math.log(count)
+            col = self.vocabulary.get(gram)
+            if col is None:
+                unseen_sq += (tf * self.unseen_idf) ** 2
+            else:
+                cols.append(col)
+                weights.append(tf * self.idf[col])
+
+        if not cols:
+            return np.zeros(self.matrix.shape[0])
+
+        weights = np.asarray(weights)
+        # Unseen n-grams still count towards the query norm, so partial overlaps score lower
+        norm = math.sqrt(float(weights @ weights) + unseen_sq)
+        query_vector = csr_matrix((weights / norm, (cols, [0] * len(cols))), shape=(self.matrix.shape[1], 1))
+        return (self.matrix @ query_vector).toarray().ravel()
+
+
+class FaqPatternIndex:
+    """Exact-match lookup and n-gram index over the patterns of one language."""
+
+    def __init__(self, faqs: List[Dict[str, Any]], language: str, ngram_range: Tuple[int, int] = (2, 4)):
+        self.patterns: List[str] = []
+        self.owners: List[int] = []  # position in faqs of each pattern's FAQ
+        self.exact: Dict[str, int] = {}
+
+        for faq_position, faq in enumerate(faqs):
+            patterns = faq.get('patterns', {}).get(language, []) or faq.get('patterns', {}).get('en', [])
+            for pattern in patterns:
+                self.exact.setdefault(pattern.lower(), len(self.patterns))
+                self.patterns.append(pattern)
+                self.owners.append(faq_position)
+
+        self.ngrams = NgramIndex(self.patterns, ngram_range) if self.patterns else None
+
+    def scores(self, query: str) -> np.ndarray:
+        if self.ngrams is None:
+            return np.zeros(0)
+        return self.ngrams.scores(query)
+
+    def top_candidates(self, scores: np.ndarray, limit: int) -> List[int]:
+        """Positions of the best-scoring patterns sharing any n-gram with the query, in pattern order."""
+        nonzero = np.flatnonzero(scores > 0)
+        if len(nonzero) > limit:
+            nonzero = nonzero[np.argpartition(scores[nonzero], -limit)[-limit:]]
+        return sorted(nonzero.tolist())
@@ -0,0 +1,219 @@
+"""
+Response compression for large JSON payloads.
+
+Reports, request lists and templates are big, repetitive JSON documents, so
+responses of an allowlisted content type above COMPRESSION_MIN_SIZE bytes are
+compressed with brotli (when the `brotli` package is installed) or gzip,
+whichever the client accepts. File downloads and bodies that already carry a
+Content-Encoding are passed through untouched.
+"""
+import os
+import time
+import zlib
+from typing import Optional
+
+from backend.metrics import (
+    HTTP_RESPONSE_BYTES, HTTP_RESPONSE_COMPRESSION_RATIO, HTTP_RESPONSE_COMPRESSION_SECONDS, route_label
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Smaller bodies fit in a packet or two; compressing them costs more than it saves
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self):
+        # wbits=31 writes the gzip header and trailer
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Content codings the client accepts, ignoring those sent with q=0."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoder(accept_encoding: str) -> Optional[type]:
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return BrotliEncoder
+    if "gzip" in accepted or "*" in accepted:
+        return GzipEncoder
+    return None
+
+
+def is_compressible(headers) -> bool:
+    """Whether a response with these (lower-cased) headers may be compressed."""
+    if b"content-encoding" in headers or b"content-disposition" in headers:
+        return False
+    content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing eligible responses.
+
+    The body is buffered until COMPRESSION_MIN_SIZE bytes have arrived, so
+    small responses go out unchanged and streamed ones are compressed chunk
+    by chunk once they pass the threshold.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name.lower() == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoder_class = choose_encoder(accept_encoding)
+        if encoder_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+        encoder = None
+        buffer = bytearray()
+        original_size = compressed_size = 0
+        cpu_seconds = 0.0
+
+        def compress(data: bytes, last: bool) -> bytes:
+            nonlocal original_size, compressed_size, cpu_seconds
+            started = time.thread_time()
+            out = encoder.compress(data)
+            if last:
+                out += encoder.finish()
+            cpu_seconds += time.thread_time() - started
+            original_size += len(data)
+            compressed_size += len(out)
+            return out
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough, encoder, buffer
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                if is_compressible(headers):
+                    # Held back until we know whether the body is large enough
+                    start_message = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                buffer += body
+                if len(buffer) < self.minimum_size:
+                    if more_body:
+                        return
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": bytes(buffer)})
+                    return
+                encoder = encoder_class()
+                body, buffer = bytes(buffer), bytearray()
+                headers = compressed_headers(start_message, encoder.name)
+                if not more_body:
+                    # The whole body is here, so the compressed length is known up front
+                    body = compress(body, True)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start_message, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start_message, "headers": headers})
+
+            await send({"type": "http.response.body", "body": compress(body, not more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+        if encoder is not None and original_size:
+            route = route_label(scope)
+            HTTP_RESPONSE_COMPRESSION_RATIO.observe(compressed_size / original_size, route=route, encoding=encoder.name)
+            HTTP_RESPONSE_COMPRESSION_SECONDS.observe(cpu_seconds, route=route, encoding=encoder.name)
+            HTTP_RESPONSE_BYTES.inc(original_size, route=route, encoding=encoder.name, stage="original")
+            HTTP_RESPONSE_BYTES.inc(compressed_size, route=route, encoding=encoder.name, stage="compressed")
+
+
+def compressed_headers(start_message, encoding: str) -> list:
+    headers = []
+    vary = None
+    for name, value in start_message.get("headers", []):
+        lower = name.lower()
+        if lower == b"content-length":
+            continue
+        if lower == b"vary":
+            vary = value
+            continue
+        if lower == b"etag" and not value.startswith(b"W/"):
+            # The compressed bytes differ from the identity representation
+            value = b"W/" + value
+        headers.append((name, value))
+    headers.append((b"content-encoding", encoding.encode()))
+    if not vary:
+        vary = b"Accept-Encoding"
+    elif b"accept-encoding" not in vary.lower():
+        vary += b", Accept-Encoding"
+    headers.append((b"vary", vary))
+    return headers
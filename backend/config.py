@@ -1,3 +1,5 @@
+import os
+
 DB_CONFIG = {
     "host": "student-db.cho8cqo8ezzg.eu-north-1.rds.amazonaws.com",
     "user": "admin",
@@ -9,3 +11,6 @@ DATABASE_URL = (
     f"mysql+aiomysql://{DB_CONFIG['user']}:{DB_CONFIG['password']}"
     f"@{DB_CONFIG['host']}:3306/{DB_CONFIG['database']}"
 )
+
+# Optional read replica. When unset, reads go to the primary database.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
@@ -1,13 +1,26 @@
 import asyncio
+import base64
+import gzip
+import hashlib
+import json
 import os
-from sqlalchemy import Column, Integer, String, JSON, Date, ForeignKey, create_engine, Table, Float, Text, DateTime, Boolean
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from sqlalchemy import delete, event, func, insert, inspect, union_all, update, Index, Column, Integer, String, JSON, Date, ForeignKey, create_engine, Table, Float, Text, DateTime, Boolean
 from sqlalchemy.orm import relationship, declarative_base, sessionmaker, Session, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from backend.config import DATABASE_URL
-from datetime import datetime
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from backend.config import DATABASE_URL, READ_DATABASE_URL
+from fastapi import Depends
+from starlette.requests import Request
+from backend.metrics import instrument_engine, instrument_pool, pool_status
+from backend.template_validation import template_validators
+from datetime import date, datetime, timedelta
 from sqlalchemy.sql import text
 from sqlalchemy.future import select
-from sqlalchemy.sql import and_, or_
+from sqlalchemy.sql import and_, or_, null
 
 # Define the base class
 Base = declarative_base()
@@ -23,6 +36,12 @@ class Users(Base):
     role = Column(String(50), nullable=False)
     notifications = relationship("Notifications", back_populates="user")
 
+    __table_args__ = (
+        Index('ix_users_role_last_name_email', 'role', 'last_name', 'email'),
+        Index('ix_users_last_name_email', 'last_name', 'email'),
+        Index('ix_users_first_name', 'first_name'),
+    )
+
 
 # Student table
 class Students(Base):
@@ -59,6 +78,10 @@ class ProfessorUnavailability(Base):
 
     professor = relationship("Professors", back_populates="unavailability_periods")
 
+    __table_args__ = (
+        Index('ix_professor_unavailability_professor_email_start_date', 'professor_email', 'start_date'),
+    )
+
 # Requests table
 class Requests(Base):
     __tablename__ = 'requests'
@@ -78,6 +101,37 @@ class Requests(Base):
     responses = relationship("Responses", back_populates="request")
     notifications = relationship("Notifications", back_populates="request")
 
+    # Student lists, professor queues by course, the deadline sweep and the transfer queue pages
+    __table_args__ = (
+        Index('ix_requests_student_email_created_date', 'student_email', 'created_date'),
+        Index('ix_requests_course_id_status', 'course_id', 'status'),
+        Index('ix_requests_status_title_created_date', 'status', 'title', 'created_date'),
+        Index('ix_requests_status_created_date_id', 'status', 'created_date', 'id'),
+    )
+
+# Request history: one row per event, appended instead of rewriting Requests.timeline.
+# Requests.timeline is kept as read-only history for requests that predate this table.
+REQUEST_EVENT_TYPES = ("created", "status_change", "response", "edit", "transfer")
+
+class RequestEvents(Base):
+    __tablename__ = 'request_events'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    request_id = Column(Integer, ForeignKey('requests.id'), nullable=False)
+    event_type = Column(String(30), nullable=False)  # one of REQUEST_EVENT_TYPES
+    actor_email = Column(String(100), nullable=True)
+    from_status = Column(String(100), nullable=True)
+    to_status = Column(String(100), nullable=True)
+    payload = Column(JSON, nullable=True)  # type-specific fields, e.g. response text or transfer reason
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    request = relationship("Requests")
+
+    # Per-request timelines, and event-type scans such as time-to-first-response
+    __table_args__ = (
+        Index('ix_request_events_request_id_created_at', 'request_id', 'created_at'),
+        Index('ix_request_events_event_type_created_at', 'event_type', 'created_at'),
+    )
+
 # Notifications table
 class Notifications(Base):
     __tablename__ = 'notifications'
@@ -93,6 +147,27 @@ class Notifications(Base):
     user = relationship("Users", back_populates="notifications")
     request = relationship("Requests", back_populates="notifications")
 
+    __table_args__ = (
+        Index('ix_notifications_user_email_is_read', 'user_email', 'is_read'),
+        Index('ix_notifications_user_email_created_date', 'user_email', 'created_date'),
+    )
+
+# Read notifications past the retention period, moved out of the hot table.
+# No foreign keys, so archived rows never block deleting users or requests.
+class NotificationArchive(Base):
+    __tablename__ = 'notification_archive'
+    id = Column(Integer, primary_key=True, autoincrement=False)  # id the row had in notifications
+    user_email = Column(String(100), nullable=False)
+    request_id = Column(Integer, nullable=True)
+    message = Column(String(500), nullable=False)
+    type = Column(String(50), nullable=False)
+    created_date = Column(DateTime, nullable=True)
+    archived_date = Column(DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        Index('ix_notification_archive_user_email_created_date', 'user_email', 'created_date'),
+    )
+
 # System Announcements table for admin messages and AI-generated news
 class SystemAnnouncements(Base):
     __tablename__ = 'system_announcements'
@@ -108,6 +183,29 @@ class SystemAnnouncements(Base):
     # Relationship
     admin = relationship("Users", foreign_keys=[admin_email])
 
+    __table_args__ = (
+        Index('ix_system_announcements_is_active_expires_date', 'is_active', 'expires_date'),
+    )
+
+# Scheduled job leases - one row per background job, so only one worker runs it at a time
+class ScheduledJobLeases(Base):
+    __tablename__ = 'scheduled_job_leases'
+    job_name = Column(String(100), primary_key=True)
+    owner = Column(String(200), nullable=True)  # worker currently holding the lease
+    locked_until = Column(DateTime, nullable=True)  # lease expiry, in case the owner dies
+    next_run_at = Column(DateTime, nullable=False)
+
+# Scheduled job run history
+class ScheduledJobRuns(Base):
+    __tablename__ = 'scheduled_job_runs'
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    job_name = Column(String(100), nullable=False, index=True)
+    owner = Column(String(200), nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    status = Column(String(20), nullable=False)  # 'running', 'success', 'failed', 'cancelled'
+    detail = Column(Text, nullable=True)
+
 # Request Routing Rules table
 class RequestRoutingRules(Base):
     __tablename__ = "request_routing_rules"
@@ -150,6 +248,7 @@ class RequestTemplateFields(Base):
 
     # Unique constraint to prevent duplicate field names within the same template
     __table_args__ = (
+        Index('ix_request_template_fields_template_id_field_order', 'template_id', 'field_order'),
         {"extend_existing": True}
     )
 
@@ -179,6 +278,11 @@ class StudentCourses(Base):
     course = relationship("Courses", back_populates="student_courses")
     professor = relationship("Professors", back_populates="student_courses")
 
+    # The primary key covers lookups by student; this one covers lookups by course
+    __table_args__ = (
+        Index('ix_student_courses_course_id_professor_email', 'course_id', 'professor_email'),
+    )
+
 class Grades(Base):
     __tablename__ = 'grades'
     student_email = Column(String(100), ForeignKey('students.email'), primary_key=True)
@@ -233,6 +337,10 @@ class Responses(Base):
 
     request = relationship('Requests', back_populates='responses')
 
+    __table_args__ = (
+        Index('ix_responses_request_id_created_date', 'request_id', 'created_date'),
+    )
+
 # Secretary table
 class Secretaries(Base):
     __tablename__ = 'secretaries'
@@ -339,10 +447,150 @@ async def add_request(session: AsyncSession, title: str, student_email: str, det
         course_component = course_component
     )
     session.add(new_request)
+    record_request_event(session, new_request, "created", actor_email=student_email, to_status=status)
     await session.commit()
     await session.refresh(new_request)
     return new_request
 
+def record_request_event(session: AsyncSession, request, event_type: str, actor_email: str = None,
+                         from_status: str = None, to_status: str = None, **payload):
+    """
+    Append an event to a request's history.
+
+    The event is only added to the session, so it is written as a single
+    INSERT with the caller's next commit. `payload` holds the type-specific
+    fields (response text, edited details, transfer reason, ...).
+    """
+    if event_type not in REQUEST_EVENT_TYPES:
+        raise ValueError(f"Unknown request event type: {event_type}")
+    request_event = RequestEvents(
+        event_type=event_type,
+        actor_email=actor_email,
+        from_status=from_status,
+        to_status=to_status,
+        payload=payload or None,
+        created_at=datetime.now()
+    )
+    if request.id is None:
+        # Not flushed yet; the id is filled in when both rows are inserted
+        request_event.request = request
+    else:
+        request_event.request_id = request.id
+    session.add(request_event)
+    return request_event
+
+def build_timeline(legacy, events, created_date=None) -> dict:
+    """Rebuild the timeline document the API has always returned from the legacy column and the events."""
+    if isinstance(legacy, str):
+        try:
+            legacy = json.loads(legacy)
+        except json.JSONDecodeError:
+            legacy = None
+    if isinstance(legacy, list):
+        # add_professor_response used to store a bare list of status entries
+        legacy = {"status_changes": legacy}
+    timeline = dict(legacy or {})
+    timeline["created"] = timeline.get("created") or (created_date.isoformat() if created_date else None)
+    for key in ("status_changes", "responses", "edits"):
+        timeline[key] = list(timeline.get(key) or [])
+
+    for request_event in events:
+        timestamp = request_event.created_at.isoformat()
+        payload = request_event.payload or {}
+        if request_event.event_type == "created":
+            timeline["created"] = timestamp
+            timeline["status_changes"].append({"status": request_event.to_status, "date": timestamp})
+        elif request_event.event_type == "status_change":
+            timeline["status_changes"].append({
+                "status": request_event.to_status, "from": request_event.from_status,
+                "to": request_event.to_status,
+                "date": timestamp, "timestamp": timestamp, **payload
+            })
+        elif request_event.event_type == "transfer":
+            timeline["status_changes"].append({"status": "transferred", "date": timestamp, **payload})
+        elif request_event.event_type == "response":
+            timeline["responses"].append({
+                "professor_email": request_event.actor_email, "timestamp": timestamp, **payload
+            })
+        elif request_event.event_type == "edit":
+            timeline["edits"].append({"date": timestamp, **payload})
+    return timeline
+
+async def load_request_timelines(session: AsyncSession, requests) -> dict:
+    """Timelines of several requests keyed by request id, loaded with one query."""
+    request_ids = [req.id for req in requests]
+    if not request_ids:
+        return {}
+    result = await session.execute(
+        select(RequestEvents)
+        .where(RequestEvents.request_id.in_(request_ids))
+        .order_by(RequestEvents.request_id, RequestEvents.created_at, RequestEvents.id)
+    )
+    events = {}
+    for request_event in result.scalars().all():
+        events.setdefault(request_event.request_id, []).append(request_event)
+    return {
+        req.id: build_timeline(req.timeline, events.get(req.id, []), req.created_date)
+        for req in requests
+    }
+
+class NotificationBroker:
+    """
+    Process-local fan-out of committed notifications to live subscribers.
+
+    Each subscriber (e.g. an open push connection) gets its own queue for one
+    user. Slow subscribers whose queue is full miss notifications rather than
+    holding up the writer; they can always re-read them from the database.
+    """
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers = {}
+
+    def subscribe(self, user_email: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.setdefault(user_email, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_email: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(user_email)
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_email]
+
+    def publish(self, notifications: list):
+        for notification in notifications:
+            for queue in self._subscribers.get(notification["user_email"], ()):
+                try:
+                    queue.put_nowait(notification)
+                except asyncio.QueueFull:
+                    pass
+
+
+notification_broker = NotificationBroker()
+
+# Rows per INSERT statement; keeps each statement well under driver parameter limits
+NOTIFICATION_INSERT_BATCH = 500
+
+
+def _queue_for_publish(session, notifications: list):
+    """Publish the notifications once the session's transaction commits."""
+    session.info.setdefault("pending_notifications", []).extend(notifications)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_notifications(session):
+    pending = session.info.pop("pending_notifications", None)
+    if pending:
+        notification_broker.publish(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_rolled_back_notifications(session, previous_transaction):
+    session.info.pop("pending_notifications", None)
+
+
 async def create_notification(session: AsyncSession, user_email: str, request_id: int, message: str, type: str):
     """Create a new notification for a user."""
     notification = Notifications(
@@ -352,10 +600,43 @@ async def create_notification(session: AsyncSession, user_email: str, request_id
         type=type
     )
     session.add(notification)
+    _queue_for_publish(session, [{
+        "user_email": user_email,
+        "request_id": request_id,
+        "message": message,
+        "type": type,
+        "is_read": False,
+        "created_date": datetime.now()
+    }])
     await session.commit()
     await session.refresh(notification)
     return notification
 
+async def create_notifications_bulk(session: AsyncSession, notifications: list) -> int:
+    """
+    Insert many notifications with multi-row INSERT statements in the caller's transaction.
+
+    Each item is a dict with user_email, request_id, message and type. Nothing
+    is committed here; subscribers are notified once the caller commits.
+    Returns the number of notifications inserted.
+    """
+    now = datetime.now()
+    rows = [
+        {
+            "user_email": item["user_email"],
+            "request_id": item["request_id"],
+            "message": item["message"],
+            "type": item["type"],
+            "is_read": False,
+            "created_date": now
+        }
+        for item in notifications
+    ]
+    for start in range(0, len(rows), NOTIFICATION_INSERT_BATCH):
+        await session.execute(insert(Notifications).values(rows[start:start + NOTIFICATION_INSERT_BATCH]))
+    _queue_for_publish(session, rows)
+    return len(rows)
+
 async def get_user_notifications(session: AsyncSession, user_email: str, limit: int = 50):
     """Get notifications for a specific user."""
     try:
@@ -381,6 +662,85 @@ async def get_user_notifications(session: AsyncSession, user_email: str, limit:
         print(f"Traceback: {traceback.format_exc()}")
         raise
 
+# Read notifications older than this are archived by the notification_retention job
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "180"))
+# "table" copies them into notification_archive, "ndjson" appends them to gzipped NDJSON files
+NOTIFICATION_ARCHIVE_MODE = os.getenv("NOTIFICATION_ARCHIVE_MODE", "table")
+NOTIFICATION_ARCHIVE_DIR = Path(os.getenv("NOTIFICATION_ARCHIVE_DIR", "Documents/notification_archive"))
+# Rows moved per transaction, so the job never holds long locks on the hot table
+NOTIFICATION_ARCHIVE_BATCH = int(os.getenv("NOTIFICATION_ARCHIVE_BATCH", "1000"))
+
+
+def _write_ndjson(path: Path, rows: list):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as batch:
+        for row in rows:
+            batch.write(json.dumps(row, default=str, ensure_ascii=False) + "\n")
+
+
+def _publish_ndjson(batch_path: Path, path: Path):
+    # Each batch is a complete gzip member, and gzip readers concatenate members
+    with open(path, "ab") as archive:
+        archive.write(batch_path.read_bytes())
+    batch_path.unlink()
+
+
+async def archive_old_notifications(session: AsyncSession, retention_days: int = None, mode: str = None,
+                                    batch_size: int = None, archive_dir: Path = None) -> int:
+    """
+    Move read notifications older than the retention period out of the notifications table.
+
+    Rows are archived and deleted in batches of `batch_size`, one commit per
+    batch. Unread notifications are kept however old they are. Returns how
+    many notifications were archived.
+    """
+    retention_days = NOTIFICATION_RETENTION_DAYS if retention_days is None else retention_days
+    mode = mode or NOTIFICATION_ARCHIVE_MODE
+    batch_size = batch_size or NOTIFICATION_ARCHIVE_BATCH
+    archive_dir = Path(archive_dir or NOTIFICATION_ARCHIVE_DIR)
+    if mode not in ("table", "ndjson"):
+        raise ValueError(f"Unknown notification archive mode: {mode}")
+
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    columns = (Notifications.id, Notifications.user_email, Notifications.request_id,
+               Notifications.message, Notifications.type, Notifications.created_date)
+    archived = 0
+    while True:
+        result = await session.execute(
+            select(*columns)
+            .where(and_(Notifications.is_read == True, Notifications.created_date < cutoff))
+            .order_by(Notifications.id)
+            .limit(batch_size)
+        )
+        rows = [dict(row._mapping) for row in result]
+        if not rows:
+            break
+
+        batch_path = None
+        if mode == "table":
+            now = datetime.now()
+            await session.execute(insert(NotificationArchive).values([{**row, "archived_date": now} for row in rows]))
+        else:
+            # Staged beside the archive and only appended to it once the delete has committed,
+            # so a failed commit never leaves archived copies of rows that are still in the table
+            path = archive_dir / f"notifications-{datetime.now():%Y-%m-%d}.ndjson.gz"
+            batch_path = path.with_name(f"{path.name}.{rows[0]['id']}.part")
+            await asyncio.to_thread(_write_ndjson, batch_path, rows)
+        try:
+            await session.execute(delete(Notifications).where(Notifications.id.in_([row["id"] for row in rows])))
+            await session.commit()
+        except Exception:
+            if batch_path:
+                batch_path.unlink(missing_ok=True)
+            raise
+        if batch_path:
+            await asyncio.to_thread(_publish_ndjson, batch_path, path)
+        archived += len(rows)
+
+    if archived:
+        print(f"🗄️ Archived {archived} notifications older than {retention_days} days ({mode})")
+    return archived
+
 async def mark_notification_as_read(session: AsyncSession, notification_id: int):
     """Mark a notification as read."""
     result = await session.execute(
@@ -394,20 +754,33 @@ async def mark_notification_as_read(session: AsyncSession, notification_id: int)
     return False
 
 async def mark_all_notifications_as_read(session: AsyncSession, user_email: str):
-    """Mark all notifications for a user as read."""
+    """Mark all notifications for a user as read with a single UPDATE. Returns how many changed."""
     result = await session.execute(
-        select(Notifications).where(
+        update(Notifications)
+        .where(
             and_(
                 Notifications.user_email == user_email,
                 Notifications.is_read == False
             )
         )
+        .values(is_read=True)
     )
-    notifications = result.scalars().all()
-    for notification in notifications:
-        notification.is_read = True
     await session.commit()
-    return len(notifications)
+    return result.rowcount
+
+async def count_unread_notifications(session: AsyncSession, user_email: str) -> int:
+    """Number of unread notifications for a user, counted on the (user_email, is_read) index."""
+    result = await session.execute(
+        select(func.count())
+        .select_from(Notifications)
+        .where(
+            and_(
+                Notifications.user_email == user_email,
+                Notifications.is_read == False
+            )
+        )
+    )
+    return result.scalar() or 0
 
 async def create_system_announcement(session: AsyncSession, title: str, message: str, admin_email: str = None, announcement_type: str = 'admin', expires_date: datetime = None):
     """Create a new system announcement."""
@@ -421,8 +794,31 @@ async def create_system_announcement(session: AsyncSession, title: str, message:
     session.add(announcement)
     await session.commit()
     await session.refresh(announcement)
+    active_announcements_cache.invalidate()
     return announcement
 
+async def create_system_announcements_bulk(session: AsyncSession, announcements: list):
+    """Create many system announcements in a single transaction.
+
+    Each item is a dict with the keyword arguments of create_system_announcement.
+    """
+    created = [
+        SystemAnnouncements(
+            title=item['title'],
+            message=item['message'],
+            admin_email=item.get('admin_email'),
+            announcement_type=item.get('announcement_type', 'admin'),
+            expires_date=item.get('expires_date')
+        )
+        for item in announcements
+    ]
+    for announcement in created:
+        session.add(announcement)
+    await session.flush()  # Assign ids before the session is committed
+    await session.commit()
+    active_announcements_cache.invalidate()
+    return created
+
 async def get_active_system_announcements(session: AsyncSession):
     """Get all active system announcements that haven't expired."""
     result = await session.execute(
@@ -449,6 +845,7 @@ async def deactivate_system_announcement(session: AsyncSession, announcement_id:
     if announcement:
         announcement.is_active = False
         await session.commit()
+        active_announcements_cache.invalidate()
         return True
     return False
 
@@ -461,6 +858,93 @@ async def get_system_announcements_for_admin(session: AsyncSession, admin_email:
     result = await session.execute(query)
     return result.scalars().all()
 
+def announcement_to_dict(announcement: SystemAnnouncements) -> dict:
+    """Public JSON shape of an announcement."""
+    return {
+        "id": announcement.id,
+        "title": announcement.title,
+        "message": announcement.message,
+        "admin_email": announcement.admin_email,
+        "announcement_type": announcement.announcement_type,
+        "created_date": announcement.created_date.isoformat(),
+        "expires_date": announcement.expires_date.isoformat() if announcement.expires_date else None
+    }
+
+
+# Upper bound on how long a worker serves announcements without re-reading them,
+# so writes made through another worker still show up
+ANNOUNCEMENT_CACHE_TTL = float(os.getenv("ANNOUNCEMENT_CACHE_TTL", "60"))
+
+
+class VersionedCache(ABC):
+    """
+    Process-local value that is reloaded from the database when it goes stale.
+
+    Subclasses implement _load, which returns the value and when it stops being
+    valid. invalidate() drops the value and bumps the version, so a load already
+    running at that moment is served to its caller but not kept.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._value = None
+        self._valid_until = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._version += 1
+        self._value = None
+
+    def _is_fresh(self) -> bool:
+        return self._value is not None and datetime.now() < self._valid_until
+
+    @abstractmethod
+    async def _load(self, session: AsyncSession, now: datetime):
+        """Return (value, valid_until) read through the session."""
+
+    async def get(self, session: AsyncSession):
+        """Return the cached value, querying the database only when it is stale."""
+        if self._is_fresh():
+            return self._value
+        async with self._lock:  # One load refills the cache for all waiting requests
+            if self._is_fresh():
+                return self._value
+            version = self._version
+            value, valid_until = await self._load(session, datetime.now())
+            if version != self._version:
+                # Invalidated while loading; serve the result but don't keep it
+                return value
+            self._value, self._valid_until = value, valid_until
+            return value
+
+
+class ActiveAnnouncementsCache(VersionedCache):
+    """
+    Process-local copy of the active announcements, as (announcements, etag).
+
+    Writes through this module invalidate it. Otherwise it is re-read when the
+    earliest cached announcement expires or after ANNOUNCEMENT_CACHE_TTL.
+    """
+
+    def __init__(self, ttl_seconds: float = None):
+        super().__init__(ANNOUNCEMENT_CACHE_TTL if ttl_seconds is None else ttl_seconds)
+
+    async def _load(self, session: AsyncSession, now: datetime):
+        announcements = await get_active_system_announcements(session)
+        payload = [announcement_to_dict(ann) for ann in announcements]
+        valid_until = now + timedelta(seconds=self.ttl_seconds)
+        for ann in announcements:
+            if ann.expires_date:
+                expires = ann.expires_date.replace(tzinfo=None)
+                valid_until = min(valid_until, expires)
+        etag = '"' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest() + '"'
+        return (payload, etag), valid_until
+
+
+active_announcements_cache = ActiveAnnouncementsCache()
+
+
 async def add_course(session: AsyncSession, id: str, name: str, description: str, credits: float, professor_email: str, department_id: str = None):
     new_course = Courses(
         id=id,
@@ -505,25 +989,231 @@ async def add_professor_response(session: AsyncSession, request_id: int, profess
         created_date=datetime.now().date()
     )
     session.add(new_response)
+    record_request_event(session, request, "response", actor_email=professor_email,
+                         response_text=response_text, files=files)
     await session.commit()
     await session.refresh(new_response)
 
-    new_timeline_entry = {
-        "date": datetime.now().isoformat(),
-        "status": "response added",
-        "professor_response": response_text
-    }
+    return new_response
 
-    if request.timeline:
-        request.timeline.append(new_timeline_entry)
-    else:
-        request.timeline = [new_timeline_entry]
 
+
+# Handler named in transfer messages when a request goes back to the department
+DEPARTMENT_SECRETARY = "Department Secretary"
+
+
+async def transfer_requests(session: AsyncSession, request_ids: list, new_course_id: str = None,
+                            reason: str = "No reason provided", actor_email: str = None,
+                            secretary_email: str = None) -> list:
+    """
+    Re-route requests to the professor of new_course_id, or to the student's
+    department secretary when no course is given or the student has no
+    professor for it.
+
+    One query loads the requests together with both candidate handlers. The
+    course change, the transfer events and every notification are committed
+    together. Returns the transferred requests; unknown ids are skipped, and
+    so are requests outside secretary_email's department when it is given.
+    """
+    if new_course_id:
+        professor = (
+            select(func.min(StudentCourses.professor_email))
+            .where(StudentCourses.student_email == Requests.student_email,
+                   StudentCourses.course_id == new_course_id)
+            .scalar_subquery()
+        )
+    else:
+        professor = null()
+    secretary = (
+        select(func.min(Secretaries.email))
+        .where(Secretaries.department_id == Students.department_id)
+        .scalar_subquery()
+    )
+    query = (
+        select(Requests, professor, secretary)
+        .outerjoin(Students, Students.email == Requests.student_email)
+        .where(Requests.id.in_(set(request_ids)))
+        .order_by(Requests.id)
+    )
+    if secretary_email:
+        query = query.where(Students.department_id.in_(
+            select(Secretaries.department_id).where(Secretaries.email == secretary_email)
+        ))
+    rows = (await session.execute(query)).all()
+
+    notifications = []
+    for request, professor_email, department_secretary in rows:
+        request.course_id = new_course_id
+        record_request_event(session, request, "transfer", actor_email=actor_email,
+                             new_course_id=new_course_id if new_course_id else DEPARTMENT_SECRETARY,
+                             reason=reason)
+        notifications.append({
+            "user_email": request.student_email,
+            "request_id": request.id,
+            "message": f"Your request '{request.title}' has been transferred to {professor_email or DEPARTMENT_SECRETARY}. Reason: {reason}",
+            "type": "transfer"
+        })
+        if professor_email:
+            notifications.append({
+                "user_email": professor_email,
+                "request_id": request.id,
+                "message": f"A new request '{request.title}' has been assigned to you from {request.student_email}. Reason for transfer: {reason}",
+                "type": "transfer"
+            })
+        elif department_secretary:
+            notifications.append({
+                "user_email": department_secretary,
+                "request_id": request.id,
+                "message": f"A new request '{request.title}' has been transferred to you from {request.student_email}. Reason for transfer: {reason}",
+                "type": "transfer"
+            })
+
+    await create_notifications_bulk(session, notifications)
     await session.commit()
-    await session.refresh(request)
+    return [request for request, _, _ in rows]
+
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor: the sort key and id of the last row on a page."""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode().rstrip("=")
 
-    return new_response
 
+def decode_cursor(cursor: str) -> list:
+    """Values from encode_cursor; raises ValueError for anything else."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_after(column, id_column, value, last_id, descending: bool):
+    """Rows that come after (value, last_id) when ordering by column, then id."""
+    if descending:
+        return or_(column < value, and_(column == value, id_column < last_id))
+    return or_(column > value, and_(column == value, id_column > last_id))
+
+
+# Sortable columns of the transfer queue, with how to read their cursor value back
+TRANSFER_QUEUE_SORTS = {
+    "created_date": (Requests.created_date, date.fromisoformat),
+    "title": (Requests.title, str),
+    "id": (Requests.id, int)
+}
+
+
+async def get_transfer_queue(session: AsyncSession, secretary_email: str = None, status: str = "pending",
+                             title: str = None, sort: str = "created_date", descending: bool = True,
+                             limit: int = 50, cursor: str = None):
+    """
+    One page of the transfer queue: all requests, or only those of the given
+    secretary's department.
+
+    Each row is (request, first_name, last_name, department_id), read in a single
+    query joining Requests, Students and Users. Returns (rows, next_cursor), where
+    next_cursor is None on the last page. Raises ValueError for a bad sort or cursor.
+    """
+    if sort not in TRANSFER_QUEUE_SORTS:
+        raise ValueError(f"Unknown sort '{sort}'")
+    column, parse = TRANSFER_QUEUE_SORTS[sort]
+
+    query = (
+        select(Requests, Users.first_name, Users.last_name, Students.department_id)
+        .outerjoin(Students, Students.email == Requests.student_email)
+        .outerjoin(Users, Users.email == Requests.student_email)
+    )
+    if secretary_email:
+        query = query.join(Secretaries, Secretaries.department_id == Students.department_id).where(
+            Secretaries.email == secretary_email
+        )
+    if status:
+        query = query.where(Requests.status == status)
+    if title:
+        query = query.where(Requests.title == title)
+    if cursor:
+        try:
+            value, last_id = decode_cursor(cursor)
+            value, last_id = parse(value), int(last_id)
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+        query = query.where(keyset_after(column, Requests.id, value, last_id, descending))
+    if descending:
+        query = query.order_by(column.desc(), Requests.id.desc())
+    else:
+        query = query.order_by(column.asc(), Requests.id.asc())
+
+    # One extra row tells whether another page exists
+    rows = (await session.execute(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(getattr(last, column.key), last.id)
+    return rows, next_cursor
+
+
+async def get_user_directory(session: AsyncSession, role: str = None, department_id: str = None,
+                             name_prefix: str = None, limit: int = 50, cursor: str = None,
+                             include_total: bool = False):
+    """
+    One page of users ordered by last name, then email.
+
+    Each row is (email, id, first_name, last_name, role, department_id); password
+    hashes are never selected. The department comes from whichever of Students,
+    Professors or Secretaries holds the user. A limit of None returns every
+    match. Returns (rows, next_cursor, total), where total is None unless
+    include_total is set. Raises ValueError for a bad cursor.
+    """
+    department = func.coalesce(Students.department_id, Professors.department_id, Secretaries.department_id)
+    query = (
+        select(Users.email, Users.id, Users.first_name, Users.last_name, Users.role,
+               department.label("department_id"))
+        .outerjoin(Students, Students.email == Users.email)
+        .outerjoin(Professors, Professors.email == Users.email)
+        .outerjoin(Secretaries, Secretaries.email == Users.email)
+    )
+    if role:
+        query = query.where(Users.role == role)
+    if department_id:
+        # Matched per role table, where department_id is indexed (a foreign key), not on the coalesce
+        query = query.where(Users.email.in_(union_all(
+            select(Students.email).where(Students.department_id == department_id),
+            select(Professors.email).where(Professors.department_id == department_id),
+            select(Secretaries.email).where(Secretaries.department_id == department_id)
+        )))
+    if name_prefix:
+        # Prefix LIKEs, so each branch can use the index on its column
+        query = query.where(or_(
+            Users.first_name.startswith(name_prefix, autoescape=True),
+            Users.last_name.startswith(name_prefix, autoescape=True),
+            Users.email.startswith(name_prefix, autoescape=True)
+        ))
+
+    total = None
+    if include_total:
+        total = (await session.execute(select(func.count()).select_from(query.subquery()))).scalar()
+
+    if cursor:
+        try:
+            last_name, last_email = decode_cursor(cursor)
+            if not isinstance(last_name, str) or not isinstance(last_email, str):
+                raise ValueError
+        except (TypeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+        query = query.where(keyset_after(Users.last_name, Users.email, last_name, last_email, descending=False))
+    query = query.order_by(Users.last_name, Users.email)
+
+    if limit is None:
+        return (await session.execute(query)).all(), None, total
+    # One extra row tells whether another page exists
+    rows = (await session.execute(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][3], rows[-1][0])
+    return rows, next_cursor, total
 
 
 async def assign_student_to_course(session: AsyncSession, student_email: str, course_id: str):
@@ -576,14 +1266,69 @@ async def assign_professor_to_course(session: AsyncSession, professor_email: str
     return course
 
 
+# Log every SQL statement (very noisy, for local debugging only)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+
+# Connection pool settings. Recycle stays below MySQL's wait_timeout so idle
+# connections are replaced before the server drops them; pre-ping catches the rest.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+
+def engine_options(url: str) -> dict:
+    """Keyword arguments for create_async_engine; SQLite gets no pool sizing."""
+    options = {"echo": DB_ECHO, "future": True, "pool_pre_ping": DB_POOL_PRE_PING}
+    if not str(url).startswith("sqlite"):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE
+        )
+    return options
+
+
 # Create the asynchronous engine
-engine = create_async_engine(DATABASE_URL, echo=True, future=True)
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+instrument_engine(engine)
+instrument_pool(engine, "primary")
 
 # Create the asynchronous session maker
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Read replica for read-heavy endpoints (see get_read_session)
+if READ_DATABASE_URL:
+    read_engine = create_async_engine(READ_DATABASE_URL, **engine_options(READ_DATABASE_URL))
+    instrument_engine(read_engine)
+    instrument_pool(read_engine, "replica")
+    read_async_session = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+else:
+    read_engine = None
+    read_async_session = None
+
 # Request Template Management Functions
 
+# Field columns a template editor can set, with their defaults
+TEMPLATE_FIELD_DEFAULTS = {
+    "field_label": None,
+    "field_type": None,
+    "field_options": None,
+    "is_required": False,
+    "field_order": 0,
+    "validation_rules": None,
+    "placeholder": None,
+    "help_text": None
+}
+
+
+def template_field_values(field_data: dict) -> dict:
+    """Editable column values of one submitted field."""
+    return {column: field_data.get(column, default) for column, default in TEMPLATE_FIELD_DEFAULTS.items()}
+
+
 async def create_request_template(session: AsyncSession, name: str, description: str, created_by: str, fields: list):
     """Create a new request template with its fields."""
     template = RequestTemplates(
@@ -599,18 +1344,12 @@ async def create_request_template(session: AsyncSession, name: str, description:
         field = RequestTemplateFields(
             template_id=template.id,
             field_name=field_data['field_name'],
-            field_label=field_data['field_label'],
-            field_type=field_data['field_type'],
-            field_options=field_data.get('field_options'),
-            is_required=field_data.get('is_required', False),
-            field_order=field_data.get('field_order', 0),
-            validation_rules=field_data.get('validation_rules'),
-            placeholder=field_data.get('placeholder'),
-            help_text=field_data.get('help_text')
+            **template_field_values(field_data)
         )
         session.add(field)
     
     await session.commit()
+    template_registry.invalidate()
     await session.refresh(template)
     return template
 
@@ -644,7 +1383,13 @@ async def get_request_template_by_name(session: AsyncSession, name: str):
     return result.scalar_one_or_none()
 
 async def update_request_template(session: AsyncSession, template_id: int, name: str = None, description: str = None, fields: list = None):
-    """Update a request template and optionally its fields."""
+    """
+    Update a request template and optionally its fields.
+
+    Submitted fields are matched to the stored ones by field_name. Changed fields
+    are updated in place, so their ids stay stable. New ones are inserted and
+    missing ones deleted. Each kind of change is one statement, all in one commit.
+    """
     template = await get_request_template_by_id(session, template_id)
     if not template:
         return None
@@ -656,36 +1401,42 @@ async def update_request_template(session: AsyncSession, template_id: int, name:
     
     template.updated_date = datetime.now()
     
-    # Update fields if provided
     if fields is not None:
-        # Delete existing fields
-        await session.execute(
-            select(RequestTemplateFields).where(RequestTemplateFields.template_id == template_id)
-        )
-        existing_fields = await session.execute(
-            select(RequestTemplateFields).where(RequestTemplateFields.template_id == template_id)
-        )
-        for field in existing_fields.scalars():
-            await session.delete(field)
-        
-        # Add new fields
+        existing = {field.field_name: field for field in template.fields}  # Loaded with the template
+        changed, updates, inserts = [], [], []
         for field_data in fields:
-            field = RequestTemplateFields(
-                template_id=template.id,
-                field_name=field_data['field_name'],
-                field_label=field_data['field_label'],
-                field_type=field_data['field_type'],
-                field_options=field_data.get('field_options'),
-                is_required=field_data.get('is_required', False),
-                field_order=field_data.get('field_order', 0),
-                validation_rules=field_data.get('validation_rules'),
-                placeholder=field_data.get('placeholder'),
-                help_text=field_data.get('help_text')
+            values = template_field_values(field_data)
+            current = existing.pop(field_data['field_name'], None)
+            if current is None:
+                inserts.append({"template_id": template_id, "field_name": field_data['field_name'], **values})
+            elif any(getattr(current, column) != value for column, value in values.items()):
+                changed.append(current)
+                updates.append({"id": current.id, **values})
+        removed = list(existing.values())
+
+        if updates:
+            await session.execute(update(RequestTemplateFields), updates)  # Bulk UPDATE by primary key
+        if inserts:
+            await session.execute(insert(RequestTemplateFields), inserts)
+        if removed:
+            await session.execute(
+                delete(RequestTemplateFields)
+                .where(RequestTemplateFields.id.in_([field.id for field in removed]))
+                .execution_options(synchronize_session=False)
             )
-            session.add(field)
+        # The bulk statements bypass the loaded objects; reload what they touched
+        for field in changed:
+            session.expire(field)
+        for field in removed:
+            session.expunge(field)
+        session.expire(template, ["fields"])
     
     await session.commit()
+    template_registry.invalidate()
+    template_validators.invalidate(template_id)
     await session.refresh(template)
+    if fields is not None:
+        await session.refresh(template, ["fields"])
     return template
 
 async def delete_request_template(session: AsyncSession, template_id: int):
@@ -696,6 +1447,8 @@ async def delete_request_template(session: AsyncSession, template_id: int):
     
     template.is_active = False
     await session.commit()
+    template_registry.invalidate()
+    template_validators.invalidate(template_id)
     return True
 
 async def get_active_request_template_names(session: AsyncSession):
@@ -723,6 +1476,7 @@ async def create_or_update_deadline_config(session: AsyncSession, request_type:
         existing_config.updated_date = datetime.now()
         existing_config.is_active = True  # Ensure re-activation on update
         await session.commit()
+        template_registry.invalidate()
         await session.refresh(existing_config)
         return existing_config
     else:
@@ -735,6 +1489,7 @@ async def create_or_update_deadline_config(session: AsyncSession, request_type:
         )
         session.add(new_config)
         await session.commit()
+        template_registry.invalidate()
         await session.refresh(new_config)
         return new_config
 
@@ -766,9 +1521,122 @@ async def delete_deadline_config(session: AsyncSession, request_type: str):
     if config:
         config.is_active = False
         await session.commit()
+        template_registry.invalidate()
         return True
     return False
 
+def template_to_dict(template: RequestTemplates) -> dict:
+    """Public JSON shape of a request template, fields in display order."""
+    return {
+        "id": template.id,
+        "name": template.name,
+        "description": template.description,
+        "is_active": template.is_active,
+        "created_by": template.created_by,
+        "created_date": template.created_date.isoformat(),
+        "updated_date": template.updated_date.isoformat(),
+        "fields": [
+            {
+                "id": field.id,
+                "field_name": field.field_name,
+                "field_label": field.field_label,
+                "field_type": field.field_type,
+                "field_options": field.field_options,
+                "is_required": field.is_required,
+                "field_order": field.field_order,
+                "validation_rules": field.validation_rules,
+                "placeholder": field.placeholder,
+                "help_text": field.help_text
+            }
+            for field in sorted(template.fields, key=lambda f: f.field_order)
+        ]
+    }
+
+
+def content_version(payload) -> str:
+    """Short hash of a JSON-able payload; equal on every worker for equal data."""
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+# Stand-in for RequestDeadlineConfig rows held by the registry (is_request_expired
+# and get_request_deadline_date only read deadline_days)
+class DeadlineRule:
+    def __init__(self, request_type: str, deadline_days: int):
+        self.request_type = request_type
+        self.deadline_days = deadline_days
+
+
+class TemplateSnapshot:
+    """One load of the templates, routing rules and deadline configs."""
+
+    def __init__(self, templates: list, routing_rules: dict, deadline_configs: dict):
+        self.templates = templates  # Newest first, including inactive ones
+        self.by_id = {template["id"]: template for template in templates}
+        self.by_name = {template["name"]: template for template in templates}
+        self.routing_rules = routing_rules  # request type -> destination
+        self.deadline_configs = deadline_configs  # request type -> DeadlineRule
+        self.template_versions = {template["id"]: content_version(template) for template in templates}
+        self.version = content_version([
+            templates, routing_rules, {name: rule.deadline_days for name, rule in deadline_configs.items()}
+        ])
+
+
+# Upper bound on how long a worker serves templates without re-reading them,
+# so admin changes made through another worker still show up
+TEMPLATE_REGISTRY_TTL = float(os.getenv("TEMPLATE_REGISTRY_TTL", "300"))
+
+
+class TemplateRegistry(VersionedCache):
+    """
+    Process-local copy of the request templates, routing rules and deadline configs.
+
+    Template and deadline writes through this module, and routing rule writes in
+    main, invalidate it. Otherwise it is re-read after TEMPLATE_REGISTRY_TTL.
+    """
+
+    def __init__(self, ttl_seconds: float = None):
+        super().__init__(TEMPLATE_REGISTRY_TTL if ttl_seconds is None else ttl_seconds)
+
+    async def _load(self, session: AsyncSession, now: datetime):
+        templates = await get_request_templates(session, active_only=False)
+        rules = (await session.execute(select(RequestRoutingRules))).scalars().all()
+        configs = await get_all_deadline_configs(session, active_only=True)
+        snapshot = TemplateSnapshot(
+            [template_to_dict(template) for template in templates],
+            {rule.type: rule.destination for rule in rules},
+            {config.request_type: DeadlineRule(config.request_type, config.deadline_days) for config in configs}
+        )
+        return snapshot, now + timedelta(seconds=self.ttl_seconds)
+
+
+template_registry = TemplateRegistry()
+
+async def expire_overdue_requests(session: AsyncSession):
+    """Mark pending requests whose deadline has passed as expired. Returns how many changed."""
+    from datetime import date, timedelta
+    configs = await get_all_deadline_configs(session, active_only=True)
+
+    expired_count = 0
+    for config in configs:
+        cutoff = date.today() - timedelta(days=config.deadline_days)
+        result = await session.execute(
+            select(Requests).where(
+                and_(
+                    Requests.title == config.request_type,
+                    Requests.status == "pending",
+                    Requests.created_date < cutoff
+                )
+            )
+        )
+        for req in result.scalars().all():
+            req.status = "expired"
+            record_request_event(session, req, "status_change", from_status="pending", to_status="expired",
+                                 reason="deadline_passed")
+            expired_count += 1
+
+    await session.commit()
+    return expired_count
+
 def is_request_expired(request, deadline_config):
     """Helper function to check if a request is expired based on deadline config."""
     if not deadline_config:
@@ -786,18 +1654,179 @@ def get_request_deadline_date(request, deadline_config):
     from datetime import timedelta
     return request.created_date + timedelta(days=deadline_config.deadline_days)
 
-async def init_db():
-    # First create the database if it doesn't exist
-    temp_engine = create_async_engine(DATABASE_URL.rsplit('/', 1)[0], echo=True, future=True)
-    async with temp_engine.begin() as conn:
-        await conn.execute(text("CREATE DATABASE IF NOT EXISTS students"))
-    await temp_engine.dispose()
+# Alembic revision this code expects. Bump it together with every new migration.
+SCHEMA_VERSION = "0008"
+
+# The startup check can be turned off for throwaway local databases
+SCHEMA_CHECK_ENABLED = os.getenv("SCHEMA_CHECK_ENABLED", "true").lower() == "true"
+
+ALEMBIC_INI = Path(__file__).resolve().parent / "alembic.ini"
+
+
+class SchemaVersionError(RuntimeError):
+    """The database schema is not at the revision this code expects."""
+
+
+async def check_schema_version(db_engine=None, expected: str = SCHEMA_VERSION) -> str:
+    """Compare the database's Alembic revision with `expected` using a single query."""
+    db_engine = db_engine or engine
+    try:
+        async with db_engine.connect() as conn:
+            current = (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar_one_or_none()
+    except (OperationalError, ProgrammingError) as e:
+        if "alembic_version" not in str(e):
+            raise
+        current = None
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at revision {current or 'none'} but this code expects {expected}. "
+            f"Run 'python -m backend.manage_db init' to migrate it."
+        )
+    return current
+
+
+def _alembic_config(url: str):
+    from alembic.config import Config  # Only needed by the CLI, keep it off the startup path
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", str(url).replace("%", "%%"))
+    return config
+
+
+# Tables of revision 0001, the schema create_all produced before migrations existed.
+# Later revisions skip whatever such a database already has.
+BASELINE_TABLES = frozenset({
+    "users", "students", "professors", "professor_unavailability", "requests", "notifications",
+    "system_announcements", "request_routing_rules", "request_templates", "request_template_fields",
+    "request_deadline_config", "student_courses", "grades", "courses", "comment_templates",
+    "responses", "secretaries", "departments",
+})
+
+
+def _upgrade_schema(connection, url: str):
+    from alembic import command
+    config = _alembic_config(url)
+    config.attributes["connection"] = connection
+    tables = set(inspect(connection).get_table_names())
+    if "alembic_version" not in tables and tables & BASELINE_TABLES:
+        missing = BASELINE_TABLES - tables
+        if missing:
+            raise SchemaVersionError(
+                f"Database has tables but no alembic_version, and lacks {', '.join(sorted(missing))} "
+                f"from revision 0001; it can't be adopted automatically."
+            )
+        command.stamp(config, "0001")
+    command.upgrade(config, "head")
+
+
+async def create_database(url: str = DATABASE_URL):
+    """Create the MySQL database named in `url` if it doesn't exist."""
+    url = make_url(url)
+    if not url.drivername.startswith("mysql"):
+        return
+    temp_engine = create_async_engine(url.set(database=None), echo=DB_ECHO, future=True)
+    try:
+        async with temp_engine.begin() as conn:
+            await conn.execute(text(f"CREATE DATABASE IF NOT EXISTS `{url.database}`"))
+    finally:
+        await temp_engine.dispose()
+
+
+async def init_db(db_engine=None):
+    """Create the database if needed and migrate it to the latest revision.
+
+    Run explicitly through `python -m backend.manage_db init`; the app only checks the version on startup.
+    """
+    db_engine = db_engine or engine
+    await create_database(db_engine.url)
+    async with db_engine.begin() as conn:
+        await conn.run_sync(_upgrade_schema, db_engine.url.render_as_string(hide_password=False))
+
+async def check_db_health(db_engine=None, timeout: float = 5.0) -> dict:
+    """Run a trivial query through the pool and report its latency and the pool state."""
+    db_engine = db_engine or engine
+    started = asyncio.get_running_loop().time()
+    try:
+        async with asyncio.timeout(timeout):
+            async with db_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        healthy, error = True, None
+    except Exception as e:
+        healthy, error = False, str(e) or type(e).__name__
+    result = {
+        "status": "ok" if healthy else "error",
+        "latency_ms": round((asyncio.get_running_loop().time() - started) * 1000, 1),
+        "pool": pool_status(db_engine)
+    }
+    if error:
+        result["error"] = error
+    return result
+
+# After a client writes, its reads stay on the primary for this long so it
+# doesn't read stale data from a lagging replica
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
+# client key -> time.monotonic() of its last committed write. Process-local, so
+# with several workers it only covers reads served by the worker that wrote.
+_recent_writes = {}
+
+
+def client_key(request: Request) -> str:
+    """Identify the caller by its bearer token, or its address for anonymous requests."""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return "token:" + hashlib.sha1(authorization.encode()).hexdigest()
+    return "addr:" + (request.client.host if request.client else "unknown")
+
+
+def record_client_write(key: str):
+    now = time.monotonic()
+    if len(_recent_writes) > 10000:
+        for stale in [k for k, at in _recent_writes.items() if now - at > READ_YOUR_WRITES_SECONDS]:
+            del _recent_writes[stale]
+    _recent_writes[key] = now
+
+
+def wrote_recently(key: str) -> bool:
+    written_at = _recent_writes.get(key)
+    return written_at is not None and time.monotonic() - written_at < READ_YOUR_WRITES_SECONDS
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_session_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_committed_write(session):
+    if session.info.pop("wrote", False) and session.info.get("client_key"):
+        record_client_write(session.info["client_key"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_write(session):
+    session.info.pop("wrote", None)
 
-    # Now create the tables in the database
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
 
 # This will handle closing the session properly
-async def get_session() -> AsyncSession:
+async def get_session(request: Request) -> AsyncSession:
     async with async_session() as session:
-        yield session
\ No newline at end of file
+        session.info["client_key"] = client_key(request)
+        yield session
+
+
+async def get_read_session(request: Request, session: AsyncSession = Depends(get_session)) -> AsyncSession:
+    """
+    Session for read-only endpoints. Uses the replica when one is configured,
+    except for clients that wrote within READ_YOUR_WRITES_SECONDS.
+    """
+    if read_async_session is None or wrote_recently(client_key(request)):
+        yield session
+        return
+    async with read_async_session() as read_session:
+        yield read_session
@@ -1,19 +1,16 @@
 import os
 import shutil
-import time
 import asyncio
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from fastapi.encoders import jsonable_encoder
 import urllib.parse
-from fastapi import FastAPI, UploadFile, File, Form, Response, Depends, HTTPException, status, Body, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, Form, Response, Depends, HTTPException, status, Body, BackgroundTasks, Query
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
 from sqlalchemy import select, literal, literal_column, ColumnElement, delete, and_, update, func, desc, asc
-import json
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import selectinload, joinedload
-from sqlalchemy.orm.attributes import flag_modified
 from starlette.requests import Request
 from starlette.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,7 +19,7 @@ import bcrypt
 import cryptography
 from jose import jwt, JWTError
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from fastapi import HTTPException
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -30,29 +27,16 @@ from fastapi import Depends
 from pydantic import BaseModel, constr
 from typing import List, Dict, Any
 import backend.email_service as email_service
+from backend.scheduler import JobScheduler
+from backend.metrics import MetricsMiddleware, REGISTRY, PROMETHEUS_CONTENT_TYPE
+from backend.compression import CompressionMiddleware
+from backend.template_validation import TemplateFieldsError, validate_template_fields
+from backend.search import search_requests
+from backend.openai_client import openai_configured, get_openai_client
 
 
-# Import OpenAI directly for news generation
-try:
-    from openai import AsyncOpenAI
-    OPENAI_AVAILABLE = True
-    print("DEBUG: OpenAI module imported successfully for news generation")
-    
-    # Initialize OpenAI client for news generation
-    openai_api_key = os.environ.get('OPENAI_API_KEY')
-    if openai_api_key:
-        try:
-            news_openai_client = AsyncOpenAI(api_key=openai_api_key)
-            print("DEBUG: News OpenAI client initialized")
-        except Exception as e:
-            print(f"ERROR: Failed to initialize news OpenAI client: {e}")
-            OPENAI_AVAILABLE = False
-    else:
-        print("DEBUG: OpenAI API key not found for news generation")
-        OPENAI_AVAILABLE = False
-except ImportError:
-    OPENAI_AVAILABLE = False
-    print("DEBUG: OpenAI module not available for news generation")
+# News generation shares the lazily created OpenAI client with the chatbot
+OPENAI_AVAILABLE = openai_configured()
 
 # Import the AI Service - using the Python wrapper (for chatbot only)
 from backend.AIService import processMessage
@@ -127,107 +111,153 @@ def verify_token_admin(token_data: dict = Depends(verify_token)):
 
 from contextlib import asynccontextmanager
 
-# Global variable to control the background task
-background_task_running = False
+async def refresh_ai_news(session: AsyncSession):
+    """Generate a new news batch when fewer than 3 AI news items are still active"""
+    result = await session.execute(
+        select(SystemAnnouncements)
+        .where(
+            and_(
+                SystemAnnouncements.announcement_type == 'ai_news',
+                SystemAnnouncements.is_active == True,
+                SystemAnnouncements.expires_date > datetime.now()
+            )
+        )
+    )
+    active_ai_news = result.scalars().all()
+    if len(active_ai_news) < 3:
+        return await generate_ai_news_batch(session)
+    return 0
+
+
+# News categories for variety
+NEWS_CATEGORIES = [
+    "breaking international news or current events",
+    "economic developments or market updates",
+    "sports achievements or major sporting events",
+    "political developments or government policy changes",
+    "scientific discoveries or technological breakthroughs",
+    "environmental news or climate updates",
+    "health and medical news or breakthrough research",
+    "cultural events or entertainment industry news",
+    "business mergers, acquisitions, or corporate developments",
+    "social issues or humanitarian developments"
+]
+
+# Canned news used when OpenAI is unavailable or too slow
+FALLBACK_NEWS = {
+    "breaking international news or current events": "BREAKING: International diplomatic summit concludes with historic agreements on climate cooperation and trade partnerships.",
+    "economic developments or market updates": "MARKETS: Global stock markets show positive trends as technology sector leads growth with 3.2% gains this quarter.",
+    "sports achievements or major sporting events": "SPORTS: Championship finals set new viewership records as teams compete in thrilling overtime matches.",
+    "political developments or government policy changes": "POLITICS: New legislative package focuses on infrastructure investment and renewable energy initiatives.",
+    "scientific discoveries or technological breakthroughs": "SCIENCE: Researchers announce breakthrough in renewable energy storage technology, increasing efficiency by 40%.",
+    "environmental news or climate updates": "ENVIRONMENT: Global conservation efforts show promising results with forest restoration projects exceeding targets.",
+    "health and medical news or breakthrough research": "HEALTH: Medical breakthrough in early disease detection shows 95% accuracy rate in clinical trials.",
+    "cultural events or entertainment industry news": "CULTURE: International arts festival showcases diverse talents from 50 countries in week-long celebration.",
+    "business mergers, acquisitions, or corporate developments": "BUSINESS: Major tech companies announce strategic partnerships to advance sustainable innovation goals.",
+    "social issues or humanitarian developments": "HUMANITARIAN: Relief organizations report successful aid distribution to affected regions, reaching 100,000 people."
+}
+DEFAULT_FALLBACK_NEWS = "NEWS: Important developments continue to shape global events."
+
+# How many news generations may run at once, and how long each may take (seconds)
+NEWS_GENERATION_CONCURRENCY = int(os.getenv("NEWS_GENERATION_CONCURRENCY", "5"))
+NEWS_GENERATION_TIMEOUT = float(os.getenv("NEWS_GENERATION_TIMEOUT", "20"))
+
+
+async def generate_news_contents(categories: List[str]) -> List[Dict[str, Any]]:
+    """Generate news for all categories concurrently, falling back to canned content on timeout."""
+    semaphore = asyncio.Semaphore(max(1, NEWS_GENERATION_CONCURRENCY))
+
+    async def generate_one(category: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(generate_news_content(category), timeout=NEWS_GENERATION_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"❌ News generation timed out for category: {category}")
+                return {
+                    "content": FALLBACK_NEWS.get(category, DEFAULT_FALLBACK_NEWS),
+                    "source": "timeout_fallback",
+                    "success": True
+                }
+            except Exception as e:
+                print(f"❌ Error generating news for category {category}: {str(e)}")
+                return {"content": None, "source": "error", "success": False}
+
+    return await asyncio.gather(*(generate_one(category) for category in categories))
 
-async def auto_generate_news_task():
-    """Background task that automatically generates news when expired ones are found"""
-    global background_task_running
-    while background_task_running:
-        try:
-            # Check every hour for expired news
-            await asyncio.sleep(3600)  # Wait 1 hour
-            
-            # Get database session
-            async with async_session() as session:
-                # Check if there are any active AI news
-                result = await session.execute(
-                    select(SystemAnnouncements)
-                    .where(
-                        and_(
-                            SystemAnnouncements.announcement_type == 'ai_news',
-                            SystemAnnouncements.is_active == True,
-                            SystemAnnouncements.expires_date > datetime.now()
-                        )
-                    )
-                )
-                active_ai_news = result.scalars().all()
-                # If less than 3 active AI news, generate new ones
-                if len(active_ai_news) < 3:
-                    await generate_ai_news_batch(session)
-                    
-        except Exception as e:
-            print(f"❌ Error in auto news generation: {str(e)}")
+
+async def create_ai_news_announcements(session: AsyncSession) -> List[Dict[str, Any]]:
+    """Generate one news item per category and store them all in one transaction."""
+    news_responses = await generate_news_contents(NEWS_CATEGORIES)
+    expires_date = datetime.now() + timedelta(hours=24)  # Expire after 24 hours
+
+    generated = []
+    for i, (category, news_response) in enumerate(zip(NEWS_CATEGORIES, news_responses), 1):
+        if news_response.get('success') and news_response.get('content'):
+            generated.append((i, category, news_response))
+        else:
+            print(f"❌ Failed to generate news for category: {category}")
+
+    if not generated:
+        return []
+
+    announcements = await create_system_announcements_bulk(session, [
+        {
+            "title": f"World News #{i}",
+            "message": news_response['content'],
+            "admin_email": None,  # No admin email for AI-generated content
+            "announcement_type": 'ai_news',
+            "expires_date": expires_date
+        }
+        for i, _, news_response in generated
+    ])
+
+    return [
+        {
+            "id": announcement.id,
+            "category": category,
+            "content": news_response['content'],
+            "source": news_response.get('source', 'unknown')
+        }
+        for announcement, (_, category, news_response) in zip(announcements, generated)
+    ]
 
 
 async def generate_ai_news_batch(session: AsyncSession):
     """Generate 10 AI news items"""
     try:
-        # News categories for variety
-        news_categories = [
-            "breaking international news or current events",
-            "economic developments or market updates", 
-            "sports achievements or major sporting events",
-            "political developments or government policy changes",
-            "scientific discoveries or technological breakthroughs",
-            "environmental news or climate updates",
-            "health and medical news or breakthrough research",
-            "cultural events or entertainment industry news",
-            "business mergers, acquisitions, or corporate developments",
-            "social issues or humanitarian developments"
-        ]
-        
-        created_count = 0
-        
-        # Generate 10 different news items
-        for i, category in enumerate(news_categories, 1):
-            try:
-                # Generate news content directly using OpenAI (not through chatbot service)
-                news_response = await generate_news_content(category)
-                
-                if news_response.get('success') and news_response.get('content'):
-                    # Create the announcement with AI type
-                    result = await create_system_announcement(
-                        session=session,
-                        title=f"World News #{i}",
-                        message=news_response['content'],
-                        admin_email=None,  # No admin email for AI-generated content
-                        announcement_type='ai_news',
-                        expires_date=datetime.now() + timedelta(hours=24)  # Expire after 24 hours
-                    )
-                    
-                    created_count += 1
-                    print(f"✅ Auto-generated news {i}/10: {category} (source: {news_response.get('source', 'unknown')})")
-                    
-                else:
-                    print(f"❌ Failed to auto-generate news for category: {category}")
-                    
-            except Exception as e:
-                print(f"❌ Error auto-generating news for category {category}: {str(e)}")
-                continue
-
-        return created_count
-        
+        created = await create_ai_news_announcements(session)
+        for item in created:
+            print(f"✅ Auto-generated news: {item['category']} (source: {item['source']})")
+        return len(created)
     except Exception as e:
         print(f"❌ Error in generate_ai_news_batch: {str(e)}")
         return 0
 
+# Periodic background jobs; the DB lease makes each run once across all workers
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+
+scheduler = JobScheduler(async_session)
+scheduler.add_job("ai_news_refresh", refresh_ai_news, every=timedelta(hours=1))
+scheduler.add_job("deadline_sweep", expire_overdue_requests, cron="*/15 * * * *")
+scheduler.add_job("notification_retention", archive_old_notifications, cron="30 3 * * *", lease=timedelta(hours=1))
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global background_task_running
-    # Initialize database on startup
-    await init_db()
-    
-    # Start background task for auto news generation
-    background_task_running = True
-    asyncio.create_task(auto_generate_news_task())
-    yield
-    
-    # Clean up on shutdown
-    background_task_running = False
+    # Fail fast if the schema isn't migrated; creating it is left to `python -m backend.manage_db init`
+    if SCHEMA_CHECK_ENABLED:
+        await check_schema_version()
 
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+    try:
+        yield
+    finally:
+        # Cancel background jobs on shutdown
+        await scheduler.stop()
 
-app = FastAPI(lifespan=lifespan)
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # app = FastAPI()
 
@@ -237,20 +267,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
 def home():
-    start_time = time.time()
-    end_time = time.time()
-    print(f"home run-time is {end_time - start_time:.3f} sec")
     return {"message": "Welcome to FastAPI Backend!"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.get("/health/db")
+async def database_health():
+    """Database reachability, round-trip latency and connection pool usage"""
+    result = await check_db_health(engine)
+    status_code = status.HTTP_200_OK if result["status"] == "ok" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(content=result, status_code=status_code)
+
+
 @app.post("/login")
 async def login(request: Request, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     data = await request.json()
     email = data.get("Email")
     password = data.get("Password")
@@ -262,32 +305,21 @@ async def login(request: Request, session: AsyncSession = Depends(get_session)):
         if bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
             access_token = create_access_token({"user_email": user.email, "role": user.role, "first_name": user.first_name,
                                                 "last_name": user.last_name})
-            end_time = time.time()
-            print(f"login run-time is {end_time - start_time:.3f} sec")
             return {"access_token": access_token, "token_type": "bearer", "message": "Login successful"}
         else:
-            end_time = time.time()
-            print(f"login run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=401, detail="Invalid password")
     else:
-        end_time = time.time()
-        print(f"login run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="User not found")
 
 
 # AI Service endpoint
 @app.post("/api/ai/chat")
 async def ai_chat(chat_request: ChatRequest):
-    start_time = time.time()
     try:
         # Process the message through the AI service
         response = await processMessage(chat_request.message, chat_request.language)
-        end_time = time.time()
-        print(f"ai_chat run-time is {end_time - start_time:.3f} sec")
         return response
     except Exception as e:
-        end_time = time.time()
-        print(f"ai_chat run-time is {end_time - start_time:.3f} sec")
         print(f"API ERROR: Error processing message: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -309,7 +341,6 @@ async def create_announcement(
     session: AsyncSession = Depends(get_session)
 ):
     """Create a new system announcement (Admin only)"""
-    start_time = time.time()
     try:
         expires_date = None
         if announcement.expires_date:
@@ -324,43 +355,33 @@ async def create_announcement(
             expires_date=expires_date
         )
         
-        end_time = time.time()
-        print(f"create_announcement run-time is {end_time - start_time:.3f} sec")
         return {
             "message": "Announcement created successfully",
             "announcement_id": result.id
         }
     except Exception as e:
-        end_time = time.time()
-        print(f"create_announcement run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(
             status_code=500,
             detail=f"Error creating announcement: {str(e)}"
         )
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
 @app.get("/api/announcements")
-async def get_active_announcements(session: AsyncSession = Depends(get_session)):
+async def get_active_announcements(request: Request, session: AsyncSession = Depends(get_session)):
     """Get all active system announcements for all users"""
-    start_time = time.time()
     try:
-        announcements = await get_active_system_announcements(session)
-        end_time = time.time()
-        print(f"get_active_announcements run-time is {end_time - start_time:.3f} sec")
-        return [
-            {
-                "id": ann.id,
-                "title": ann.title,
-                "message": ann.message,
-                "admin_email": ann.admin_email,
-                "announcement_type": ann.announcement_type,
-                "created_date": ann.created_date.isoformat(),
-                "expires_date": ann.expires_date.isoformat() if ann.expires_date else None
-            }
-            for ann in announcements
-        ]
+        announcements, etag = await active_announcements_cache.get(session)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return JSONResponse(content=announcements, headers=headers)
     except Exception as e:
-        end_time = time.time()
-        print(f"get_active_announcements run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching announcements: {str(e)}"
@@ -372,11 +393,8 @@ async def get_all_announcements(
     session: AsyncSession = Depends(get_session)
 ):
     """Get all system announcements for admin management"""
-    start_time = time.time()
     try:
         announcements = await get_system_announcements_for_admin(session)
-        end_time = time.time()
-        print(f"get_all_announcements run-time is {end_time - start_time:.3f} sec")
         return [
             {
                 "id": ann.id,
@@ -391,8 +409,6 @@ async def get_all_announcements(
             for ann in announcements
         ]
     except Exception as e:
-        end_time = time.time()
-        print(f"get_all_announcements run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching announcements: {str(e)}"
@@ -405,18 +421,13 @@ async def deactivate_announcement(
     session: AsyncSession = Depends(get_session)
 ):
     """Deactivate a system announcement (Admin only)"""
-    start_time = time.time()
     try:
         success = await deactivate_system_announcement(session, announcement_id)
-        end_time = time.time()
-        print(f"deactivate_announcement run-time is {end_time - start_time:.3f} sec")
         if success:
             return {"message": "Announcement deactivated successfully"}
         else:
             raise HTTPException(status_code=404, detail="Announcement not found")
     except Exception as e:
-        end_time = time.time()
-        print(f"deactivate_announcement run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(
             status_code=500,
             detail=f"Error deactivating announcement: {str(e)}"
@@ -428,56 +439,9 @@ async def generate_ai_news(
     session: AsyncSession = Depends(get_session)
 ):
     """Generate 10 real-world AI news announcements (Admin only)"""
-    start_time = time.time()
     try:
-        # News categories for variety
-        news_categories = [
-            "breaking international news or current events",
-            "economic developments or market updates", 
-            "sports achievements or major sporting events",
-            "political developments or government policy changes",
-            "scientific discoveries or technological breakthroughs",
-            "environmental news or climate updates",
-            "health and medical news or breakthrough research",
-            "cultural events or entertainment industry news",
-            "business mergers, acquisitions, or corporate developments",
-            "social issues or humanitarian developments"
-        ]
+        created_announcements = await create_ai_news_announcements(session)
         
-        created_announcements = []
-        
-        # Generate 10 different news items
-        for i, category in enumerate(news_categories, 1):
-            try:
-                # Generate news content directly using OpenAI (not through chatbot service)
-                news_response = await generate_news_content(category)
-                
-                if news_response.get('success') and news_response.get('content'):
-                    # Create the announcement with AI type
-                    result = await create_system_announcement(
-                        session=session,
-                        title=f"World News #{i}",
-                        message=news_response['content'],
-                        admin_email=None,  # No admin email for AI-generated content
-                        announcement_type='ai_news',
-                        expires_date=datetime.now() + timedelta(hours=24)  # Expire after 24 hours
-                    )
-                    
-                    created_announcements.append({
-                        "id": result.id,
-                        "category": category,
-                        "content": news_response['content'],
-                        "source": news_response.get('source', 'unknown')
-                    })
-                else:
-                    print(f"Failed to generate news for category: {category}")
-                    
-            except Exception as e:
-                print(f"Error generating news for category {category}: {str(e)}")
-                continue
-        
-        end_time = time.time()
-        print(f"generate_ai_news run-time is {end_time - start_time:.3f} sec")
         
         if created_announcements:
             return {
@@ -489,8 +453,6 @@ async def generate_ai_news(
             raise HTTPException(status_code=500, detail="Failed to generate any AI news content")
             
     except Exception as e:
-        end_time = time.time()
-        print(f"generate_ai_news run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(
             status_code=500,
             detail=f"Error generating AI news: {str(e)}"
@@ -498,23 +460,16 @@ async def generate_ai_news(
 
 @app.get("/databases")
 def list_databases():
-    start_time = time.time()
-    end_time = time.time()
-    print(f"list_databases run-time is {end_time - start_time:.3f} sec")
     return {"databases": None}
 
 
 @app.get("/tables/{database_name}")
 def list_tables(database_name: str):
-    start_time = time.time()
-    end_time = time.time()
-    print(f"list_tables run-time is {end_time - start_time:.3f} sec")
     return {"tables": None}
 
 
 @app.post("/uploadfile/{userEmail}")
 async def upload_file(userEmail: str, file: UploadFile = File(...), fileType: str = Form(...)):
-    start_time = time.time()
     try:
         # Validate file size (example: 10MB limit)
         MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB in bytes
@@ -522,8 +477,6 @@ async def upload_file(userEmail: str, file: UploadFile = File(...), fileType: st
         file_size = len(file_content)
         
         if file_size > MAX_FILE_SIZE:
-            end_time = time.time()
-            print(f"upload_file run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(
                 status_code=400, 
                 detail="File size too large. Maximum size is 10MB"
@@ -538,15 +491,11 @@ async def upload_file(userEmail: str, file: UploadFile = File(...), fileType: st
         with open(file_path, "wb") as f:
             f.write(file_content)
 
-        end_time = time.time()
-        print(f"upload_file run-time is {end_time - start_time:.3f} sec")
         return {
             "message": "File uploaded successfully",
             "path": f"{userEmail}/{fileType}/{file.filename}"
         }
     except Exception as e:
-        end_time = time.time()
-        print(f"upload_file run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(
             status_code=500,
             detail=f"Error uploading file: {str(e)}"
@@ -555,7 +504,6 @@ async def upload_file(userEmail: str, file: UploadFile = File(...), fileType: st
 
 @app.get("/reloadFiles/{userEmail}")
 async def reload_files(userEmail: str):
-    start_time = time.time()
     root_path = DOCUMENTS_ROOT / userEmail
     files = []
     file_paths = []
@@ -564,14 +512,11 @@ async def reload_files(userEmail: str):
             file_path = os.path.relpath(os.path.join(root, filename), root_path)
             files.append(filename)
             file_paths.append(file_path)
-    end_time = time.time()
-    print(f"reload_files run-time is {end_time - start_time:.3f} sec")
     return {"files": files, "file_paths": file_paths}
 
 
 @app.get("/downloadFile/{userId}/{file_path:path}")
 async def download_file(userId: str, file_path: str):
-    start_time = time.time()
     # Decode both the user ID and filename from URL encoding
     decoded_user_id = urllib.parse.unquote(userId)
     decoded_filename = urllib.parse.unquote(file_path)
@@ -609,46 +554,51 @@ async def download_file(userId: str, file_path: str):
 
     # If still not found, return 404
     if not file_found:
-        end_time = time.time()
-        print(f"download_file run-time is {end_time - start_time:.3f} sec")
         print(f"File not found in any location!")
         raise HTTPException(status_code=404, detail="File not found")
 
-    end_time = time.time()
-    print(f"download_file run-time is {end_time - start_time:.3f} sec")
     return FileResponse(absolute_path, filename=os.path.basename(absolute_path))
 
 
-@app.get("/requests/{user_email}")
+class RequestSummaryResponse(BaseModel):
+    id: int
+    title: str
+    student_email: str
+    details: Optional[str] = None
+    files: Optional[Any] = None
+    status: Optional[str] = None
+    created_date: str
+    timeline: Dict[str, Any]
+    deadline_date: Optional[str] = None
+    is_expired: bool = False
+
+    class Config:
+        from_attributes = True
+
+@app.get("/requests/{user_email}", response_model=List[RequestSummaryResponse])
 async def get_requests(
     user_email: str, 
     student_email: Optional[str] = None,  # New parameter for filtering by student
+    # Stays on the primary, not get_read_session: it marks overdue pending
+    # requests expired and records their status_change events
     session: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     try:
         # Fetch the user role from the database based on the email
         result = await session.execute(select(Users).filter(Users.email == user_email))
         user = result.scalar_one_or_none()
 
         if not user:
-            end_time = time.time()
-            print(f"get_requests run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=404, detail="User not found")
 
-        # Fetch ALL deadline configurations once to avoid N+1 queries
-        deadline_configs_result = await session.execute(
-            select(RequestDeadlineConfig).where(RequestDeadlineConfig.is_active == True)
-        )
-        deadline_configs = {config.request_type: config for config in deadline_configs_result.scalars().all()}
+        # Active deadline rules by request type, from the in-process registry
+        deadline_configs = (await template_registry.get(session)).deadline_configs
 
         # If the user is a secretary, return all relevant requests
         if user.role == "secretary":
             secretary_result = await session.execute(select(Secretaries).where(Secretaries.email == user_email))
             secretary = secretary_result.scalar_one_or_none()
             if not secretary:
-                end_time = time.time()
-                print(f"get_requests run-time is {end_time - start_time:.3f} sec")
                 raise HTTPException(status_code=404, detail="Secretary not found")
             department = secretary.department_id
             
@@ -675,29 +625,15 @@ async def get_requests(
                     old_status = req.status
                     req.status = "expired"
                     
-                    # Update timeline
-                    if not req.timeline:
-                        req.timeline = {}
-                    if "status_changes" not in req.timeline:
-                        req.timeline["status_changes"] = []
-                    
-                    req.timeline["status_changes"].append({
-                        "from": old_status,
-                        "to": "expired",
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "reason": "deadline_passed"
-                    })
-                    
-                    # Mark timeline as modified for SQLAlchemy
-                    flag_modified(req, "timeline")
+                    record_request_event(session, req, "status_change", from_status=old_status, to_status="expired",
+                                         reason="deadline_passed")
                     
                 processed_requests.append(req)
             
             # Commit all status updates
             await session.commit()
+            timelines = await load_request_timelines(session, processed_requests)
             
-            end_time = time.time()
-            print(f"get_requests run-time is {end_time - start_time:.3f} sec")
             return [
                 {
                     "id": req.id,
@@ -707,7 +643,7 @@ async def get_requests(
                     "files": req.files,
                     "status": req.status,
                     "created_date": str(req.created_date),
-                    "timeline": req.timeline,
+                    "timeline": timelines[req.id],
                     "deadline_date": get_request_deadline_date(req, deadline_configs.get(req.title)).isoformat() if get_request_deadline_date(req, deadline_configs.get(req.title)) else None,
                     "is_expired": is_request_expired(req, deadline_configs.get(req.title))
                 }
@@ -730,29 +666,15 @@ async def get_requests(
                     old_status = req.status
                     req.status = "expired"
                     
-                    # Update timeline
-                    if not req.timeline:
-                        req.timeline = {}
-                    if "status_changes" not in req.timeline:
-                        req.timeline["status_changes"] = []
-                    
-                    req.timeline["status_changes"].append({
-                        "from": old_status,
-                        "to": "expired",
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "reason": "deadline_passed"
-                    })
-                    
-                    # Mark timeline as modified for SQLAlchemy
-                    flag_modified(req, "timeline")
+                    record_request_event(session, req, "status_change", from_status=old_status, to_status="expired",
+                                         reason="deadline_passed")
                     
                 processed_requests.append(req)
             
             # Commit all status updates
             await session.commit()
 
-        end_time = time.time()
-        print(f"get_requests run-time is {end_time - start_time:.3f} sec")
+        timelines = await load_request_timelines(session, processed_requests)
         return [
             {
                 "id": req.id,
@@ -762,27 +684,22 @@ async def get_requests(
                 "files": req.files,
                 "status": req.status,
                 "created_date": str(req.created_date),
-                "timeline": req.timeline,
+                "timeline": timelines[req.id],
                 "deadline_date": get_request_deadline_date(req, deadline_configs.get(req.title)).isoformat() if get_request_deadline_date(req, deadline_configs.get(req.title)) else None,
                 "is_expired": is_request_expired(req, deadline_configs.get(req.title))
             }
             for req in processed_requests
         ]
     except Exception as e:
-        end_time = time.time()
-        print(f"get_requests run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=500, detail=f"Error fetching requests: {str(e)}")
 
 @app.post("/update_status")
 async def update_status(request: Request, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     data = await request.json()
     request_id = data.get("request_id")
     new_status = data.get("status")
     
     if not request_id or not new_status:
-        end_time = time.time()
-        print(f"update_status run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=400, detail="Missing request_id or status")
     
     # Get the request
@@ -790,15 +707,11 @@ async def update_status(request: Request, session: AsyncSession = Depends(get_se
     request_obj = result.scalar_one_or_none()
     
     if not request_obj:
-        end_time = time.time()
-        print(f"update_status run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="Request not found")
     
     # Check if request is expired
-    deadline_config = await get_deadline_config(session, request_obj.title)
+    deadline_config = (await template_registry.get(session)).deadline_configs.get(request_obj.title)
     if is_request_expired(request_obj, deadline_config):
-        end_time = time.time()
-        print(f"update_status run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(
             status_code=400, 
             detail="Cannot update status of an expired request. The deadline for this request type has passed."
@@ -808,17 +721,7 @@ async def update_status(request: Request, session: AsyncSession = Depends(get_se
     old_status = request_obj.status
     request_obj.status = new_status
     
-    # Update timeline
-    if not request_obj.timeline:
-        request_obj.timeline = {}
-    if "status_changes" not in request_obj.timeline:
-        request_obj.timeline["status_changes"] = []
-    
-    request_obj.timeline["status_changes"].append({
-        "from": old_status,
-        "to": new_status,
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    record_request_event(session, request_obj, "status_change", from_status=old_status, to_status=new_status)
     
     # Create notification for the student
     await create_notification(
@@ -835,32 +738,22 @@ async def update_status(request: Request, session: AsyncSession = Depends(get_se
         content=f"Your request '{request_obj.title}' status has been changed from '{old_status}' to '{new_status}'"
     )
 
-    flag_modified(request_obj, "timeline")
-    flag_modified(request_obj, "status")
     await session.commit()
     
-    end_time = time.time()
-    print(f"update_status run-time is {end_time - start_time:.3f} sec")
     return {"message": "Status updated successfully"}
 
 @app.get("/requests/professor/{professor_email}")
 async def get_professor_requests(professor_email: str, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     try:
         result = await session.execute(
             select(Courses.id).where(Courses.professor_email == professor_email))
         course_ids = [row[0] for row in result.all()]
 
         if not course_ids:
-            end_time = time.time()
-            print(f"get_professor_requests run-time is {end_time - start_time:.3f} sec")
             return []
 
-        # Fetch ALL deadline configurations once to avoid N+1 queries
-        deadline_configs_result = await session.execute(
-            select(RequestDeadlineConfig).where(RequestDeadlineConfig.is_active == True)
-        )
-        deadline_configs = {config.request_type: config for config in deadline_configs_result.scalars().all()}
+        # Active deadline rules by request type, from the in-process registry
+        deadline_configs = (await template_registry.get(session)).deadline_configs
 
         result = await session.execute(
             select(Requests).where(
@@ -878,29 +771,15 @@ async def get_professor_requests(professor_email: str, session: AsyncSession = D
                 old_status = req.status
                 req.status = "expired"
                 
-                # Update timeline
-                if not req.timeline:
-                    req.timeline = {}
-                if "status_changes" not in req.timeline:
-                    req.timeline["status_changes"] = []
-                
-                req.timeline["status_changes"].append({
-                    "from": old_status,
-                    "to": "expired",
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "reason": "deadline_passed"
-                })
-                
-                # Mark timeline as modified for SQLAlchemy
-                flag_modified(req, "timeline")
+                record_request_event(session, req, "status_change", from_status=old_status, to_status="expired",
+                                     reason="deadline_passed")
                 
             processed_requests.append(req)
         
         # Commit all status updates
         await session.commit()
+        timelines = await load_request_timelines(session, processed_requests)
 
-        end_time = time.time()
-        print(f"get_professor_requests run-time is {end_time - start_time:.3f} sec")
         return [
             {
                 "id": req.id,
@@ -910,7 +789,7 @@ async def get_professor_requests(professor_email: str, session: AsyncSession = D
                 "files": req.files,
                 "status": req.status,
                 "created_date": str(req.created_date),
-                "timeline": req.timeline,
+                "timeline": timelines[req.id],
                 "course_id": req.course_id,
                 "course_component": req.course_component,
                 "deadline_date": get_request_deadline_date(req, deadline_configs.get(req.title)).isoformat() if get_request_deadline_date(req, deadline_configs.get(req.title)) else None,
@@ -920,14 +799,11 @@ async def get_professor_requests(professor_email: str, session: AsyncSession = D
         ]
 
     except Exception as e:
-        end_time = time.time()
-        print(f"get_professor_requests run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=500, detail=f"Error fetching requests: {str(e)}")
 
 
 @app.post("/create_user")
 async def create_user(request: Request, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     data = await request.json()
     first_name = data.get("first_name")
     last_name = data.get("last_name")
@@ -939,37 +815,107 @@ async def create_user(request: Request, session: AsyncSession = Depends(get_sess
     # This already handles adding the student/professor internally:
     new_user = await add_user(session, email, first_name, last_name, hashed_password, role)
 
-    end_time = time.time()
-    print(f"create_user run-time is {end_time - start_time:.3f} sec")
     return {"message": "User created successfully", "user_email": new_user.email}
 
 
-@app.get("/users")
-async def get_users(role: str = None, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
-    query = select(Users)
-    if role:
-        query = query.where(Users.role == role)
-    result = await session.execute(query)
-    end_time = time.time()
-    print(f"get_users run-time is {end_time - start_time:.3f} sec")
-    return result.scalars().all()
+class UserResponse(BaseModel):
+    email: str
+    id: Optional[int] = None
+    first_name: str
+    last_name: str
+    role: str
+
+    class Config:
+        from_attributes = True
 
+class RoleDataResponse(BaseModel):
+    email: str
+    department_id: Optional[str] = None
 
-@app.get("/courses")
+    class Config:
+        from_attributes = True
+
+class UserDetailResponse(UserResponse):
+    student_data: Optional[RoleDataResponse] = None
+    professor_data: Optional[RoleDataResponse] = None
+
+class CourseResponse(BaseModel):
+    id: str
+    name: str
+    description: Optional[str] = None
+    credits: float
+    professor_email: Optional[str] = None
+    department_id: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class UserDirectoryEntry(UserResponse):
+    department_id: Optional[str] = None
+
+class UserDirectoryQuery(BaseModel):
+    role: Optional[str] = None
+    department_id: Optional[str] = None
+    name_prefix: Optional[str] = None
+    limit: int = 50
+    cursor: Optional[str] = None
+    include_total: bool = False
+
+class UserDirectoryPage(BaseModel):
+    items: List[UserDirectoryEntry]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+# Upper bound on one page of the user directory
+MAX_USER_PAGE = 200
+
+def user_directory_entries(rows) -> list:
+    return [
+        {"email": email, "id": id, "first_name": first_name, "last_name": last_name, "role": role,
+         "department_id": department_id}
+        for email, id, first_name, last_name, role, department_id in rows
+    ]
+
+@app.get("/users", response_model=List[UserDirectoryEntry])
+async def get_users(
+    response: Response,
+    role: str = None,
+    department_id: Optional[str] = None,
+    name_prefix: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_USER_PAGE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Users ordered by last name; every match unless a limit is given. Paging
+    state travels in the X-Next-Cursor and X-Total-Count headers so the body
+    stays a plain list for existing callers.
+    """
+    try:
+        rows, next_cursor, total = await get_user_directory(
+            session, role=role, department_id=department_id, name_prefix=name_prefix,
+            limit=limit, cursor=cursor, include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    return user_directory_entries(rows)
+
+
+@app.get("/courses", response_model=List[CourseResponse])
 async def get_courses(professor_email: bool = None, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     query = select(Courses)
     if professor_email:
         query = query.where(Courses.professor_email is not None)
     result = await session.execute(select(Courses))
-    end_time = time.time()
-    print(f"get_courses run-time is {end_time - start_time:.3f} sec")
     return result.scalars().all()
 
 @app.post("/Users/setRole")
 async def set_role(request: Request, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     data = await request.json()
     user_email = data.get("user_email")
     role = data.get("role")
@@ -980,62 +926,57 @@ async def set_role(request: Request, session: AsyncSession = Depends(get_session
     if user:
         user.role = role  # Update the role
         await session.commit()  # Commit changes
-        end_time = time.time()
-        print(f"set_role run-time is {end_time - start_time:.3f} sec")
         return {"message": "Role updated successfully", "user": {"email": user.email, "role": user.role}}
     else:
-        end_time = time.time()
-        print(f"set_role run-time is {end_time - start_time:.3f} sec")
         return {"error": "User not found"}
 
-@app.post("/Users/getUsers")
-async def get_users(request: Request, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
-    res = await session.execute(select(Users))
-    users = res.scalars().all()
-    end_time = time.time()
-    print(f"get_users run-time is {end_time - start_time:.3f} sec")
-    return users
+@app.post("/Users/getUsers", response_model=UserDirectoryPage)
+async def get_user_directory_page(
+    directory_query: Optional[UserDirectoryQuery] = Body(None),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """One page of the admin user directory, with an optional total for the filters"""
+    directory_query = directory_query or UserDirectoryQuery()
+    if not 1 <= directory_query.limit <= MAX_USER_PAGE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_USER_PAGE}")
+    try:
+        rows, next_cursor, total = await get_user_directory(
+            session, role=directory_query.role, department_id=directory_query.department_id,
+            name_prefix=directory_query.name_prefix, limit=directory_query.limit,
+            cursor=directory_query.cursor, include_total=directory_query.include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": user_directory_entries(rows), "next_cursor": next_cursor, "total": total}
 
 
-@app.post("/Users/getUser/{UserEmail}")
+@app.post("/Users/getUser/{UserEmail}", response_model=UserDetailResponse)
 async def get_user(UserEmail : str, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     res_user = await session.execute(select(Users).where(Users.email == UserEmail))
     user = res_user.scalars().first()
     if not user:
-        end_time = time.time()
-        print(f"get_user run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="User not found")
+    details = UserDetailResponse.model_validate(user)
 
     # Fetch role-specific data
     if user.role == "student":
         student_data = await session.execute(select(Students).filter(Students.email == user.email))
         student = student_data.scalars().first()
-        end_time = time.time()
-        print(f"get_user run-time is {end_time - start_time:.3f} sec")
-        return {**user.__dict__, "student_data": student}
+        details.student_data = RoleDataResponse.model_validate(student) if student else None
 
     if user.role == "professor":
         professor_data = await session.execute(select(Professors).filter(Professors.email == user.email))
         professor = professor_data.scalars().first()
-        end_time = time.time()
-        print(f"get_user run-time is {end_time - start_time:.3f} sec")
-        return {**user.__dict__, "professor_data": professor}
+        details.professor_data = RoleDataResponse.model_validate(professor) if professor else None
 
-    end_time = time.time()
-    print(f"get_user run-time is {end_time - start_time:.3f} sec")
-    return user
+    return details
 
 
 @app.get("/professor/courses/{professor_email}")
 async def get_courses(professor_email: str, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     result = await session.execute(select(Professors).filter(Professors.email == professor_email))
     professor = result.scalar_one_or_none()
     if not professor:
-        end_time = time.time()
-        print(f"get_courses run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="Professor not found")
 
     result = await session.execute(select(Courses).filter(Courses.professor_email == professor_email))
@@ -1051,8 +992,6 @@ async def get_courses(professor_email: str, session: AsyncSession = Depends(get_
     } for course in courses]
     courses_names = [course.name for course in courses]
 
-    end_time = time.time()
-    print(f"get_courses run-time is {end_time - start_time:.3f} sec")
     return {"courses": courses_data}
 
 
@@ -1064,13 +1003,10 @@ async def submit_grades(
         session: AsyncSession = Depends(get_session),
         token_data: dict = Depends(verify_token_professor)
 ):
-    start_time = time.time()
     grade_component = data.get("gradeComponent")
     grades = data.get("grades")  # dict: { "student@email.com": 95 }
 
     if not grade_component or not grades:
-        end_time = time.time()
-        print(f"submit_grades run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=400, detail="Missing grade component or grades")
 
     professor_email = token_data.get("user_email")
@@ -1081,8 +1017,6 @@ async def submit_grades(
         )
         student = result.scalar_one_or_none()
         if not student:
-            end_time = time.time()
-            print(f"submit_grades run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=404, detail=f"Student {student_email} not found")
 
         # Check if grade exists
@@ -1109,15 +1043,12 @@ async def submit_grades(
             session.add(new_grade)
 
     await session.commit()
-    end_time = time.time()
-    print(f"submit_grades run-time is {end_time - start_time:.3f} sec")
     return {"message": "Grades submitted successfully"}
 
 
 @app.get("/course/{course_id}/students")
 async def get_students(course_id: str, session: AsyncSession = Depends(get_session),
                        token_data: dict = Depends(verify_token_professor)):
-    start_time = time.time()
     result = await session.execute(
         select(Courses)
         .filter(Courses.id == course_id)
@@ -1126,12 +1057,8 @@ async def get_students(course_id: str, session: AsyncSession = Depends(get_sessi
     course = result.scalars().first()
 
     if not course:
-        end_time = time.time()
-        print(f"get_students run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="Course not found")
 
-    end_time = time.time()
-    print(f"get_students run-time is {end_time - start_time:.3f} sec")
     return jsonable_encoder(course.students)
 
 
@@ -1141,7 +1068,6 @@ async def create_general_request(
         request: Request,
         session: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     data = await request.json()
     title = data.get("title")
     student_email = data.get("student_email")
@@ -1151,24 +1077,21 @@ async def create_general_request(
     schedule_change = data.get("schedule_change")
     course_id = data.get("course_id")
     if not title or not student_email or not details:
-        end_time = time.time()
-        print(f"create_general_request run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=400, detail="Missing required fields")
 
-    timeline = {
-        "created": datetime.now().isoformat(),
-        "status_changes": [{
-            "status": "pending",
-            "date": datetime.now().isoformat()
-        }]
-    }
+    # Template-based requests are checked against their fields before anything is read or written
+    templates = await template_registry.get(session)
+    template = templates.by_name.get(title)
+    if template and template["is_active"]:
+        try:
+            validate_template_fields(template, templates.template_versions[template["id"]], data.get("custom_fields"))
+        except TemplateFieldsError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid request fields: {e}")
 
     # Add specific details based on request type
     if title == "Grade Appeal Request" and grade_appeal:
         required_keys = {"course_id", "grade_component", "current_grade"}
         if not required_keys.issubset(grade_appeal.keys()):
-            end_time = time.time()
-            print(f"create_general_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=400, detail="Invalid grade appeal data")
         course_id = grade_appeal.get('course_id')
         course_component = grade_appeal.get('grade_component')
@@ -1180,8 +1103,6 @@ async def create_general_request(
                 not isinstance(schedule_change["professors"], list) or
                 not schedule_change["professors"]
         ):
-            end_time = time.time()
-            print(f"create_general_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=400, detail="Invalid schedule change data")
         course_id = schedule_change.get('course_id')
         course_component = None
@@ -1195,19 +1116,16 @@ async def create_general_request(
     professor_email = None
 
     # Check routing rules for the request type
-    result = await session.execute(
-        select(RequestRoutingRules).where(RequestRoutingRules.type == title)
-    )
-    routing_rule = result.scalar_one_or_none()
+    routing_destination = templates.routing_rules.get(title)
 
     # If there's a routing rule and it specifies secretary, set course_id to None
-    if routing_rule and routing_rule.destination == "secretary":
+    if routing_destination == "secretary":
         course_id = None
         secretary = await session.execute(select(Secretaries).where(Secretaries.department_id == student.department_id))
         secretary_obj = secretary.scalar_one_or_none()
         secretary_email = secretary_obj.email if secretary_obj else None
 
-    if routing_rule and routing_rule.destination == "professor":
+    if routing_destination == "professor":
         professor = await session.execute(select(StudentCourses).where(and_(
             StudentCourses.student_email == student_email, StudentCourses.course_id == course_id)))
         professor_obj = professor.scalar_one_or_none()
@@ -1240,8 +1158,7 @@ async def create_general_request(
         course_component=course_component,
         files=files,
         status="pending",
-        created_date=datetime.now().date(),
-        timeline=timeline
+        created_date=datetime.now().date()
     )
 
     # send confirmation email to student
@@ -1251,58 +1168,40 @@ async def create_general_request(
         content=f"Hello {student_email}, \nYour {title} request has been submitted successfully. \nRequest ID: {new_request.id}"
     )
 
-    end_time = time.time()
-    print(f"create_general_request run-time is {end_time - start_time:.3f} sec")
     return {"message": "Request created successfully", "request_id": new_request.id}
 
 @app.delete("/Requests/{request_id}")
 async def delete_request(request_id: int, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     try:
         # Fetch the request to ensure it exists
         request = await session.get(Requests, request_id)
         if not request:
-            end_time = time.time()
-            print(f"delete_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=404, detail="Request not found")
         if request.status != "pending":
-            end_time = time.time()
-            print(f"delete_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=400, detail="Cannot delete a request that is not pending")
         # Delete the request
         await session.delete(request)
         await session.commit()
 
-        end_time = time.time()
-        print(f"delete_request run-time is {end_time - start_time:.3f} sec")
         return {"message": "Request deleted successfully"}
     except Exception as e:
-        end_time = time.time()
-        print(f"delete_request run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=500, detail=f"Error deleting request: {str(e)}")
 
 @app.put("/Requests/EditRequest/{request_id}")
 async def edit_request(request_id: int, request: Request, session: AsyncSession = Depends(get_session),
                        student: dict = Depends(verify_token_student)):
-    start_time = time.time()
     try:
         existing_request = await session.get(Requests, request_id)
         
         if not existing_request:
-            end_time = time.time()
-            print(f"edit_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=404, detail="Request not found")
         
         # Verify the student owns this request
         if existing_request.student_email != student.get('user_email'):
-            end_time = time.time()
-            print(f"edit_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=403, detail="You can only edit your own requests")
         
         # Check request status
         if existing_request.status not in ["pending", "require editing"]:
-            end_time = time.time()
-            print(f"edit_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(
                 status_code=400, 
                 detail=f"Cannot edit a request that is not pending or require editing. Current status: {existing_request.status}"
@@ -1311,75 +1210,34 @@ async def edit_request(request_id: int, request: Request, session: AsyncSession
         try:
             data = await request.json()
         except Exception as e:
-            end_time = time.time()
-            print(f"edit_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=400, detail="Invalid request data format")
         
         if "details" not in data:
-            end_time = time.time()
-            print(f"edit_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=400, detail="Missing 'details' in request data")
         
         # Edit the request
         existing_request.details = data["details"]
         
-        # Initialize timeline if it doesn't exist
-        if not existing_request.timeline:
-            existing_request.timeline = {
-                "created": existing_request.created_date.isoformat() if existing_request.created_date else datetime.now().isoformat(),
-                "status_changes": [],
-                "edits": []
-            }
-        
-        # Ensure timeline is a dictionary
-        if isinstance(existing_request.timeline, str):
-            try:
-                existing_request.timeline = json.loads(existing_request.timeline)
-            except json.JSONDecodeError:
-                existing_request.timeline = {
-                    "created": existing_request.created_date.isoformat() if existing_request.created_date else datetime.now().isoformat(),
-                    "status_changes": [],
-                    "edits": []
-                }
-        
-        # Add edit to timeline
-        if "edits" not in existing_request.timeline:
-            existing_request.timeline["edits"] = []
-        
-        existing_request.timeline["edits"].append({
-            "details": data["details"],
-            "date": datetime.now().isoformat()
-        })
+        record_request_event(session, existing_request, "edit", actor_email=existing_request.student_email,
+                             details=data["details"])
         
         try:
-            flag_modified(existing_request, "timeline")
             await session.commit()
         except Exception as e:
             await session.rollback()
-            end_time = time.time()
-            print(f"edit_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=500, detail=f"Error saving changes: {str(e)}")
 
-        end_time = time.time()
-        print(f"edit_request run-time is {end_time - start_time:.3f} sec")
         return {"message": "Request updated successfully"}
 
     except HTTPException as he:
-        end_time = time.time()
-        print(f"edit_request run-time is {end_time - start_time:.3f} sec")
         raise he
     except Exception as e:
         await session.rollback()
-        end_time = time.time()
-        print(f"edit_request run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=500, detail=f"Error editing request: {str(e)}")
 
 @app.get("/student/{student_email:path}/courses")
 async def get_student_courses(student_email: str, session: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     if not student_email or "@" not in student_email:
-        end_time = time.time()
-        print(f"get_student_courses run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="Student not found")
 
     # Query to get courses along with the grades for the student
@@ -1415,13 +1273,10 @@ async def get_student_courses(student_email: str, session: AsyncSession = Depend
 
     # Convert the dictionary to a list of courses
     courses_list = list(courses_data.values())
-    end_time = time.time()
-    print(f"get_student_courses run-time is {end_time - start_time:.3f} sec")
     return {"courses": courses_list}
 
 @app.get("/grades/{student_email}")
-async def get_grades(student_email: str, db: AsyncSession = Depends(get_session)):
-    start_time = time.time()
+async def get_grades(student_email: str, db: AsyncSession = Depends(get_read_session)):
     stmt = (
         select(Grades, Courses.name)
         .join(Courses, Courses.id == Grades.course_id)  # Join on course_id
@@ -1431,8 +1286,6 @@ async def get_grades(student_email: str, db: AsyncSession = Depends(get_session)
     grades = result.all()
 
     if not grades:
-        end_time = time.time()
-        print(f"get_grades run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="No grades found for this student")
 
     formatted_grades = [
@@ -1447,8 +1300,6 @@ async def get_grades(student_email: str, db: AsyncSession = Depends(get_session)
         for grade, course_name in grades
     ]
 
-    end_time = time.time()
-    print(f"get_grades run-time is {end_time - start_time:.3f} sec")
     return formatted_grades
 
 
@@ -1457,7 +1308,6 @@ async def assign_students(
         data: AssignStudentsRequest,
         db: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     stmt = select(StudentCourses).filter(StudentCourses.course_id == data.course_id)
     result = await db.execute(stmt)
     existing_students = result.scalars().all()
@@ -1472,8 +1322,6 @@ async def assign_students(
         await assign_student_to_course(db, email, data.course_id)
 
     await db.commit()
-    end_time = time.time()
-    print(f"assign_students run-time is {end_time - start_time:.3f} sec")
     return {"message": "Students assigned successfully"}
 
 
@@ -1482,7 +1330,6 @@ async def assign_professor(
         data: AssignProfessorRequest,
         db: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     result = await db.execute(select(Courses).filter(Courses.professor_email == data.professor_email))
     existing_courses = result.scalars().all()
 
@@ -1504,20 +1351,15 @@ async def assign_professor(
         await assign_professor_to_course(db, data.professor_email, course_id)
 
     await db.commit()
-    end_time = time.time()
-    print(f"assign_professor run-time is {end_time - start_time:.3f} sec")
     return {"message": "Courses assigned successfully"}
 
 
 
 @app.get("/assigned_students")
 async def get_assigned_students(course_id: str, db: AsyncSession = Depends(get_session)):
-    start_time = time.time()
     stmt = select(StudentCourses.student_email).filter(StudentCourses.course_id == course_id)
     result = await db.execute(stmt)
     assigned_students = result.scalars().all()
-    end_time = time.time()
-    print(f"get_assigned_students run-time is {end_time - start_time:.3f} sec")
     return [{"email": email} for email in assigned_students]
 
 
@@ -1545,13 +1387,10 @@ async def add_unavailability_period(
     period: UnavailabilityPeriod,
     session: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     # Verify professor exists
     result = await session.execute(select(Professors).where(Professors.email == professor_email))
     professor = result.scalar_one_or_none()
     if not professor:
-        end_time = time.time()
-        print(f"add_unavailability_period run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="Professor not found")
 
     # Create new unavailability period
@@ -1566,21 +1405,30 @@ async def add_unavailability_period(
     await session.commit()
     await session.refresh(new_period)
     
-    end_time = time.time()
-    print(f"add_unavailability_period run-time is {end_time - start_time:.3f} sec")
     return {"message": "Unavailability period added successfully", "period": new_period}
 
-@app.get("/professor/unavailability/{professor_email}")
+class UnavailabilityPeriodResponse(BaseModel):
+    id: int
+    professor_email: str
+    start_date: date
+    end_date: date
+    reason: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class UnavailabilityPeriodsResponse(BaseModel):
+    periods: List[UnavailabilityPeriodResponse]
+
+@app.get("/professor/unavailability/{professor_email}", response_model=UnavailabilityPeriodsResponse)
 async def get_unavailability_periods(
     professor_email: str,
     session: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     result = await session.execute(select(Professors).where(Professors.email == professor_email))
     professor = result.scalar_one_or_none()
     if not professor:
-        end_time = time.time()
-        print(f"get_unavailability_periods run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="Professor not found")
 
     result = await session.execute(
@@ -1590,8 +1438,6 @@ async def get_unavailability_periods(
     )
     periods = result.scalars().all()
     
-    end_time = time.time()
-    print(f"get_unavailability_periods run-time is {end_time - start_time:.3f} sec")
     return {"periods": periods}
 
 @app.delete("/professor/unavailability/{period_id}")
@@ -1599,18 +1445,13 @@ async def delete_unavailability_period(
     period_id: int,
     session: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     period = await session.get(ProfessorUnavailability, period_id)
     if not period:
-        end_time = time.time()
-        print(f"delete_unavailability_period run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="Unavailability period not found")
 
     await session.delete(period)
     await session.commit()
     
-    end_time = time.time()
-    print(f"delete_unavailability_period run-time is {end_time - start_time:.3f} sec")
     return {"message": "Unavailability period deleted successfully"}
 
 @app.get("/professor/availability/{professor_email}")
@@ -1619,12 +1460,9 @@ async def check_professor_availability(
     date: datetime,
     session: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     result = await session.execute(select(Professors).where(Professors.email == professor_email))
     professor = result.scalar_one_or_none()
     if not professor:
-        end_time = time.time()
-        print(f"check_professor_availability run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="Professor not found")
 
     result = await session.execute(
@@ -1637,8 +1475,6 @@ async def check_professor_availability(
     )
     periods = result.scalars().all()
     
-    end_time = time.time()
-    print(f"check_professor_availability run-time is {end_time - start_time:.3f} sec")
     if periods:
         return {
             "is_available": False,
@@ -1654,7 +1490,6 @@ async def get_student_professor(
     course_id: str,
     session: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     result = await session.execute(
         select(StudentCourses.professor_email)
         .where(
@@ -1664,11 +1499,7 @@ async def get_student_professor(
     )
     student_course = result.scalars().first()
     if not student_course:
-        end_time = time.time()
-        print(f"get_student_professor run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=404, detail="No professor found for this student in the specified course")
-    end_time = time.time()
-    print(f"get_student_professor run-time is {end_time - start_time:.3f} sec")
     return {"professor_email": student_course}
 
 @app.get("/student/{student_email}/professors")
@@ -1676,15 +1507,12 @@ async def get_student_professors(
     student_email: str,
     session: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     try:
         # First, get all courses for the student
         student_courses_query = select(StudentCourses).where(StudentCourses.student_email == student_email)
         student_courses = (await session.execute(student_courses_query)).scalars().all()
         
         if not student_courses:
-            end_time = time.time()
-            print(f"get_student_professors run-time is {end_time - start_time:.3f} sec")
             return {"professors": []}
             
         # Get unique professor emails from the courses
@@ -1706,92 +1534,72 @@ async def get_student_professors(
             for prof in professors
         ]
         
-        end_time = time.time()
-        print(f"get_student_professors run-time is {end_time - start_time:.3f} sec")
         return {"professors": professors_data}
     except Exception as e:
-        end_time = time.time()
-        print(f"get_student_professors run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def format_transfer_queue(rows, timelines, next_cursor) -> dict:
+    """Response body shared by the secretary and admin transfer queues"""
+    items = []
+    for request, first_name, last_name, department_id in rows:
+        items.append({
+            "id": request.id,
+            "title": request.title,
+            "student_email": request.student_email,
+            "student_name": f"{first_name} {last_name}" if first_name is not None else "Unknown",
+            "details": request.details,
+            "course_id": request.course_id,
+            "course_component": request.course_component,
+            "files": request.files,
+            "status": request.status,
+            "created_date": request.created_date,
+            "timeline": timelines[request.id],
+            "department_id": department_id
+        })
+    return {"items": items, "next_cursor": next_cursor}
+
 @app.get("/secretary/transfer-requests/{secretary_email}")
 async def get_department_transfer_requests(
     secretary_email: str,
-    session: AsyncSession = Depends(get_session),
-    token_data: dict = Depends(verify_token)
+    session: AsyncSession = Depends(get_read_session),
+    token_data: dict = Depends(verify_token),
+    status_filter: Optional[str] = Query("pending", alias="status"),
+    title: Optional[str] = None,
+    sort: str = "created_date",
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
 ):
-    start_time = time.time()
+    """One page of pending requests from the secretary's department, newest first by default"""
     # Verify the user is a secretary
     if token_data["role"] not in ["admin", "secretary"]:
-        end_time = time.time()
-        print(f"get_department_transfer_requests run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admin and secretary can access this endpoint"
         )
     
-    # Get secretary's department
-    secretary = await session.execute(
-        select(Secretaries).where(Secretaries.email == secretary_email)
-    )
-    secretary = secretary.scalar_one_or_none()
-    
-    if not secretary:
-        end_time = time.time()
-        print(f"get_department_transfer_requests run-time is {end_time - start_time:.3f} sec")
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Secretary not found"
-        )
-    
-    # Get all students in the same department
-    students = await session.execute(
-        select(Students).where(Students.department_id == secretary.department_id)
-    )
-    students = students.scalars().all()
-    
-    # Get all requests from these students
-    student_emails = [student.email for student in students]
-    requests = await session.execute(
-        select(Requests)
-        .where(
-            and_(
-                Requests.student_email.in_(student_emails),
-                Requests.status == "pending"
-            )
+    try:
+        rows, next_cursor = await get_transfer_queue(
+            session, secretary_email=secretary_email, status=status_filter, title=title,
+            sort=sort, descending=order == "desc", limit=limit, cursor=cursor
         )
-        .order_by(Requests.created_date.desc())
-    )
-    requests = requests.scalars().all()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # Format the response
-    formatted_requests = []
-    for request in requests:
-        # Get student details
-        student = await session.execute(
-            select(Users).where(Users.email == request.student_email)
+    if not rows and not cursor:
+        # An empty first page may just mean an unknown secretary
+        secretary = await session.execute(
+            select(Secretaries.email).where(Secretaries.email == secretary_email)
         )
-        student = student.scalar_one_or_none()
-        
-        formatted_request = {
-            "id": request.id,
-            "title": request.title,
-            "student_email": request.student_email,
-            "student_name": f"{student.first_name} {student.last_name}" if student else "Unknown",
-            "details": request.details,
-            "course_id": request.course_id,
-            "course_component": request.course_component,
-            "files": request.files,
-            "status": request.status,
-            "created_date": request.created_date,
-            "timeline": request.timeline
-        }
-        formatted_requests.append(formatted_request)
+        if secretary.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Secretary not found"
+            )
     
-    end_time = time.time()
-    print(f"get_department_transfer_requests run-time is {end_time - start_time:.3f} sec")
-    return formatted_requests
+    timelines = await load_request_timelines(session, [row[0] for row in rows])
+    return format_transfer_queue(rows, timelines, next_cursor)
 
 class ResponseRequest(BaseModel):
     request_id: int
@@ -1814,7 +1622,7 @@ async def submit_response(
         raise HTTPException(status_code=404, detail="Request not found")
     
     # Check if request is expired
-    deadline_config = await get_deadline_config(session, request_obj.title)
+    deadline_config = (await template_registry.get(session)).deadline_configs.get(request_obj.title)
     if is_request_expired(request_obj, deadline_config):
         raise HTTPException(
             status_code=400, 
@@ -1842,35 +1650,14 @@ async def submit_response(
     )
     session.add(new_response)
 
-    # Update request timeline with the response
-    if not request_obj.timeline:
-        request_obj.timeline = {}
-    
-    if "responses" not in request_obj.timeline:
-        request_obj.timeline["responses"] = []
-    
-    request_obj.timeline["responses"].append({
-        "professor_email": professor_email,
-        "response_text": response_text,
-        "files": file_metadata,
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    record_request_event(session, request_obj, "response", actor_email=professor_email,
+                         response_text=response_text, files=file_metadata)
 
     # Also update request status
     old_status = request_obj.status
     request_obj.status = "responded"
-
-    # And add a status change to timeline
-    if "status_changes" not in request_obj.timeline:
-        request_obj.timeline["status_changes"] = []
-
-    request_obj.timeline["status_changes"].append({
-        "from": old_status,
-        "to": "responded",
-        "timestamp": datetime.utcnow().isoformat()
-    })
-    
-    flag_modified(request_obj, "timeline")
+    record_request_event(session, request_obj, "status_change", actor_email=professor_email,
+                         from_status=old_status, to_status="responded")
     
     # Create notification for the student
     await create_notification(
@@ -1886,15 +1673,12 @@ async def submit_response(
     return {"message": "Response submitted successfully"}
 
 @app.get("/request/responses/{request_id}")
-async def get_request_responses(request_id: int, db: AsyncSession = Depends(get_session)):
-    start_time = time.time()
+async def get_request_responses(request_id: int, db: AsyncSession = Depends(get_read_session)):
     result = await db.execute(
         select(Responses).where(Responses.request_id == request_id)
     )
     responses = result.scalars().all()
 
-    end_time = time.time()
-    print(f"get_request_responses run-time is {end_time - start_time:.3f} sec")
     return [
         {
             "id": r.id,
@@ -1912,15 +1696,12 @@ async def get_student_courses_for_request(
     request_id: int,
     session: AsyncSession = Depends(get_session)
 ):
-    start_time = time.time()
     try:
         # Get the request to find the student email
         result = await session.execute(select(Requests).where(Requests.id == request_id))
         request = result.scalar_one_or_none()
         
         if not request:
-            end_time = time.time()
-            print(f"get_student_courses_for_request run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=404, detail="Request not found")
             
         # Get all courses for the student
@@ -1931,8 +1712,6 @@ async def get_student_courses_for_request(
         )
         courses = result.all()
         
-        end_time = time.time()
-        print(f"get_student_courses_for_request run-time is {end_time - start_time:.3f} sec")
         return [{
             "course_id": course.id,
             "course_name": course.name,
@@ -1940,8 +1719,6 @@ async def get_student_courses_for_request(
         } for sc, course in courses]
         
     except Exception as e:
-        end_time = time.time()
-        print(f"get_student_courses_for_request run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=500, detail=str(e))
 
 class TransferRequest(BaseModel):
@@ -1955,196 +1732,144 @@ async def transfer_request(
     session: AsyncSession = Depends(get_session)
 ):
     try:
-        new_course_id = transfer_data.get("new_course_id")
-        transfer_reason = transfer_data.get("reason", "No reason provided")
-        
-        # Get the request
-        result = await session.execute(select(Requests).where(Requests.id == request_id))
-        request = result.scalar_one_or_none()
-        
-        if not request:
+        transferred = await transfer_requests(
+            session, [request_id],
+            new_course_id=transfer_data.get("new_course_id"),
+            reason=transfer_data.get("reason", "No reason provided")
+        )
+        if not transferred:
             raise HTTPException(status_code=404, detail="Request not found")
-            
-        # Update the course_id (can be null)
-        request.course_id = new_course_id
+        return {"message": "Request transferred successfully"}
         
-        # Update timeline
-        if not request.timeline:
-            request.timeline = {
-                "created": request.created_date.isoformat() if request.created_date else datetime.now().isoformat(),
-                "status_changes": []
-            }
-            
-        request.timeline["status_changes"].append({
-            "status": "transferred",
-            "new_course_id": new_course_id if new_course_id else "Department Secretary",
-            "reason": transfer_reason,
-            "date": datetime.now().isoformat()
-        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Create notifications
-        # 1. Notify the student
-        if new_course_id:
-            # Get the professor for this course from student_courses
-            result = await session.execute(
-                select(StudentCourses)
-                .where(
-                    and_(
-                        StudentCourses.course_id == new_course_id,
-                        StudentCourses.student_email == request.student_email
-                    )
-                )
-            )
-            student_course = result.scalar_one_or_none()
-            
-            if student_course and student_course.professor_email:
-                await create_notification(
-                    session=session,
-                    user_email=request.student_email,
-                    request_id=request_id,
-                    message=f"Your request '{request.title}' has been transferred to {student_course.professor_email}. Reason: {transfer_reason}",
-                    type="transfer"
-                )
-            else:
-                await create_notification(
-                    session=session,
-                    user_email=request.student_email,
-                    request_id=request_id,
-                    message=f"Your request '{request.title}' has been transferred to Department Secretary. Reason: {transfer_reason}",
-                    type="transfer"
-                )
-        else:
-            await create_notification(
-                session=session,
-                user_email=request.student_email,
-                request_id=request_id,
-                message=f"Your request '{request.title}' has been transferred to Department Secretary. Reason: {transfer_reason}",
-                type="transfer"
-            )
+class BatchTransferRequest(BaseModel):
+    request_ids: List[int]
+    new_course_id: Optional[str] = None
+    reason: str = "No reason provided"
 
-        # 2. If transferred to a course, notify the professor
-        if new_course_id:
-            # Get the professor for this course from student_courses
-            result = await session.execute(
-                select(StudentCourses)
-                .where(
-                    and_(
-                        StudentCourses.course_id == new_course_id,
-                        StudentCourses.student_email == request.student_email
-                    )
-                )
-            )
-            student_course = result.scalar_one_or_none()
-            
-            if student_course and student_course.professor_email:
-                await create_notification(
-                    session=session,
-                    user_email=student_course.professor_email,
-                    request_id=request_id,
-                    message=f"A new request '{request.title}' has been assigned to you from {request.student_email}. Reason for transfer: {transfer_reason}",
-                    type="transfer"
-                )
-        else:
-            # If transferred to Department Secretary, notify the relevant secretary
-            # First get the student's department
-            result = await session.execute(
-                select(Students).where(Students.email == request.student_email)
-            )
-            student = result.scalar_one_or_none()
-            
-            if student and student.department_id:
-                # Get the secretary for this department
-                result = await session.execute(
-                    select(Secretaries).where(Secretaries.department_id == student.department_id)
-                )
-                secretary = result.scalar_one_or_none()
-                
-                if secretary:
-                    await create_notification(
-                        session=session,
-                        user_email=secretary.email,
-                        request_id=request_id,
-                        message=f"A new request '{request.title}' has been transferred to you from {request.student_email}. Reason for transfer: {transfer_reason}",
-                        type="transfer"
-                    )
-        
-        await session.commit()
-        return {"message": "Request transferred successfully"}
-        
+# Upper bound on one batch transfer, to keep the transaction short
+MAX_TRANSFER_BATCH = 200
+
+@app.put("/requests/transfer")
+async def transfer_requests_batch(
+    transfer_data: BatchTransferRequest,
+    session: AsyncSession = Depends(get_session),
+    token_data: dict = Depends(verify_token)
+):
+    """
+    Re-route several requests to the same course (or back to the department) at once.
+
+    Secretaries can only move requests from their own department; other ids are
+    reported as not found, without saying whether they exist.
+    """
+    if token_data["role"] not in ["admin", "secretary"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin and secretary can access this endpoint"
+        )
+    if not transfer_data.request_ids or len(transfer_data.request_ids) > MAX_TRANSFER_BATCH:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {MAX_TRANSFER_BATCH} request ids")
+    try:
+        transferred = await transfer_requests(
+            session, transfer_data.request_ids,
+            new_course_id=transfer_data.new_course_id,
+            reason=transfer_data.reason,
+            actor_email=token_data["user_email"],
+            secretary_email=token_data["user_email"] if token_data["role"] == "secretary" else None
+        )
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+    transferred_ids = {request.id for request in transferred}
+    return {
+        "transferred": sorted(transferred_ids),
+        "not_found": sorted(set(transfer_data.request_ids) - transferred_ids)
+    }
 
 @app.get("/admin/transfer-requests")
 async def get_all_transfer_requests(
-    session: AsyncSession = Depends(get_session),
-    token_data: dict = Depends(verify_token)
+    session: AsyncSession = Depends(get_read_session),
+    token_data: dict = Depends(verify_token),
+    status_filter: Optional[str] = Query("pending", alias="status"),
+    title: Optional[str] = None,
+    sort: str = "created_date",
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
 ):
-    start_time = time.time()
+    """One page of pending requests across all departments, newest first by default"""
     # Verify the user is an admin
     if token_data["role"] != "admin":
-        end_time = time.time()
-        print(f"get_all_transfer_requests run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admin can access this endpoint"
         )
     
-    # Get all pending requests
-    requests = await session.execute(
-        select(Requests)
-        .where(Requests.status == "pending")
-        .order_by(Requests.created_date.desc())
-    )
-    requests = requests.scalars().all()
-    
-    # Format the response
-    formatted_requests = []
-    for request in requests:
-        # Get student details
-        student = await session.execute(
-            select(Users).where(Users.email == request.student_email)
-        )
-        student = student.scalar_one_or_none()
-        
-        # Get student's department
-        student_dept = await session.execute(
-            select(Students).where(Students.email == request.student_email)
+    try:
+        rows, next_cursor = await get_transfer_queue(
+            session, status=status_filter, title=title,
+            sort=sort, descending=order == "desc", limit=limit, cursor=cursor
         )
-        student_dept = student_dept.scalar_one_or_none()
-        
-        formatted_request = {
-            "id": request.id,
-            "title": request.title,
-            "student_email": request.student_email,
-            "student_name": f"{student.first_name} {student.last_name}" if student else "Unknown",
-            "details": request.details,
-            "course_id": request.course_id,
-            "course_component": request.course_component,
-            "files": request.files,
-            "status": request.status,
-            "created_date": request.created_date,
-            "timeline": request.timeline,
-            "department_id": student_dept.department_id if student_dept else None
-        }
-        formatted_requests.append(formatted_request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    end_time = time.time()
-    print(f"get_all_transfer_requests run-time is {end_time - start_time:.3f} sec")
-    return formatted_requests
+    timelines = await load_request_timelines(session, [row[0] for row in rows])
+    return format_transfer_queue(rows, timelines, next_cursor)
+
+@app.get("/api/search/requests")
+async def search_request_archive(
+    q: str,
+    session: AsyncSession = Depends(get_read_session),
+    token_data: dict = Depends(verify_token),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Full-text search over request titles, details and responses, limited to what the caller may see"""
+    try:
+        hits, next_cursor = await search_requests(
+            session, q, token_data["role"], token_data["user_email"], limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "items": [
+            {
+                "id": request.id,
+                "title": request.title,
+                "student_email": request.student_email,
+                "course_id": request.course_id,
+                "status": request.status,
+                "created_date": request.created_date,
+                "score": score
+            }
+            for request, score in hits
+        ],
+        "next_cursor": next_cursor
+    }
 
 # Notification endpoints
+@app.get("/notifications/unread_count")
+async def get_unread_notification_count(
+    session: AsyncSession = Depends(get_read_session),
+    token_data: dict = Depends(verify_token)
+):
+    """Unread count for the caller's notification badge"""
+    return {"unread_count": await count_unread_notifications(session, token_data["user_email"])}
+
 @app.get("/notifications/{user_email}")
 async def get_notifications(
     user_email: str,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     token_data: dict = Depends(verify_token)
 ):
-    start_time = time.time()
     try:
         notifications = await get_user_notifications(session, user_email)
-        end_time = time.time()
-        print(f"get_notifications run-time is {end_time - start_time:.3f} sec")
         return [
             {
                 "id": notification.id,
@@ -2157,8 +1882,6 @@ async def get_notifications(
             for notification in notifications
         ]
     except Exception as e:
-        end_time = time.time()
-        print(f"get_notifications run-time is {end_time - start_time:.3f} sec")
         print(f"Error in get_notifications: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -2168,36 +1891,31 @@ async def mark_notification_read(
     session: AsyncSession = Depends(get_session),
     token_data: dict = Depends(verify_token)
 ):
-    start_time = time.time()
     try:
         success = await mark_notification_as_read(session, notification_id)
         if not success:
-            end_time = time.time()
-            print(f"mark_notification_read run-time is {end_time - start_time:.3f} sec")
             raise HTTPException(status_code=404, detail="Notification not found")
-        end_time = time.time()
-        print(f"mark_notification_read run-time is {end_time - start_time:.3f} sec")
         return {"message": "Notification marked as read"}
     except Exception as e:
-        end_time = time.time()
-        print(f"mark_notification_read run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/notifications/read-all")
 async def mark_all_notifications_read(session: AsyncSession = Depends(get_session), token_data: dict = Depends(verify_token)):
-    start_time = time.time()
     try:
         count = await mark_all_notifications_as_read(session, token_data["user_email"])
-        end_time = time.time()
-        print(f"mark_all_notifications_read run-time is {end_time - start_time:.3f} sec")
         return {"message": f"{count} notifications marked as read"}
     except Exception as e:
-        end_time = time.time()
-        print(f"mark_all_notifications_read run-time is {end_time - start_time:.3f} sec")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/request_routing_rules")
+class RoutingRuleResponse(BaseModel):
+    type: str
+    destination: str
+
+    class Config:
+        from_attributes = True
+
+@app.get("/api/request_routing_rules", response_model=List[RoutingRuleResponse])
 async def get_request_routing_rules(session: AsyncSession = Depends(get_session)):
     try:
         result = await session.execute(select(RequestRoutingRules))
@@ -2233,6 +1951,7 @@ async def update_request_routing_rule(
             session.add(rule)
 
         await session.commit()
+        template_registry.invalidate()
         return {"message": "Routing rule updated successfully"}
     except Exception as e:
         await session.rollback()
@@ -2250,23 +1969,11 @@ async def generate_news_content(category: str) -> Dict[str, Any]:
         Dictionary with news content and metadata
     """
     try:
-        if not OPENAI_AVAILABLE or 'news_openai_client' not in globals():
+        client = get_openai_client() if OPENAI_AVAILABLE else None
+        if client is None:
             # Fallback to simulated news if OpenAI is not available
-            fallback_news = {
-                "breaking international news or current events": "BREAKING: International diplomatic summit concludes with historic agreements on climate cooperation and trade partnerships.",
-                "economic developments or market updates": "MARKETS: Global stock markets show positive trends as technology sector leads growth with 3.2% gains this quarter.",
-                "sports achievements or major sporting events": "SPORTS: Championship finals set new viewership records as teams compete in thrilling overtime matches.",
-                "political developments or government policy changes": "POLITICS: New legislative package focuses on infrastructure investment and renewable energy initiatives.",
-                "scientific discoveries or technological breakthroughs": "SCIENCE: Researchers announce breakthrough in renewable energy storage technology, increasing efficiency by 40%.",
-                "environmental news or climate updates": "ENVIRONMENT: Global conservation efforts show promising results with forest restoration projects exceeding targets.",
-                "health and medical news or breakthrough research": "HEALTH: Medical breakthrough in early disease detection shows 95% accuracy rate in clinical trials.",
-                "cultural events or entertainment industry news": "CULTURE: International arts festival showcases diverse talents from 50 countries in week-long celebration.",
-                "business mergers, acquisitions, or corporate developments": "BUSINESS: Major tech companies announce strategic partnerships to advance sustainable innovation goals.",
-                "social issues or humanitarian developments": "HUMANITARIAN: Relief organizations report successful aid distribution to affected regions, reaching 100,000 people."
-            }
-            
             return {
-                "content": fallback_news.get(category, "NEWS: Important developments continue to shape global events."),
+                "content": FALLBACK_NEWS.get(category, DEFAULT_FALLBACK_NEWS),
                 "source": "fallback",
                 "success": True
             }
@@ -2284,7 +1991,7 @@ Requirements:
 - Focus on positive or neutral developments"""
 
         # Call OpenAI API directly for news generation
-        response = await news_openai_client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -2338,90 +2045,49 @@ class RequestTemplateRequest(BaseModel):
 
 @app.get("/api/request_templates")
 async def get_request_templates(
+    request: Request,
     active_only: bool = True,
     session: AsyncSession = Depends(get_session)
 ):
     """Get all request templates with their fields."""
     try:
-        from backend.db_connection import get_request_templates
-        templates = await get_request_templates(session, active_only)
-        
-        result = []
-        for template in templates:
-            template_data = {
-                "id": template.id,
-                "name": template.name,
-                "description": template.description,
-                "is_active": template.is_active,
-                "created_by": template.created_by,
-                "created_date": template.created_date.isoformat(),
-                "updated_date": template.updated_date.isoformat(),
-                "fields": []
-            }
-            
-            # Sort fields by field_order
-            sorted_fields = sorted(template.fields, key=lambda f: f.field_order)
-            for field in sorted_fields:
-                field_data = {
-                    "id": field.id,
-                    "field_name": field.field_name,
-                    "field_label": field.field_label,
-                    "field_type": field.field_type,
-                    "field_options": field.field_options,
-                    "is_required": field.is_required,
-                    "field_order": field.field_order,
-                    "validation_rules": field.validation_rules,
-                    "placeholder": field.placeholder,
-                    "help_text": field.help_text
-                }
-                template_data["fields"].append(field_data)
-            
-            result.append(template_data)
-        
-        return result
+        # Served from the registry; reloads use the primary so they never cache replica lag
+        snapshot = await template_registry.get(session)
+        etag = f'"{snapshot.version}-{"active" if active_only else "all"}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        templates = [t for t in snapshot.templates if t["is_active"] or not active_only]
+        return JSONResponse(content=templates, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def template_response(request: Request, snapshot, template: dict, keys=None):
+    """Serve one registry template with its own ETag, or a 304 when the client's copy is current."""
+    etag = f'"{snapshot.template_versions[template["id"]]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    content = {key: template[key] for key in keys} if keys else template
+    return JSONResponse(content=content, headers=headers)
+
 @app.get("/api/request_templates/{template_id}")
 async def get_request_template(
     template_id: int,
+    request: Request,
     session: AsyncSession = Depends(get_session)
 ):
     """Get a specific request template by ID."""
     try:
-        from backend.db_connection import get_request_template_by_id
-        template = await get_request_template_by_id(session, template_id)
+        snapshot = await template_registry.get(session)
+        template = snapshot.by_id.get(template_id)
         
         if not template:
             raise HTTPException(status_code=404, detail="Template not found")
         
-        # Sort fields by field_order
-        sorted_fields = sorted(template.fields, key=lambda f: f.field_order)
-        
-        return {
-            "id": template.id,
-            "name": template.name,
-            "description": template.description,
-            "is_active": template.is_active,
-            "created_by": template.created_by,
-            "created_date": template.created_date.isoformat(),
-            "updated_date": template.updated_date.isoformat(),
-            "fields": [
-                {
-                    "id": field.id,
-                    "field_name": field.field_name,
-                    "field_label": field.field_label,
-                    "field_type": field.field_type,
-                    "field_options": field.field_options,
-                    "is_required": field.is_required,
-                    "field_order": field.field_order,
-                    "validation_rules": field.validation_rules,
-                    "placeholder": field.placeholder,
-                    "help_text": field.help_text
-                }
-                for field in sorted_fields
-            ]
-        }
+        return template_response(request, snapshot, template)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -2467,6 +2133,7 @@ async def create_request_template(
         routing_rule = RequestRoutingRules(type=template_data.name, destination="secretary")
         session.add(routing_rule)
         await session.commit()
+        template_registry.invalidate()
         
         return {"message": "Template created successfully", "template_id": template.id}
     except Exception as e:
@@ -2566,40 +2233,19 @@ async def get_request_template_names(session: AsyncSession = Depends(get_session
 @app.get("/api/request_templates/by_name/{template_name}")
 async def get_request_template_by_name_endpoint(
     template_name: str,
+    request: Request,
     session: AsyncSession = Depends(get_session)
 ):
     """Get a specific request template by name (for form generation)."""
     try:
-        from backend.db_connection import get_request_template_by_name
-        template = await get_request_template_by_name(session, template_name)
+        snapshot = await template_registry.get(session)
+        template = snapshot.by_name.get(template_name)
         
         if not template:
             # Return null for legacy templates that don't have custom fields
             return None
         
-        # Sort fields by field_order
-        sorted_fields = sorted(template.fields, key=lambda f: f.field_order)
-        
-        return {
-            "id": template.id,
-            "name": template.name,
-            "description": template.description,
-            "fields": [
-                {
-                    "id": field.id,
-                    "field_name": field.field_name,
-                    "field_label": field.field_label,
-                    "field_type": field.field_type,
-                    "field_options": field.field_options,
-                    "is_required": field.is_required,
-                    "field_order": field.field_order,
-                    "validation_rules": field.validation_rules,
-                    "placeholder": field.placeholder,
-                    "help_text": field.help_text
-                }
-                for field in sorted_fields
-            ]
-        }
+        return template_response(request, snapshot, template, keys=("id", "name", "description", "fields"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -2675,7 +2321,7 @@ async def delete_comment_template(
 @app.get("/secretary/department-students/{secretary_email}")
 async def get_department_students(
     secretary_email: str, 
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get all students in the secretary's department for filtering purposes"""
     try:
@@ -2716,16 +2362,13 @@ async def get_reports(
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         student_email: Optional[str] = None,
-        session: AsyncSession = Depends(get_session)
+        session: AsyncSession = Depends(get_read_session)
 ):
     """
     Get custom reports for users by role: professor, admin, secretary.
     """
     from datetime import datetime, timedelta
     from collections import defaultdict
-    import time
-
-    start_time = time.time()
 
     try:
         # --- Step 1: Determine course access by role ---
@@ -2755,7 +2398,6 @@ async def get_reports(
         course_ids = [course.id for course in courses]
 
         if not course_ids:
-            print(f"get_reports run-time is {time.time() - start_time:.3f} sec")
             return {
                 "summary": {
                     "totalRequests": 0,
@@ -2783,7 +2425,8 @@ async def get_reports(
         if course_id:
             query = query.where(Requests.course_id == course_id)
         if request_type:
-            query = query.where(Requests.title.ilike(f"%{request_type}%"))
+            # The report filter offers exact types; free text goes through /api/search/requests
+            query = query.where(Requests.title == request_type)
         if status:
             query = query.where(Requests.status == status)
         if start_date:
@@ -2844,6 +2487,7 @@ async def get_reports(
                 .limit(5)
             )
             latest_requests = latest_requests_result.scalars().all()
+            timelines = await load_request_timelines(session, latest_requests)
 
             for req in latest_requests:
                 course_result = await session.execute(
@@ -2859,7 +2503,7 @@ async def get_reports(
                     "details": req.details,
                     "created_date": req.created_date.isoformat() if req.created_date else None,
                     "files": req.files,
-                    "timeline": req.timeline
+                    "timeline": timelines[req.id]
                 })
 
         # --- Step 6: Summary stats ---
@@ -2920,7 +2564,6 @@ async def get_reports(
         courses_data = [{"id": c.id, "name": c.name} for c in courses]
         students_data = [{"email": s.email, "name": f"{s.first_name} {s.last_name}"} for s in students]
 
-        print(f"get_reports run-time is {time.time() - start_time:.3f} sec")
 
         return {
             "summary": {
@@ -3033,46 +2676,23 @@ async def delete_deadline_config(
 @app.get("/api/request_template_by_name/{template_name}")
 async def get_request_template_by_name(
     template_name: str,
+    request: Request,
     session: AsyncSession = Depends(get_session)
 ):
     """Get a specific request template by name."""
     try:
-        from backend.db_connection import get_request_template_by_name
-        template = await get_request_template_by_name(session, template_name)
+        snapshot = await template_registry.get(session)
+        template = snapshot.by_name.get(template_name)
         
         if not template:
             raise HTTPException(status_code=404, detail="Template not found")
         
-        # Sort fields by field_order
-        sorted_fields = sorted(template.fields, key=lambda f: f.field_order)
-        
-        return {
-            "id": template.id,
-            "name": template.name,
-            "description": template.description,
-            "is_active": template.is_active,
-            "created_by": template.created_by,
-            "created_date": template.created_date.isoformat(),
-            "updated_date": template.updated_date.isoformat(),
-            "fields": [
-                {
-                    "id": field.id,
-                    "field_name": field.field_name,
-                    "field_label": field.field_label,
-                    "field_type": field.field_type,
-                    "field_options": field.field_options,
-                    "is_required": field.is_required,
-                    "field_order": field.field_order,
-                    "validation_rules": field.validation_rules,
-                    "placeholder": field.placeholder,
-                    "help_text": field.help_text
-                }
-                for field in sorted_fields
-            ]
-        }
+        return template_response(request, snapshot, template)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # Import deadline checking functions
-from backend.db_connection import get_deadline_config, is_request_expired, get_request_deadline_date
+from backend.db_connection import is_request_expired, get_request_deadline_date
 
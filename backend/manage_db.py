@@ -0,0 +1,49 @@
+"""
+Database maintenance commands.
+
+    python -m backend.manage_db init    # create the database and migrate it to the latest revision
+    python -m backend.manage_db check   # exit with status 1 unless the schema is at the expected revision
+
+The application never creates or migrates the schema itself; it only checks
+the revision on startup.
+"""
+import argparse
+import asyncio
+import sys
+
+from backend.db_connection import engine, init_db, check_schema_version, SchemaVersionError, SCHEMA_VERSION
+
+
+async def _init():
+    try:
+        await init_db()
+        print(f"✅ Database schema is at revision {await check_schema_version()}")
+    finally:
+        await engine.dispose()
+
+
+async def _check() -> int:
+    try:
+        await check_schema_version()
+        print(f"✅ Database schema is at revision {SCHEMA_VERSION}")
+        return 0
+    except SchemaVersionError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m backend.manage_db", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["init", "check"])
+    args = parser.parse_args(argv)
+
+    if args.command == "init":
+        asyncio.run(_init())
+        return 0
+    return asyncio.run(_check())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+"""
+In-process metrics rendered in the Prometheus text format.
+
+Metrics live in a module-level registry and are served by the `/metrics`
+endpoint. Values are per process, so with several uvicorn workers each
+worker reports its own numbers (Prometheus sums them per instance).
+"""
+import os
+import time
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines in the exposition format, without HELP and TYPE."""
+
+    @abstractmethod
+    def reset(self):
+        """Drop every recorded value."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(self.values.items())]
+
+    def reset(self):
+        self.values.clear()
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # key -> (per-bucket counts, sum, count)
+        self.series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self.series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def reset(self):
+        self.series.clear()
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        # Called before rendering, for values read on demand (e.g. pool state)
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            collector()
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+
+REGISTRY = MetricsRegistry()
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled.", ("method",)
+)
+
+HTTP_REQUEST_DB_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"),
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100, 250)
+)
+HTTP_REQUEST_DB_SECONDS = REGISTRY.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route")
+)
+DB_SLOW_QUERIES = REGISTRY.counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_SECONDS.", ("route",)
+)
+
+DB_POOL_CONNECTIONS = REGISTRY.gauge(
+    "db_pool_connections", "Connections in the engine's pool by state.", ("engine", "state")
+)
+DB_POOL_SIZE = REGISTRY.gauge("db_pool_size", "Configured pool size.", ("engine",))
+DB_POOL_CHECKOUTS = REGISTRY.counter("db_pool_checkouts_total", "Connections checked out of the pool.", ("engine",))
+DB_POOL_CONNECTS = REGISTRY.counter("db_pool_connects_total", "New DBAPI connections opened.", ("engine",))
+DB_POOL_INVALIDATIONS = REGISTRY.counter(
+    "db_pool_invalidations_total", "Connections discarded as broken, including failed pre-pings.", ("engine",)
+)
+DB_POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds", "Time from asking the pool for a connection until it is checked out.",
+    ("engine",), buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+HTTP_RESPONSE_COMPRESSION_RATIO = REGISTRY.histogram(
+    "http_response_compression_ratio", "Compressed size over original size of compressed responses.",
+    ("route", "encoding"), buckets=(0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0)
+)
+HTTP_RESPONSE_COMPRESSION_SECONDS = REGISTRY.histogram(
+    "http_response_compression_cpu_seconds", "CPU time spent compressing each response.",
+    ("route", "encoding"), buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+HTTP_RESPONSE_BYTES = REGISTRY.counter(
+    "http_response_compression_bytes_total", "Bytes of compressed responses before and after compression.",
+    ("route", "encoding", "stage")
+)
+
+# Statements taking at least this long are logged together with the route that ran them
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_SECONDS", "0.5"))
+
+
+class RequestDbStats:
+    """SQL statements and time spent in them during one request."""
+
+    __slots__ = ("scope", "queries", "seconds")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def current_db_stats() -> Optional[RequestDbStats]:
+    return _request_db_stats.get()
+
+
+def instrument_engine(engine):
+    """Count statements and their duration for the current request, and log slow ones."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_times"].pop()
+        record_query(statement, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_times"):
+            elapsed = time.perf_counter() - conn.info["query_start_times"].pop()
+            record_query(exception_context.statement or "", elapsed)
+
+
+def pool_status(engine) -> Dict[str, int]:
+    """Current state of the engine's connection pool; empty for pools without a size (e.g. SQLite)."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+def instrument_pool(engine, name: str):
+    """Export the pool state of `engine` as gauges labelled with `name`, plus checkout counters and wait times."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    pool = sync_engine.pool
+    raw_connection = sync_engine.raw_connection
+
+    # The pool has no event for when a connection is requested, so time the
+    # engine call that asks for one: it covers waiting for a free connection,
+    # opening a new one and the pre-ping, and failures such as pool timeouts
+    def timed_raw_connection():
+        started = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, engine=name)
+
+    sync_engine.raw_connection = timed_raw_connection
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.inc(engine=name)
+
+    @event.listens_for(pool, "connect")
+    def _connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTS.inc(engine=name)
+
+    @event.listens_for(pool, "invalidate")
+    def _invalidate(dbapi_connection, connection_record, exception):
+        DB_POOL_INVALIDATIONS.inc(engine=name)
+
+    def collect():
+        status = pool_status(engine)
+        if not status:
+            return
+        DB_POOL_SIZE.set(status["size"], engine=name)
+        for state in ("checked_out", "checked_in", "overflow"):
+            DB_POOL_CONNECTIONS.set(status[state], engine=name, state=state)
+
+    REGISTRY.add_collector(collect)
+
+
+def record_query(statement: str, elapsed: float):
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+    if elapsed >= SLOW_QUERY_SECONDS:
+        route = route_label(stats.scope) if stats is not None else "background"
+        DB_SLOW_QUERIES.inc(route=route)
+        print(f"🐢 Slow query ({elapsed:.3f} sec) on {route}: {' '.join(statement.split())[:500]}")
+
+
+def route_label(scope) -> str:
+    """Path template of the matched route, so /requests/5 and /requests/6 share a series."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if path else "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status codes and in-flight requests per route.
+
+    It also tracks the SQL statements each request runs, reporting them in the
+    X-DB-Query-Count and Server-Timing response headers and as histograms.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        # The route is only known once the router has matched it, so in-flight is per method
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method)
+        stats = RequestDbStats(scope)
+        token = _request_db_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.queries).encode()))
+                headers.append((b"server-timing", f"db;dur={stats.seconds * 1000:.1f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_db_stats.reset(token)
+            elapsed = time.perf_counter() - start
+            route = route_label(scope)
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method)
+            HTTP_REQUEST_DURATION.observe(elapsed, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status_code))
+            HTTP_REQUEST_DB_QUERIES.observe(stats.queries, method=method, route=route)
+            HTTP_REQUEST_DB_SECONDS.observe(stats.seconds, method=method, route=route)
@@ -0,0 +1,52 @@
+"""Composite indexes on hot filter columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 16:40:02.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, foreign key column the index may be backing on MySQL)
+INDEXES = [
+    ('ix_requests_student_email_created_date', 'requests', ['student_email', 'created_date'], 'student_email'),
+    ('ix_requests_course_id_status', 'requests', ['course_id', 'status'], None),
+    ('ix_requests_status_title_created_date', 'requests', ['status', 'title', 'created_date'], None),
+    ('ix_notifications_user_email_is_read', 'notifications', ['user_email', 'is_read'], 'user_email'),
+    ('ix_system_announcements_is_active_expires_date', 'system_announcements', ['is_active', 'expires_date'], None),
+    ('ix_request_template_fields_template_id_field_order', 'request_template_fields', ['template_id', 'field_order'], 'template_id'),
+    ('ix_student_courses_course_id_professor_email', 'student_courses', ['course_id', 'professor_email'], 'course_id'),
+    ('ix_responses_request_id_created_date', 'responses', ['request_id', 'created_date'], 'request_id'),
+    ('ix_professor_unavailability_professor_email_start_date', 'professor_unavailability', ['professor_email', 'start_date'], 'professor_email'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns, _ in INDEXES:
+        # Databases adopted from create_all may already have them
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # MySQL drops its implicit foreign key index once a composite index can enforce
+    # the key, and refuses to drop that composite index again without a replacement
+    mysql = op.get_bind().dialect.name == 'mysql'
+    for name, table, columns, foreign_key_column in reversed(INDEXES):
+        if mysql and foreign_key_column:
+            op.create_index(f'ix_{table}_{foreign_key_column}', table, [foreign_key_column], unique=False)
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,45 @@
+"""Append-only request_events table for request timelines
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 19:05:41.502117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases adopted from create_all may already have it
+    if 'request_events' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table('request_events',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=30), nullable=False),
+    sa.Column('actor_email', sa.String(length=100), nullable=True),
+    sa.Column('from_status', sa.String(length=100), nullable=True),
+    sa.Column('to_status', sa.String(length=100), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['request_id'], ['requests.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_request_events_request_id_created_at', 'request_events', ['request_id', 'created_at'], unique=False)
+    op.create_index('ix_request_events_event_type_created_at', 'request_events', ['event_type', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping the table drops its indexes; on MySQL the first one backs the foreign key
+    op.drop_table('request_events')
@@ -0,0 +1,46 @@
+"""Notification archive table and inbox index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 20:12:37.840215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    # Databases adopted from create_all may already have both
+    if 'ix_notifications_user_email_created_date' not in {i['name'] for i in inspector.get_indexes('notifications')}:
+        op.create_index('ix_notifications_user_email_created_date', 'notifications', ['user_email', 'created_date'], unique=False)
+    if 'notification_archive' in inspector.get_table_names():
+        return
+    op.create_table('notification_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_email', sa.String(length=100), nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=True),
+    sa.Column('message', sa.String(length=500), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('created_date', sa.DateTime(), nullable=True),
+    sa.Column('archived_date', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_archive_user_email_created_date', 'notification_archive', ['user_email', 'created_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_archive')
+    # On MySQL ix_notifications_user_email_is_read (0002) still backs the user_email foreign key
+    op.drop_index('ix_notifications_user_email_created_date', table_name='notifications')
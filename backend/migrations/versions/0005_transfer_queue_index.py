@@ -0,0 +1,31 @@
+"""Index for keyset pages of the transfer queue
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 21:02:14.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases adopted from create_all may already have it
+    if 'ix_requests_status_created_date_id' in {i['name'] for i in sa.inspect(op.get_bind()).get_indexes('requests')}:
+        return
+    op.create_index('ix_requests_status_created_date_id', 'requests', ['status', 'created_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_requests_status_created_date_id', table_name='requests')
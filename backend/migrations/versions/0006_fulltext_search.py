@@ -0,0 +1,39 @@
+"""FULLTEXT indexes for request search (MySQL only)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 21:48:09.770352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    # Other databases search in process (see backend/search.py)
+    if bind.dialect.name != 'mysql':
+        return
+    inspector = sa.inspect(bind)
+    if 'ix_requests_title_details_fulltext' not in {i['name'] for i in inspector.get_indexes('requests')}:
+        op.create_index('ix_requests_title_details_fulltext', 'requests', ['title', 'details'], mysql_prefix='FULLTEXT')
+    if 'ix_responses_response_text_fulltext' not in {i['name'] for i in inspector.get_indexes('responses')}:
+        op.create_index('ix_responses_response_text_fulltext', 'responses', ['response_text'], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ix_responses_response_text_fulltext', table_name='responses')
+    op.drop_index('ix_requests_title_details_fulltext', table_name='requests')
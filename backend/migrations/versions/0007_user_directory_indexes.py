@@ -0,0 +1,39 @@
+"""Indexes for keyset pages of the user directory
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 22:31:40.127905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_users_role_last_name_email': ['role', 'last_name', 'email'],
+    'ix_users_last_name_email': ['last_name', 'email'],
+    'ix_users_first_name': ['first_name'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases adopted from create_all may already have them
+    existing = {i['name'] for i in sa.inspect(op.get_bind()).get_indexes('users')}
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'users', columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in reversed(list(INDEXES)):
+        op.drop_index(name, table_name='users')
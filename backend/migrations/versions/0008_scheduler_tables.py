@@ -0,0 +1,51 @@
+"""Lease and run-history tables for the scheduled jobs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 23:48:09.613274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    # Databases adopted from create_all may already have them
+    if 'scheduled_job_leases' not in tables:
+        op.create_table('scheduled_job_leases',
+        sa.Column('job_name', sa.String(length=100), nullable=False),
+        sa.Column('owner', sa.String(length=200), nullable=True),
+        sa.Column('locked_until', sa.DateTime(), nullable=True),
+        sa.Column('next_run_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('job_name')
+        )
+    if 'scheduled_job_runs' not in tables:
+        op.create_table('scheduled_job_runs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('job_name', sa.String(length=100), nullable=False),
+        sa.Column('owner', sa.String(length=200), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('detail', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_scheduled_job_runs_id'), 'scheduled_job_runs', ['id'], unique=False)
+        op.create_index(op.f('ix_scheduled_job_runs_job_name'), 'scheduled_job_runs', ['job_name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('scheduled_job_runs')
+    op.drop_table('scheduled_job_leases')
@@ -0,0 +1,43 @@
+"""
+Shared OpenAI client for the chatbot and news generation.
+
+The openai package takes a large share of the app's import time, so it is
+only imported, and the client only created, the first time a caller needs it.
+"""
+import importlib.util
+import os
+from pathlib import Path
+
+import dotenv
+
+# Load environment variables from .env file in backend directory
+dotenv.load_dotenv(Path(__file__).parent / '.env')
+
+_client = None
+
+
+def openai_configured() -> bool:
+    """Whether an API key is set and the openai package is installed, without importing it."""
+    return bool(os.environ.get('OPENAI_API_KEY')) and importlib.util.find_spec('openai') is not None
+
+
+def get_openai_client():
+    """Return the shared AsyncOpenAI client, creating it on first use. None when unavailable."""
+    global _client
+    if _client is None:
+        api_key = os.environ.get('OPENAI_API_KEY')
+        if not api_key:
+            return None
+        try:
+            from openai import AsyncOpenAI
+            _client = AsyncOpenAI(api_key=api_key)
+        except Exception as e:
+            print(f"ERROR: Failed to initialize OpenAI client: {e}")
+            return None
+    return _client
+
+
+def reset_openai_client():
+    """Drop the shared client, e.g. after the API key changes."""
+    global _client
+    _client = None
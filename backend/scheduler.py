@@ -0,0 +1,263 @@
+"""
+Small scheduler for periodic background jobs.
+
+Every job has a row in `scheduled_job_leases`. A worker may only run a job
+after it wins that row with a single conditional UPDATE, so with several
+uvicorn workers each job still runs once per interval. Every run is
+recorded in `scheduled_job_runs`.
+"""
+import asyncio
+import os
+import socket
+import traceback
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db_connection import ScheduledJobLeases, ScheduledJobRuns
+
+
+# Upper bound on how long a worker sleeps before re-checking a job it does not own
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "60"))
+
+
+class CronSchedule:
+    """
+    Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Each field accepts `*`, `*/n`, numbers, `a-b` ranges and comma lists.
+    Day-of-week uses 0 for Sunday.
+    """
+
+    _RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self._RANGES)
+        )
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(v) for v in part.split("-", 1))
+            else:
+                start = end = int(part)
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after `moment`."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if candidate.day not in self.days or (candidate.isoweekday() % 7) not in self.weekdays:
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: Callable[[AsyncSession], Awaitable[object]]
+    every: Optional[timedelta] = None
+    cron: Optional[CronSchedule] = None
+    lease: timedelta = timedelta(minutes=10)
+    run_on_start: bool = False
+
+    def next_run_after(self, moment: datetime) -> datetime:
+        if self.cron is not None:
+            return self.cron.next_after(moment)
+        return moment + self.every
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobScheduler:
+    """Runs registered jobs on their schedules, coordinating workers through the database."""
+
+    def __init__(self, session_factory, worker_id: Optional[str] = None, poll_seconds: Optional[float] = None):
+        self.session_factory = session_factory
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_seconds = SCHEDULER_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[AsyncSession], Awaitable[object]], every: Optional[timedelta] = None,
+                cron: Optional[str] = None, lease: timedelta = timedelta(minutes=10), run_on_start: bool = False):
+        """Register a job that runs either every `every` or on a cron expression."""
+        if (every is None) == (cron is None):
+            raise ValueError("Pass exactly one of 'every' or 'cron'")
+        if name in self.jobs:
+            raise ValueError(f"Job {name!r} is already registered")
+        self.jobs[name] = ScheduledJob(
+            name=name,
+            func=func,
+            every=every,
+            cron=CronSchedule(cron) if cron else None,
+            lease=lease,
+            run_on_start=run_on_start
+        )
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self):
+        """Start one loop task per job on the running event loop."""
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._job_loop(job), name=f"scheduler:{job.name}")
+            for job in self.jobs.values()
+        ]
+
+    async def stop(self):
+        """Cancel every job loop and wait for in-flight runs to record their outcome."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _job_loop(self, job: ScheduledJob):
+        lease_row_ready = False
+        while True:
+            try:
+                if not lease_row_ready:
+                    await self._ensure_lease_row(job)
+                    lease_row_ready = True
+                await self.run_pending(job)
+                delay = await self._seconds_until_due(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Scheduler error for job {job.name}: {str(e)}")
+                delay = self.poll_seconds
+            await asyncio.sleep(max(0.0, min(delay, self.poll_seconds)))
+
+    async def _ensure_lease_row(self, job: ScheduledJob):
+        """Create the job's lease row if no worker has created it yet."""
+        now = datetime.now()
+        first_run = now if job.run_on_start else job.next_run_after(now)
+        async with self.session_factory() as session:
+            if await session.get(ScheduledJobLeases, job.name) is not None:
+                return
+            session.add(ScheduledJobLeases(job_name=job.name, next_run_at=first_run))
+            try:
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()  # Another worker created it first
+
+    async def _seconds_until_due(self, job: ScheduledJob) -> float:
+        async with self.session_factory() as session:
+            lease = await session.get(ScheduledJobLeases, job.name)
+            if lease is None:
+                return 0.0
+            return (lease.next_run_at - datetime.now()).total_seconds()
+
+    async def try_acquire(self, job: ScheduledJob) -> bool:
+        """Take the job's lease if it is due and nobody holds it. Atomic across workers."""
+        now = datetime.now()
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(ScheduledJobLeases)
+                .where(
+                    and_(
+                        ScheduledJobLeases.job_name == job.name,
+                        ScheduledJobLeases.next_run_at <= now,
+                        or_(
+                            ScheduledJobLeases.locked_until.is_(None),
+                            ScheduledJobLeases.locked_until < now
+                        )
+                    )
+                )
+                .values(owner=self.worker_id, locked_until=now + job.lease)
+            )
+            await session.commit()
+            return result.rowcount == 1
+
+    async def _release(self, job: ScheduledJob, next_run_at: datetime):
+        async with self.session_factory() as session:
+            await session.execute(
+                update(ScheduledJobLeases)
+                .where(
+                    and_(
+                        ScheduledJobLeases.job_name == job.name,
+                        ScheduledJobLeases.owner == self.worker_id
+                    )
+                )
+                .values(owner=None, locked_until=None, next_run_at=next_run_at)
+            )
+            await session.commit()
+
+    async def run_pending(self, job: ScheduledJob) -> bool:
+        """Run the job if this worker wins its lease. Returns whether it ran."""
+        if not await self.try_acquire(job):
+            return False
+
+        started_at = datetime.now()
+        async with self.session_factory() as session:
+            run = ScheduledJobRuns(job_name=job.name, owner=self.worker_id, started_at=started_at, status="running")
+            session.add(run)
+            await session.commit()
+            run_id = run.id
+
+        status, detail = "success", None
+        try:
+            async with self.session_factory() as session:
+                result = await job.func(session)
+            detail = None if result is None else str(result)
+        except asyncio.CancelledError:
+            status, detail = "cancelled", "worker shutting down"
+            raise
+        except Exception as e:
+            status, detail = "failed", f"{e}\n{traceback.format_exc()}"
+            print(f"❌ Scheduled job {job.name} failed: {str(e)}")
+        finally:
+            # Record the outcome even while being cancelled
+            await asyncio.shield(self._finish_run(job, run_id, status, detail, started_at))
+        return True
+
+    async def _finish_run(self, job: ScheduledJob, run_id: int, status: str, detail: Optional[str], started_at: datetime):
+        finished_at = datetime.now()
+        async with self.session_factory() as session:
+            await session.execute(
+                update(ScheduledJobRuns)
+                .where(ScheduledJobRuns.id == run_id)
+                .values(status=status, detail=detail, finished_at=finished_at)
+            )
+            await session.commit()
+        # A cancelled run is retried as soon as another worker picks it up
+        next_run_at = finished_at if status == "cancelled" else job.next_run_after(started_at)
+        await self._release(job, max(next_run_at, finished_at))
@@ -0,0 +1,179 @@
+"""
+Full-text search over request titles, details and professor responses.
+
+On MySQL the FULLTEXT indexes from migration 0006 do the matching and ranking
+(MATCH ... AGAINST in natural language mode), and only one page of results
+leaves the server. Other databases (SQLite in tests and local development)
+have no FULLTEXT, so the requests the caller may see are ranked by a small
+in-process inverted index instead, in which a title hit counts double.
+
+Results are scoped to the caller's role: students see their own requests,
+professors the requests in courses they teach, secretaries their department's,
+admins everything. Pages are keyset paginated on (score, id); equal scores
+are ordered by id, so pages are stable while the data doesn't change. Scores
+are relevance, though, and are recomputed on every query: on MySQL the
+FULLTEXT statistics move as requests and responses are written, so a request
+can shift between pages when the archive changes while someone is paging.
+"""
+import math
+import re
+from collections import defaultdict
+
+from sqlalchemy import func, union
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
+
+from backend.db_connection import (
+    Courses, Requests, Responses, Secretaries, Students, decode_cursor, encode_cursor, keyset_after
+)
+
+
+# Created on MySQL only by migration 0006; autogenerate is told to leave them alone
+FULLTEXT_INDEXES = {"ix_requests_title_details_fulltext", "ix_responses_response_text_fulltext"}
+
+# In-process ranking only; MySQL scores title and details as one FULLTEXT column set
+TITLE_WEIGHT = 2.0
+
+SEARCH_TOKEN = re.compile(r"\w+")
+
+# Scores are compared by the cursor, so both backends round them the same way
+SCORE_DIGITS = 6
+
+
+def tokenize(text: str) -> list:
+    """Lower-cased word tokens; \\w is Unicode-aware, so Hebrew text is split too."""
+    return SEARCH_TOKEN.findall((text or "").lower())
+
+
+class InvertedIndex:
+    """Term -> {document id: weighted term count}, ranked with tf-idf."""
+
+    def __init__(self):
+        self.postings = defaultdict(lambda: defaultdict(float))
+        self.documents = set()
+
+    def add(self, doc_id: int, text: str, weight: float = 1.0):
+        self.documents.add(doc_id)
+        for term in tokenize(text):
+            self.postings[term][doc_id] += weight
+
+    def search(self, query: str) -> list:
+        """(score, doc id) for every document containing a query term, best first."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + len(self.documents) / len(postings))
+            for doc_id, count in postings.items():
+                scores[doc_id] += (1 + math.log(count)) * idf  # Weights are >= 1, so log(count) >= 0
+        return sorted(((round(score, SCORE_DIGITS), doc_id) for doc_id, score in scores.items()), reverse=True)
+
+
+def scope_to_role(query, role: str, user_email: str):
+    """Restrict a query over Requests to what the caller may see."""
+    if role == "admin":
+        return query
+    if role == "student":
+        return query.where(Requests.student_email == user_email)
+    if role == "professor":
+        taught = select(Courses.id).where(Courses.professor_email == user_email)
+        return query.where(Requests.course_id.in_(taught))
+    if role == "secretary":
+        department = select(Secretaries.department_id).where(Secretaries.email == user_email)
+        students = select(Students.email).where(Students.department_id.in_(department))
+        return query.where(Requests.student_email.in_(students))
+    raise ValueError(f"Unknown role '{role}'")
+
+
+def _parse_cursor(cursor: str):
+    try:
+        score, last_id = decode_cursor(cursor)
+        return float(score), int(last_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def mysql_search_query(text: str, role: str, user_email: str, limit: int, cursor: str = None):
+    """The MATCH ... AGAINST statement for one page, ranked on the FULLTEXT indexes."""
+    request_match = match(Requests.title, Requests.details, against=text).in_natural_language_mode()
+    response_match = match(Responses.response_text, against=text).in_natural_language_mode()
+
+    # Each side of the union is answered from its own FULLTEXT index
+    candidates = union(
+        select(Requests.id).where(request_match),
+        select(Responses.request_id).where(response_match)
+    ).subquery()
+    response_scores = (
+        select(Responses.request_id, func.max(response_match).label("score"))
+        .where(response_match)
+        .group_by(Responses.request_id)
+        .subquery()
+    )
+    # Rounded like the in-process scores, so the cursor's equality test compares
+    # exactly what the previous page returned
+    score = func.round(request_match + func.coalesce(response_scores.c.score, 0), SCORE_DIGITS).label("score")
+    ranked = scope_to_role(
+        select(Requests, score)
+        .outerjoin(response_scores, response_scores.c.request_id == Requests.id)
+        .where(Requests.id.in_(select(candidates.c.id))),
+        role, user_email
+    ).subquery()
+
+    request = aliased(Requests, ranked)
+    query = select(request, ranked.c.score)
+    if cursor:
+        last_score, last_id = _parse_cursor(cursor)
+        query = query.where(keyset_after(ranked.c.score, ranked.c.id, last_score, last_id, descending=True))
+    return query.order_by(ranked.c.score.desc(), ranked.c.id.desc()).limit(limit + 1)
+
+
+async def _search_mysql(session: AsyncSession, text: str, role: str, user_email: str, limit: int, cursor):
+    rows = (await session.execute(mysql_search_query(text, role, user_email, limit, cursor))).all()
+    return [(req, float(row_score)) for req, row_score in rows]
+
+
+async def _search_in_process(session: AsyncSession, text: str, role: str, user_email: str, limit: int, cursor):
+    requests = (await session.execute(scope_to_role(select(Requests), role, user_email))).scalars().all()
+    by_id = {request.id: request for request in requests}
+    responses = await session.execute(
+        select(Responses.request_id, Responses.response_text).where(Responses.request_id.in_(by_id))
+    )
+
+    index = InvertedIndex()
+    for request in requests:
+        index.add(request.id, request.title, TITLE_WEIGHT)
+        index.add(request.id, request.details)
+    for request_id, response_text in responses.all():
+        index.add(request_id, response_text)
+
+    ranked = index.search(text)
+    if cursor:
+        last = _parse_cursor(cursor)
+        ranked = [hit for hit in ranked if hit < last]
+    return [(by_id[doc_id], score) for score, doc_id in ranked[:limit + 1]]
+
+
+async def search_requests(session: AsyncSession, text: str, role: str, user_email: str,
+                          limit: int = 20, cursor: str = None):
+    """
+    One page of requests matching `text`, best match first.
+
+    Returns ([(request, score)], next_cursor); next_cursor is None on the last
+    page. Raises ValueError for an empty query, unknown role or bad cursor.
+    """
+    if not tokenize(text):
+        raise ValueError("Search text is empty")
+    if session.get_bind().dialect.name == "mysql":
+        hits = await _search_mysql(session, text, role, user_email, limit, cursor)
+    else:
+        hits = await _search_in_process(session, text, role, user_email, limit, cursor)
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        last_request, last_score = hits[-1]
+        next_cursor = encode_cursor(last_score, last_request.id)
+    return hits, next_cursor
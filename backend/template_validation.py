@@ -0,0 +1,151 @@
+"""
+Server-side validation of the custom fields of template-based requests.
+
+Each request template is compiled once into a Pydantic model that enforces the
+field types, required flags, select options and validation_rules (min_length,
+max_length, pattern for text; min, max for numbers) that the form builder
+stores. Compiled models are cached per template and rebuilt when the template's
+content version changes, so a submission costs one model_validate call.
+"""
+import re
+from datetime import date
+from typing import Annotated, Any, List, Literal, Optional
+
+from pydantic import AfterValidator, ConfigDict, Field, ValidationError, create_model
+
+
+# Same checks as DynamicRequestForm.jsx, so the browser and the server agree
+EMAIL_PATTERN = r"^[^\s@]+@[^\s@]+\.[^\s@]+$"
+PHONE_PATTERN = re.compile(r"^[\+]?[1-9][\d]{0,15}$")
+
+# What the form sends for a field the student left empty
+BLANK_VALUES = ("", None, [])
+
+
+class TemplateFieldsError(ValueError):
+    """A submission does not match its template; `errors` lists (field label, message) pairs."""
+
+    def __init__(self, errors: list):
+        self.errors = errors
+        super().__init__("; ".join(f"{label}: {message}" for label, message in errors))
+
+
+def _check_phone(value: str) -> str:
+    if not PHONE_PATTERN.match(re.sub(r"\s", "", value)):
+        raise ValueError("Please enter a valid phone number")
+    return value
+
+
+def _number(rules: dict, key: str):
+    value = rules.get(key)
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _length(rules: dict, key: str):
+    value = rules.get(key)
+    return value if isinstance(value, int) and not isinstance(value, bool) and value >= 0 else None
+
+
+def _pattern(rules: dict):
+    pattern = rules.get("pattern")
+    if not isinstance(pattern, str):
+        return None
+    try:
+        re.compile(pattern)
+    except re.error:
+        return None  # Saved before patterns were checked; don't fail every submission over it
+    return pattern
+
+
+def field_annotation(field: dict):
+    """The Python type and Field() constraints for one template field."""
+    rules = field.get("validation_rules") or {}
+    field_type = field.get("field_type")
+    constraints = {}
+
+    if field_type == "number":
+        return float, {"ge": _number(rules, "min"), "le": _number(rules, "max")}
+    if field_type == "date":
+        return date, constraints
+    if field_type == "file":
+        # Files are uploaded separately; the submission only says which were attached
+        return List[Any], {"min_length": 1} if field.get("is_required") else constraints
+    if field_type == "select":
+        options = (field.get("field_options") or {}).get("options") or []
+        if options and all(isinstance(option, str) for option in options):
+            return Literal[tuple(options)], constraints
+
+    constraints = {
+        "min_length": _length(rules, "min_length"),
+        "max_length": _length(rules, "max_length"),
+        "pattern": _pattern(rules)
+    }
+    if field_type == "email":
+        constraints["pattern"] = EMAIL_PATTERN
+    if field_type == "tel":
+        return Annotated[str, AfterValidator(_check_phone)], constraints
+    return str, constraints
+
+
+def compile_template_model(template: dict) -> type:
+    """Build the Pydantic model for a template's fields (see template_to_dict for the shape)."""
+    definitions = {}
+    for index, field in enumerate(template["fields"]):
+        annotation, constraints = field_annotation(field)
+        constraints = {key: value for key, value in constraints.items() if value is not None}
+        # Field names are free text, so they go in as aliases of safe attribute names
+        if field.get("is_required"):
+            definitions[f"field_{index}"] = (annotation, Field(alias=field["field_name"], **constraints))
+        else:
+            definitions[f"field_{index}"] = (
+                Optional[annotation], Field(None, alias=field["field_name"], **constraints)
+            )
+    return create_model(
+        f"TemplateFields{template['id']}",
+        __config__=ConfigDict(extra="ignore"),
+        **definitions
+    )
+
+
+class TemplateValidatorCache:
+    """Compiled models by template id, each stamped with the template version it was built from."""
+
+    def __init__(self):
+        self._models = {}
+
+    def invalidate(self, template_id: int = None):
+        if template_id is None:
+            self._models.clear()
+        else:
+            self._models.pop(template_id, None)
+
+    def get(self, template: dict, version: str) -> type:
+        cached = self._models.get(template["id"])
+        if cached and cached[0] == version:
+            return cached[1]
+        model = compile_template_model(template)
+        self._models[template["id"]] = (version, model)
+        return model
+
+
+template_validators = TemplateValidatorCache()
+
+
+def validate_template_fields(template: dict, version: str, values: Optional[dict]) -> dict:
+    """
+    Check a submission's custom fields against its template.
+
+    Returns the parsed values keyed by field name, or raises TemplateFieldsError.
+    """
+    model = template_validators.get(template, version)
+    values = {name: value for name, value in (values or {}).items() if value not in BLANK_VALUES}
+    try:
+        return model.model_validate(values).model_dump(by_alias=True)
+    except ValidationError as e:
+        labels = {field["field_name"]: field["field_label"] for field in template["fields"]}
+        errors = []
+        for error in e.errors():
+            name = error["loc"][0] if error["loc"] else ""
+            message = error["msg"].removeprefix("Value error, ")
+            errors.append((labels.get(name, name), message))
+        raise TemplateFieldsError(errors)
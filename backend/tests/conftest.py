@@ -49,4 +49,12 @@ def override_professor_session(monkeypatch):
 def override_admin_session(monkeypatch):
     app.dependency_overrides[get_session] = get_fake_session_admin
     yield
-    app.dependency_overrides.pop(get_session, None)
\ No newline at end of file
+    app.dependency_overrides.pop(get_session, None)
+
+@pytest.fixture(autouse=True)
+def fresh_template_registry():
+    # Tests swap databases under the app; never serve one test's templates to the next
+    from backend.db_connection import template_registry
+    template_registry.invalidate()
+    yield
+    template_registry.invalidate()
@@ -0,0 +1,97 @@
+import asyncio
+import time
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+import backend.main as main
+from backend.db_connection import Base, SystemAnnouncements, create_system_announcements_bulk
+
+
+@pytest_asyncio.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False, future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as sess:
+        yield sess
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_bulk_announcements_share_one_commit(session, monkeypatch):
+    commits = []
+    original_commit = session.commit
+
+    async def counting_commit():
+        commits.append(1)
+        await original_commit()
+
+    monkeypatch.setattr(session, "commit", counting_commit)
+    created = await create_system_announcements_bulk(session, [
+        {"title": f"T{i}", "message": "m", "announcement_type": "ai_news"} for i in range(5)
+    ])
+    assert len(commits) == 1
+    assert all(a.id is not None for a in created)
+    rows = (await session.execute(select(SystemAnnouncements))).scalars().all()
+    assert len(rows) == 5
+
+
+@pytest.mark.asyncio
+async def test_news_generation_is_concurrent_and_bounded(monkeypatch):
+    running = 0
+    peak = 0
+
+    async def slow_news(category):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return {"content": f"news about {category}", "source": "test", "success": True}
+
+    monkeypatch.setattr(main, "generate_news_content", slow_news)
+    monkeypatch.setattr(main, "NEWS_GENERATION_CONCURRENCY", 4)
+
+    started = time.perf_counter()
+    results = await main.generate_news_contents(main.NEWS_CATEGORIES)
+    elapsed = time.perf_counter() - started
+
+    assert peak == 4
+    assert len(results) == len(main.NEWS_CATEGORIES)
+    assert results[0]["content"] == f"news about {main.NEWS_CATEGORIES[0]}"
+    assert elapsed < 0.05 * len(main.NEWS_CATEGORIES)
+
+
+@pytest.mark.asyncio
+async def test_slow_category_falls_back_to_canned_news(monkeypatch):
+    async def news(category):
+        if category == main.NEWS_CATEGORIES[0]:
+            await asyncio.sleep(1)
+        return {"content": "fresh", "source": "test", "success": True}
+
+    monkeypatch.setattr(main, "generate_news_content", news)
+    monkeypatch.setattr(main, "NEWS_GENERATION_TIMEOUT", 0.05)
+
+    results = await main.generate_news_contents(main.NEWS_CATEGORIES)
+    assert results[0]["source"] == "timeout_fallback"
+    assert results[0]["content"] == main.FALLBACK_NEWS[main.NEWS_CATEGORIES[0]]
+    assert all(r["content"] == "fresh" for r in results[1:])
+
+
+@pytest.mark.asyncio
+async def test_batch_stores_successful_items(session, monkeypatch):
+    async def news(category):
+        if category == main.NEWS_CATEGORIES[1]:
+            return {"content": None, "source": "error_fallback", "success": False}
+        return {"content": f"news about {category}", "source": "test", "success": True}
+
+    monkeypatch.setattr(main, "generate_news_content", news)
+    created = await main.generate_ai_news_batch(session)
+
+    assert created == len(main.NEWS_CATEGORIES) - 1
+    rows = (await session.execute(select(SystemAnnouncements))).scalars().all()
+    assert {r.title for r in rows} == {f"World News #{i}" for i in range(1, 11) if i != 2}
+    assert all(r.announcement_type == "ai_news" and r.expires_date for r in rows)
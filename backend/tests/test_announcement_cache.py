@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.main import app, get_session, etag_matches
+from backend.db_connection import (
+    Base, active_announcements_cache, create_system_announcement, create_system_announcements_bulk,
+    deactivate_system_announcement
+)
+
+
+@pytest_asyncio.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False, future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    active_announcements_cache.invalidate()
+    async with async_session() as sess:
+        yield sess
+    active_announcements_cache.invalidate()
+    await engine.dispose()
+
+
+@pytest.fixture
+def count_queries(session, monkeypatch):
+    queries = []
+    original_execute = session.execute
+
+    async def counting_execute(*args, **kwargs):
+        queries.append(1)
+        return await original_execute(*args, **kwargs)
+
+    monkeypatch.setattr(session, "execute", counting_execute)
+    return queries
+
+
+@pytest_asyncio.fixture
+async def client(session):
+    app.dependency_overrides[get_session] = lambda: session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(get_session, None)
+
+
+@pytest.mark.asyncio
+async def test_repeated_reads_hit_the_database_once(session, count_queries):
+    await create_system_announcement(session, "Hello", "World")
+    count_queries.clear()
+
+    first, etag = await active_announcements_cache.get(session)
+    second, second_etag = await active_announcements_cache.get(session)
+
+    assert len(count_queries) == 1
+    assert first == second and etag == second_etag
+    assert first[0]["title"] == "Hello"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_query(session, count_queries):
+    await create_system_announcement(session, "Hello", "World")
+    count_queries.clear()
+
+    results = await asyncio.gather(*(active_announcements_cache.get(session) for _ in range(5)))
+    assert len(count_queries) == 1
+    assert len({etag for _, etag in results}) == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_the_cache(session):
+    created = await create_system_announcement(session, "First", "m")
+    _, etag = await active_announcements_cache.get(session)
+
+    await create_system_announcements_bulk(session, [{"title": "News", "message": "m", "announcement_type": "ai_news"}])
+    payload, bulk_etag = await active_announcements_cache.get(session)
+    assert {a["title"] for a in payload} == {"First", "News"}
+    assert bulk_etag != etag
+
+    assert await deactivate_system_announcement(session, created.id)
+    payload, _ = await active_announcements_cache.get(session)
+    assert [a["title"] for a in payload] == ["News"]
+
+
+@pytest.mark.asyncio
+async def test_cache_refreshes_at_next_expiry(session, count_queries):
+    await create_system_announcement(session, "Soon gone", "m", expires_date=datetime.now() + timedelta(seconds=0.2))
+    await create_system_announcement(session, "Stays", "m")
+    payload, _ = await active_announcements_cache.get(session)
+    assert len(payload) == 2
+
+    await asyncio.sleep(0.3)
+    count_queries.clear()
+    payload, _ = await active_announcements_cache.get(session)
+    assert len(count_queries) == 1
+    assert [a["title"] for a in payload] == ["Stays"]
+
+
+@pytest.mark.asyncio
+async def test_endpoint_serves_etag_and_304(session, client):
+    await create_system_announcement(session, "Hello", "World")
+
+    response = await client.get("/api/announcements")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.json()[0]["title"] == "Hello"
+
+    cached = await client.get("/api/announcements", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    await create_system_announcement(session, "Second", "World")
+    changed = await client.get("/api/announcements", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_etag_matches_handles_lists_and_weak_tags():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
@@ -0,0 +1,93 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+import backend.compression as compression
+from backend.compression import CompressionMiddleware, accepted_encodings, choose_encoder
+from backend.metrics import HTTP_RESPONSE_BYTES, HTTP_RESPONSE_COMPRESSION_RATIO
+import backend.main as main
+
+
+LARGE = [{"id": i, "title": "General Request", "status": "pending", "timeline": {"status_changes": []}}
+         for i in range(200)]
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    def large():
+        return LARGE
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/etag")
+    def with_etag():
+        return PlainTextResponse("x" * 1000, headers={"ETag": '"abc"', "Vary": "Origin"})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((("line %d\n" % i) * 20 for i in range(100)), media_type="text/plain")
+
+    download = tmp_path / "report.json"
+    download.write_text("{}" * 1000)
+
+    @app.get("/download")
+    def download_file():
+        return FileResponse(download, filename="report.json")
+
+    return TestClient(app)
+
+
+def test_large_json_is_gzipped(client):
+    before = HTTP_RESPONSE_COMPRESSION_RATIO.count(route="/large", encoding="gzip")
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == LARGE
+    assert int(response.headers["content-length"]) < len(response.content) / 5
+    assert HTTP_RESPONSE_COMPRESSION_RATIO.count(route="/large", encoding="gzip") == before + 1
+    assert HTTP_RESPONSE_BYTES.get(route="/large", encoding="gzip", stage="original") >= len(response.content)
+
+
+@pytest.mark.parametrize("path, accept_encoding", [
+    ("/small", "gzip"),
+    ("/large", "identity"),
+    ("/large", "gzip;q=0"),
+    ("/download", "gzip"),
+])
+def test_response_is_left_alone(client, path, accept_encoding):
+    response = client.get(path, headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) == len(response.content)
+
+
+def test_streamed_response_is_compressed_in_chunks(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "".join(("line %d\n" % i) * 20 for i in range(100))
+
+
+def test_etag_is_weakened_and_vary_merged(client):
+    response = client.get("/etag", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["etag"] == 'W/"abc"'
+    assert response.headers["vary"] == "Origin, Accept-Encoding"
+
+
+def test_encoder_choice(monkeypatch):
+    assert accepted_encodings("gzip;q=0.5, br;q=0, deflate") == {"gzip", "deflate"}
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoder("br, gzip") is compression.GzipEncoder
+    assert choose_encoder("br") is None
+    assert choose_encoder("*") is compression.GzipEncoder
+
+
+def test_app_compresses_large_responses():
+    response = TestClient(main.app).get("/metrics", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "http_requests_total" in response.text
@@ -14,7 +14,7 @@ from backend.db_connection import (
     add_request, create_notification, get_user_notifications,
     mark_notification_as_read, mark_all_notifications_as_read,
     add_course, add_student_course, add_professor_response,
-    assign_student_to_course, assign_professor_to_course
+    assign_student_to_course, assign_professor_to_course, load_request_timelines
 )
 
 
@@ -119,7 +119,8 @@ async def test_course_student_course_and_response_and_assign(session):
     resp = await add_professor_response(session, req2.id, "prof1@example.com", "Rtext", files=None)
     assert resp.professor_email == "prof1@example.com"
     fresh_req = await session.get(Requests, req2.id)
-    assert isinstance(fresh_req.timeline, list) and fresh_req.timeline[-1]["status"] == "response added"
+    timeline = (await load_request_timelines(session, [fresh_req]))[req2.id]
+    assert timeline["responses"][-1]["response_text"] == "Rtext"
     with pytest.raises(ValueError):
         await add_professor_response(session, 9999, "prof1@example.com", "X")
     # assign student to course idempotent
@@ -0,0 +1,76 @@
+import pytest
+import backend.AIService as ai_service
+from backend.AIService.benchmark import (
+    LabeledQuery,
+    BenchmarkReport,
+    BenchmarkThresholds,
+    build_query_corpus,
+    scale_faq_data,
+    run_benchmark,
+    check_regressions,
+    offline_ai_service,
+    main,
+)
+
+
+@pytest.fixture(scope="module")
+def faqs():
+    return ai_service.load_faq_data()
+
+
+def test_corpus_has_labeled_positives_and_negatives(faqs):
+    corpus = build_query_corpus(faqs)
+    languages = {q.language for q in corpus}
+    assert languages == {"en", "he"}
+    assert any(q.expected_id is None for q in corpus)
+    faq_ids = {faq["id"] for faq in faqs}
+    assert {q.expected_id for q in corpus if q.expected_id} <= faq_ids
+
+
+def test_scale_faq_data_grows_with_distractors(faqs):
+    scaled = scale_faq_data(faqs, 4)
+    assert len(scaled) == len(faqs) * 4
+    assert scaled[:len(faqs)] == faqs
+    assert all(faq["id"].startswith("distractor_") for faq in scaled[len(faqs):])
+    assert scale_faq_data(faqs, 4) == scaled  # deterministic for a given seed
+
+
+@pytest.mark.parametrize("scale", [1, 3])
+def test_matcher_accuracy_does_not_regress(faqs, scale):
+    report = run_benchmark(scale_faq_data(faqs, scale), build_query_corpus(faqs), scale=scale)
+    assert report.queries > 0 and report.qps > 0
+    assert report.p50_ms <= report.p99_ms
+    assert check_regressions(report, BenchmarkThresholds()) == []
+
+
+def test_end_to_end_runs_offline(faqs):
+    queries = [
+        LabeledQuery("grade appeal", "en", "grade_appeal"),
+        LabeledQuery("tell me a joke about cats", "en", None),
+    ]
+    original_call = ai_service.call_openai_api
+    report = run_benchmark(faqs, queries, end_to_end=True)
+    assert report.precision == 1.0 and report.recall == 1.0
+    assert ai_service.call_openai_api is original_call
+    assert ai_service.FAQ_RESPONSE_DELAY == 0.2
+
+
+@pytest.mark.asyncio
+async def test_offline_ai_service_stubs_openai(faqs):
+    with offline_ai_service(faqs):
+        response = await ai_service.processMessage("tell me a joke about cats", "en")
+    assert response["source"] == "openai_fallback"
+    assert response["model"] == "benchmark_stub"
+
+
+def test_check_regressions_reports_each_violation():
+    report = BenchmarkReport(scale=1, faqs=1, patterns=1, queries=10, qps=50.0,
+                             p50_ms=1.0, p99_ms=9.0, precision=0.5, recall=0.4)
+    failures = check_regressions(report, BenchmarkThresholds(0.9, 0.9, 100.0, 5.0))
+    assert len(failures) == 4
+
+
+def test_cli_exit_code(capsys):
+    assert main(["--scales", "1"]) == 0
+    assert main(["--scales", "1", "--min-recall", "1.01"]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
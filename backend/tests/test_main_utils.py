@@ -116,12 +116,17 @@ class FakeResult:
             return self._data[0] if self._data else None
         return self._data
 
+    @property
+    def rowcount(self):
+        return len(self.all())
+
 
 class FakeAsyncSession:
     def __init__(self, expected_email=None, expected_role=None):
         self.expected_email = expected_email
         self.expected_role = expected_role
         self.responses = []  # Store responses for testing
+        self.info = {}
 
     async def execute(self, query):
         query_str = str(query).lower()
@@ -132,6 +137,11 @@ class FakeAsyncSession:
         if "from request_responses" in query_str:
             return FakeResult(self.responses)
             
+        if "from users left outer join students" in query_str:
+            # User directory page: (email, id, first_name, last_name, role, department_id) rows
+            return FakeResult([(f"user{i}@example.com", i, "Test", f"User {i}", self.expected_role or "student", "CS")
+                               for i in range(5)])
+
         if "from users" in query_str:
             # Here, return the fake user for testing login.
             if "where" in query_str:
@@ -141,10 +151,14 @@ class FakeAsyncSession:
                 else:
                     return FakeResult(None)
             else:
-                fake_users = [FakeUser(f"{self.expected_email}", hashed, self.expected_role, "Test",
+                fake_users = [FakeUser(f"{self.expected_email}", hashed, self.expected_role or "student", "Test",
                                        f"User {i}") for i in range(5)]
                 return FakeResult(fake_users)
 
+        if "from requests left outer join students" in query_str:
+            # Transfer queue page: (request, first_name, last_name, department_id) rows
+            return FakeResult([(FakeRequest(i, f"Request {i}", f"test_student{i}@example.com", f"Details {i}", None, "pending", datetime.now().date(), None), "Test", f"User {i}", "CS") for i in range(1, 6)])
+
         if "from requests" in query_str:
             if "where" in query_str:
                 # Check if we're looking for a specific request ID (match any filter by requests.id)
@@ -166,8 +180,8 @@ class FakeAsyncSession:
             return FakeResult(fake_professor)
 
         if "from courses" in query_str:
-            fake_courses = [FakeCourse(i, f"Course {i}", f"Description {i}", i,
-                                       "test_professor@example.com", i) for i in range(1,6)]
+            fake_courses = [FakeCourse(f"CS10{i}", f"Course {i}", f"Description {i}", i,
+                                       "test_professor@example.com", "CS") for i in range(1,6)]
             return FakeResult(fake_courses)
 
         if "from student_courses" in query_str:
@@ -0,0 +1,244 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+import backend.metrics as metrics
+import backend.main as main
+import backend.db_connection as db_connection
+from backend.main import app
+from backend.metrics import (
+    MetricsRegistry, MetricsMiddleware, REGISTRY, HTTP_REQUESTS, HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT,
+    HTTP_REQUEST_DB_QUERIES, DB_SLOW_QUERIES, DB_POOL_CHECKOUTS, DB_POOL_CONNECTS, DB_POOL_CHECKOUT_WAIT, instrument_engine, instrument_pool,
+    pool_status
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a"} 3' in text
+    assert 'latency_seconds_sum{route="/a"} 5.55' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("things_total", "Things.", ("name",))
+    counter.inc(name='a"b\\c')
+    assert 'things_total{name="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_duplicate_metric_names_are_rejected():
+    registry = MetricsRegistry()
+    registry.counter("x_total", "X.")
+    with pytest.raises(ValueError):
+        registry.gauge("x_total", "X.")
+
+
+def test_middleware_labels_by_route_template_and_status():
+    demo = FastAPI()
+    demo.add_middleware(MetricsMiddleware)
+
+    @demo.get("/items/{item_id}")
+    def item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    client = TestClient(demo)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/0")
+    client.get("/nowhere")
+
+    assert HTTP_REQUESTS.get(method="GET", route="/items/{item_id}", status="200") == 2
+    assert HTTP_REQUESTS.get(method="GET", route="/items/{item_id}", status="404") == 1
+    assert HTTP_REQUESTS.get(method="GET", route="unmatched", status="404") == 1
+    assert HTTP_REQUEST_DURATION.count(method="GET", route="/items/{item_id}") == 3
+    assert HTTP_REQUESTS_IN_FLIGHT.get(method="GET") == 0
+
+
+def test_unhandled_error_is_recorded_as_500():
+    demo = FastAPI()
+    demo.add_middleware(MetricsMiddleware)
+
+    @demo.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    client = TestClient(demo, raise_server_exceptions=False)
+    assert client.get("/boom").status_code == 500
+    assert HTTP_REQUESTS.get(method="GET", route="/boom", status="500") == 1
+    assert HTTP_REQUESTS_IN_FLIGHT.get(method="GET") == 0
+
+
+def test_metrics_endpoint_exposes_app_requests():
+    client = TestClient(app)
+    client.get("/")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/",status="200"} 1' in response.text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/",le="+Inf"} 1' in response.text
+
+
+@pytest_asyncio.fixture
+async def instrumented_engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
+    instrument_engine(engine)
+    yield engine
+    await engine.dispose()
+
+
+def db_app(engine):
+    demo = FastAPI()
+    demo.add_middleware(MetricsMiddleware)
+
+    @demo.get("/reports/{report_id}")
+    async def report(report_id: int):
+        async with engine.connect() as conn:
+            for _ in range(report_id):
+                await conn.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    return demo
+
+
+@pytest.mark.asyncio
+async def test_db_statements_are_counted_per_request(instrumented_engine):
+    async with AsyncClient(transport=ASGITransport(app=db_app(instrumented_engine)), base_url="http://test") as client:
+        three = await client.get("/reports/3")
+        none = await client.get("/reports/0")
+
+    assert three.headers["x-db-query-count"] == "3"
+    assert three.headers["server-timing"].startswith("db;dur=")
+    assert none.headers["x-db-query-count"] == "0"
+    assert HTTP_REQUEST_DB_QUERIES.count(method="GET", route="/reports/{report_id}") == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_with_route(instrumented_engine, monkeypatch, capsys):
+    monkeypatch.setattr(metrics, "SLOW_QUERY_SECONDS", 0.0)
+    async with AsyncClient(transport=ASGITransport(app=db_app(instrumented_engine)), base_url="http://test") as client:
+        await client.get("/reports/1")
+    async with instrumented_engine.connect() as conn:
+        await conn.execute(text("SELECT 2"))
+
+    assert DB_SLOW_QUERIES.get(route="/reports/{report_id}") == 1
+    assert DB_SLOW_QUERIES.get(route="background") == 1
+    assert "on /reports/{report_id}: SELECT 1" in capsys.readouterr().out
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_is_still_counted(instrumented_engine):
+    demo = FastAPI()
+    demo.add_middleware(MetricsMiddleware)
+
+    @demo.get("/bad")
+    async def bad():
+        async with instrumented_engine.connect() as conn:
+            try:
+                await conn.execute(text("SELECT * FROM missing_table"))
+            except Exception:
+                pass
+            await conn.execute(text("SELECT 1"))
+        return {}
+
+    async with AsyncClient(transport=ASGITransport(app=demo), base_url="http://test") as client:
+        response = await client.get("/bad")
+    assert response.headers["x-db-query-count"] == "2"
+
+
+@pytest.mark.asyncio
+async def test_pool_gauges_follow_checkouts(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db", pool_size=3, max_overflow=0)
+    instrument_pool(engine, "test_pool")
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert pool_status(engine)["checked_out"] == 1
+            text_out = REGISTRY.render()
+            assert 'db_pool_connections{engine="test_pool",state="checked_out"} 1' in text_out
+            assert 'db_pool_size{engine="test_pool"} 3' in text_out
+        assert pool_status(engine)["checked_out"] == 0
+        assert DB_POOL_CHECKOUTS.get(engine="test_pool") == 1
+        assert DB_POOL_CONNECTS.get(engine="test_pool") == 1
+    finally:
+        REGISTRY.collectors.pop()
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_checkout_wait_is_observed_under_contention(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db", pool_size=1, max_overflow=0)
+    instrument_pool(engine, "contended")
+
+    async def query():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    try:
+        async with engine.connect() as holder:
+            await holder.execute(text("SELECT 1"))
+            waiter = asyncio.create_task(query())
+            await asyncio.sleep(0.2)
+            assert not waiter.done()
+        await asyncio.wait_for(waiter, timeout=5)
+
+        counts, total, count = DB_POOL_CHECKOUT_WAIT.series[("contended",)]
+        assert count == 2 and total >= 0.2
+        # The waiter landed in a bucket above 0.1 seconds
+        assert sum(c for bound, c in zip(DB_POOL_CHECKOUT_WAIT.buckets, counts) if bound > 0.1) == 1
+        assert 'db_pool_checkout_wait_seconds_count{engine="contended"} 2' in REGISTRY.render()
+    finally:
+        REGISTRY.collectors.pop()
+        await engine.dispose()
+
+
+def test_pool_options_come_from_environment(monkeypatch):
+    monkeypatch.setattr(db_connection, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(db_connection, "DB_POOL_RECYCLE", 60)
+    options = db_connection.engine_options("mysql+aiomysql://u:p@h/db")
+    assert options["pool_size"] == 7 and options["pool_recycle"] == 60
+    assert options["pool_pre_ping"] is True and options["echo"] is False
+    assert "pool_size" not in db_connection.engine_options("sqlite+aiosqlite:///:memory:")
+
+
+@pytest.mark.asyncio
+async def test_db_health_reports_ok_and_errors(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/health.db")
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/dir/health.db")
+    try:
+        healthy = await db_connection.check_db_health(engine)
+        assert healthy["status"] == "ok" and healthy["latency_ms"] >= 0
+        assert "checked_out" in healthy["pool"]
+        assert (await db_connection.check_db_health(broken))["status"] == "error"
+
+        monkeypatch.setattr(main, "engine", broken)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/health/db")
+        assert response.status_code == 503
+        assert response.json()["status"] == "error"
+    finally:
+        await engine.dispose()
+        await broken.dispose()
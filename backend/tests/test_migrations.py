@@ -0,0 +1,157 @@
+from pathlib import Path
+import pytest
+import pytest_asyncio
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+import backend.db_connection as db_connection
+import backend.main as main
+import backend.manage_db as manage_db
+from backend.db_connection import (
+    BASELINE_TABLES, Base, SchemaVersionError, _upgrade_schema, check_schema_version, init_db
+)
+
+
+ALEMBIC_INI = Path(__file__).resolve().parents[1] / "alembic.ini"
+
+
+@pytest.fixture
+def migrated_db(tmp_path):
+    path = tmp_path / "migrated.db"
+    cfg = Config(str(ALEMBIC_INI))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(cfg, "head")
+    engine = create_engine(f"sqlite:///{path}")
+    yield cfg, engine
+    engine.dispose()
+
+
+def query_plan(engine, sql, **params):
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+    return " | ".join(row[-1] for row in rows)
+
+
+def test_migrations_match_models(migrated_db):
+    _, engine = migrated_db
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+
+
+def test_downgrade_to_base_and_back(migrated_db):
+    cfg, engine = migrated_db
+    command.downgrade(cfg, "0001")
+    assert "ix_requests_course_id_status" not in {i["name"] for i in inspect(engine).get_indexes("requests")}
+    command.downgrade(cfg, "base")
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+    command.upgrade(cfg, "head")
+    assert "requests" in inspect(engine).get_table_names()
+
+
+@pytest.mark.parametrize("sql, index", [
+    ("SELECT * FROM requests WHERE student_email = :email ORDER BY created_date DESC",
+     "ix_requests_student_email_created_date"),
+    ("SELECT * FROM requests WHERE course_id IN ('CS101', 'CS102') AND status = 'pending'",
+     "ix_requests_course_id_status"),
+    ("SELECT id FROM requests WHERE status = 'pending' AND title = :title AND created_date < '2025-01-01'",
+     "ix_requests_status_title_created_date"),
+    ("SELECT * FROM notifications WHERE user_email = :email AND is_read = 0",
+     "ix_notifications_user_email_is_read"),
+    ("SELECT * FROM notifications WHERE user_email = :email ORDER BY created_date DESC LIMIT 50",
+     "ix_notifications_user_email_created_date"),
+    ("SELECT student_email FROM student_courses WHERE course_id = 'CS101'",
+     "ix_student_courses_course_id_professor_email"),
+    ("SELECT * FROM responses WHERE request_id = 1 ORDER BY created_date",
+     "ix_responses_request_id_created_date"),
+    ("SELECT * FROM request_template_fields WHERE template_id = 1 ORDER BY field_order",
+     "ix_request_template_fields_template_id_field_order"),
+    ("SELECT * FROM system_announcements WHERE is_active = 1 AND expires_date > '2025-01-01'",
+     "ix_system_announcements_is_active_expires_date"),
+])
+def test_hot_queries_use_composite_indexes(migrated_db, sql, index):
+    _, engine = migrated_db
+    plan = query_plan(engine, sql, email="s@example.com", title="General Request")
+    assert index in plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan
+
+
+def test_schema_version_matches_latest_migration():
+    script = ScriptDirectory.from_config(Config(str(ALEMBIC_INI)))
+    assert db_connection.SCHEMA_VERSION == script.get_current_head()
+
+
+@pytest_asyncio.fixture
+async def async_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/app.db")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_check_schema_version_fails_fast_on_empty_database(async_engine):
+    with pytest.raises(SchemaVersionError, match="revision none"):
+        await check_schema_version(async_engine)
+
+
+@pytest.mark.asyncio
+async def test_init_db_migrates_then_check_passes(async_engine):
+    await init_db(async_engine)
+    assert await check_schema_version(async_engine) == db_connection.SCHEMA_VERSION
+    with pytest.raises(SchemaVersionError, match="expects 9999"):
+        await check_schema_version(async_engine, expected="9999")
+
+
+@pytest.mark.asyncio
+async def test_init_db_adopts_database_created_without_migrations(async_engine):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await init_db(async_engine)
+    assert await check_schema_version(async_engine) == db_connection.SCHEMA_VERSION
+
+
+def test_baseline_database_is_adopted_and_upgraded_to_the_models(migrated_db):
+    # A database from create_all before migrations existed: the 0001 tables, no alembic_version
+    cfg, engine = migrated_db
+    command.downgrade(cfg, "0001")
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE alembic_version"))
+    assert set(inspect(engine).get_table_names()) == BASELINE_TABLES
+
+    with engine.begin() as conn:
+        _upgrade_schema(conn, str(engine.url))
+    with engine.connect() as conn:
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == db_connection.SCHEMA_VERSION
+
+
+def test_partial_database_is_not_stamped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/partial.db")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn, tables=[Base.metadata.tables["departments"], Base.metadata.tables["users"]])
+    with pytest.raises(SchemaVersionError, match="lacks comment_templates"):
+        with engine.begin() as conn:
+            _upgrade_schema(conn, str(engine.url))
+    assert "alembic_version" not in inspect(engine).get_table_names()
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_startup_refuses_unmigrated_database(async_engine, monkeypatch):
+    monkeypatch.setattr(db_connection, "engine", async_engine)
+    monkeypatch.setattr(main, "SCHEMA_CHECK_ENABLED", True)
+    monkeypatch.setattr(main, "SCHEDULER_ENABLED", False)
+    with pytest.raises(SchemaVersionError):
+        async with main.lifespan(main.app):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_manage_db_check_reports_mismatch(async_engine, monkeypatch, capsys):
+    monkeypatch.setattr(manage_db, "engine", async_engine)
+    monkeypatch.setattr(manage_db, "check_schema_version", lambda: check_schema_version(async_engine))
+    assert await manage_db._check() == 1
+    assert "manage_db init" in capsys.readouterr().out
@@ -198,9 +198,7 @@ class TestStudentEndpoints:
 class TestRequestEndpoints:
     """Test request-related endpoints"""
 
-    @patch('backend.main.flag_modified')
-    def test_update_status_endpoint(self, mock_flag_modified, override_session_with_data):
-        mock_flag_modified.return_value = None
+    def test_update_status_endpoint(self, override_session_with_data):
         
         payload = {
             "request_id": 1,
@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import patch
+import backend.AIService as ai_service
+from backend.AIService import match_faq, get_faq_index
+from backend.AIService.ngram_index import NgramIndex, FaqPatternIndex, char_ngrams, normalize_text
+
+
+FAQS = [
+    {"id": "appeal", "patterns": {"en": ["grade appeal", "appeal my grade"], "he": ["ערעור ציון"]},
+     "response": {"en": "Appeal answer", "he": "תשובת ערעור"}},
+    {"id": "upload", "patterns": {"en": ["upload document", "submit file"]},
+     "response": {"en": "Upload answer"}},
+]
+
+
+def test_normalize_text_strips_punctuation():
+    assert normalize_text("  Grade, APPEAL?! ") == "grade appeal"
+
+
+def test_char_ngrams_are_padded_per_word():
+    grams = char_ngrams("ab", (2, 3))
+    assert grams == {" a": 1, "ab": 1, "b ": 1, " ab": 1, "ab ": 1}
+
+
+def test_ngram_index_scores_every_text_at_once():
+    index = NgramIndex(["grade appeal", "upload document", "exam schedule"])
+    scores = index.scores("grade appeal")
+    assert scores.shape == (3,)
+    assert scores[0] == pytest.approx(1.0)
+    assert scores.argmax() == 0
+    assert scores[1] < 0.2
+
+
+def test_ngram_index_unknown_query_scores_zero():
+    index = NgramIndex(["grade appeal"])
+    assert index.scores("xyz").max() == 0.0
+
+
+def test_faq_pattern_index_keeps_first_exact_owner():
+    index = FaqPatternIndex(FAQS + [{"id": "dup", "patterns": {"en": ["Grade Appeal"]}}], "en")
+    assert index.owners[index.exact["grade appeal"]] == 0
+    # FAQs without patterns in the language fall back to English
+    assert "upload document" in index.patterns
+
+
+def test_top_candidates_limits_and_keeps_pattern_order():
+    index = FaqPatternIndex(FAQS, "en")
+    scores = index.scores("appeal my grade document")
+    candidates = index.top_candidates(scores, 2)
+    assert len(candidates) == 2
+    assert candidates == sorted(candidates)
+
+
+def test_match_faq_exact_lookup():
+    faq, confidence, match_type = match_faq("Grade Appeal", "en", FAQS)
+    assert faq["id"] == "appeal" and confidence == 1.0 and match_type == "exact"
+
+
+def test_match_faq_ngram_tier_catches_paraphrase():
+    faq, confidence, match_type = match_faq("apeal of grade", "en", FAQS)
+    assert faq["id"] == "appeal"
+    assert match_type == "ngram"
+    assert confidence >= ai_service.NGRAM_MATCH_THRESHOLDS["en"]
+
+
+def test_match_faq_ngram_threshold_is_configurable():
+    with patch.dict(ai_service.NGRAM_MATCH_THRESHOLDS, {"en": 1.1}):
+        faq, _, match_type = match_faq("apeal of grade", "en", FAQS)
+    assert match_type != "ngram"
+
+
+def test_match_faq_unrelated_message_has_no_match():
+    faq, _, _ = match_faq("what is the meaning of life?", "en", FAQS)
+    assert faq is None
+
+
+def test_match_faq_falls_back_to_scan_without_numpy():
+    with patch.object(ai_service, "NGRAM_INDEX_AVAILABLE", False):
+        assert get_faq_index(FAQS, "en") is None
+        faq, confidence, match_type = match_faq("grade appeal", "en", FAQS)
+    assert faq["id"] == "appeal" and match_type == "exact"
+
+
+def test_faq_index_is_cached_per_list_and_language():
+    assert get_faq_index(FAQS, "en") is get_faq_index(FAQS, "en")
+    assert get_faq_index(FAQS, "he") is not get_faq_index(FAQS, "en")
+    assert get_faq_index(list(FAQS), "en") is not get_faq_index(FAQS, "en")
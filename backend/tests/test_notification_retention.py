@@ -0,0 +1,89 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+import backend.main as main
+from backend.db_connection import Base, Notifications, NotificationArchive, archive_old_notifications
+
+
+@pytest_asyncio.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    old = datetime.now() - timedelta(days=400)
+    async with factory() as session:
+        session.add_all(
+            [Notifications(user_email="a@example.com", request_id=1, message=f"old {i}", type="info",
+                           is_read=True, created_date=old) for i in range(5)]
+            + [Notifications(user_email="a@example.com", request_id=1, message="old unread", type="info",
+                             is_read=False, created_date=old),
+               Notifications(user_email="a@example.com", request_id=1, message="recent", type="info",
+                             is_read=True, created_date=datetime.now())]
+        )
+        await session.commit()
+        yield session
+    await engine.dispose()
+
+
+async def remaining_messages(session):
+    return sorted((await session.execute(select(Notifications.message))).scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_archives_old_read_notifications_into_table_in_batches(session):
+    commits = []
+    original_commit = session.commit
+
+    async def counting_commit():
+        commits.append(1)
+        await original_commit()
+
+    session.commit = counting_commit
+    assert await archive_old_notifications(session, retention_days=30, mode="table", batch_size=2) == 5
+    assert len(commits) == 3
+
+    assert await remaining_messages(session) == ["old unread", "recent"]
+    archived = (await session.execute(select(NotificationArchive))).scalars().all()
+    assert sorted(row.message for row in archived) == [f"old {i}" for i in range(5)]
+    assert all(row.user_email == "a@example.com" and row.archived_date for row in archived)
+
+
+@pytest.mark.asyncio
+async def test_archives_to_compressed_ndjson(session, tmp_path):
+    assert await archive_old_notifications(session, retention_days=30, mode="ndjson", batch_size=3,
+                                           archive_dir=tmp_path) == 5
+    [archive] = tmp_path.glob("notifications-*.ndjson.gz")
+    with gzip.open(archive, "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["message"] for row in rows] == [f"old {i}" for i in range(5)]
+    assert (await session.execute(select(NotificationArchive))).scalars().all() == []
+    assert await remaining_messages(session) == ["old unread", "recent"]
+    assert list(tmp_path.glob("*.part")) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_commit_publishes_no_ndjson(session, tmp_path):
+    async def failing_commit():
+        raise RuntimeError("connection lost")
+
+    session.commit = failing_commit
+    with pytest.raises(RuntimeError):
+        await archive_old_notifications(session, retention_days=30, mode="ndjson", archive_dir=tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_unknown_mode_is_rejected(session):
+    with pytest.raises(ValueError):
+        await archive_old_notifications(session, mode="s3")
+
+
+def test_retention_job_is_scheduled():
+    job = main.scheduler.jobs["notification_retention"]
+    assert job.func is archive_old_notifications and job.cron is not None
@@ -0,0 +1,68 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.db_connection import (
+    Base, create_notifications_bulk, count_unread_notifications, mark_all_notifications_as_read, get_session
+)
+from backend.main import app, create_access_token
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def factory(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        await create_notifications_bulk(session, [
+            {"user_email": email, "request_id": 1, "message": "m", "type": "info"}
+            for email in ["a@example.com"] * 3 + ["b@example.com"] * 2
+        ])
+        await session.commit()
+    return factory
+
+
+def statements_on(engine):
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(" ".join(statement.split())))
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_mark_all_read_is_one_update(engine, factory):
+    statements = statements_on(engine)
+    async with factory() as session:
+        assert await mark_all_notifications_as_read(session, "a@example.com") == 3
+        assert [s.split()[0] for s in statements] == ["UPDATE"]
+        assert await mark_all_notifications_as_read(session, "a@example.com") == 0
+        assert await count_unread_notifications(session, "a@example.com") == 0
+        assert await count_unread_notifications(session, "b@example.com") == 2
+
+
+@pytest.mark.asyncio
+async def test_unread_count_endpoint(engine, factory):
+    async def override():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override
+    token = create_access_token({"user_email": "b@example.com", "role": "student"})
+    statements = statements_on(engine)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/notifications/unread_count", headers={"Authorization": f"Bearer {token}"})
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+    assert response.json() == {"unread_count": 2}
+    assert len(statements) == 1 and statements[0].startswith("SELECT count(*)")
@@ -0,0 +1,94 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+import backend.db_connection as db_connection
+from backend.db_connection import (
+    Base, Notifications, NotificationBroker, create_notification, create_notifications_bulk
+)
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = NotificationBroker()
+    monkeypatch.setattr(db_connection, "notification_broker", broker)
+    return broker
+
+
+def course_notice(count):
+    return [{"user_email": f"student{i}@example.com", "request_id": 1, "message": "Exam moved", "type": "course"}
+            for i in range(count)]
+
+
+async def count_notifications(session):
+    return (await session.execute(select(func.count()).select_from(Notifications))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_bulk_insert_uses_multi_row_statements(engine, session, broker):
+    inserts = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statement.startswith("INSERT") and inserts.append(statement))
+
+    assert await create_notifications_bulk(session, course_notice(1000)) == 1000
+    await session.commit()
+
+    assert len(inserts) == 1000 // db_connection.NOTIFICATION_INSERT_BATCH
+    assert await count_notifications(session) == 1000
+
+
+@pytest.mark.asyncio
+async def test_subscribers_are_notified_only_after_commit(session, broker):
+    queue = broker.subscribe("student3@example.com")
+    await create_notifications_bulk(session, course_notice(5))
+    assert queue.empty()
+
+    await session.commit()
+    notification = queue.get_nowait()
+    assert notification["message"] == "Exam moved" and notification["is_read"] is False
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_notifications_are_neither_stored_nor_published(session, broker):
+    queue = broker.subscribe("student0@example.com")
+    await create_notifications_bulk(session, course_notice(3))
+    await session.rollback()
+    await session.commit()
+
+    assert await count_notifications(session) == 0
+    assert queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_single_notification_is_published(session, broker):
+    queue = broker.subscribe("u@example.com")
+    await create_notification(session, "u@example.com", 1, "Status changed", type="status_change")
+    assert queue.get_nowait()["type"] == "status_change"
+
+
+def test_full_subscriber_queue_drops_instead_of_blocking():
+    broker = NotificationBroker(max_queue_size=1)
+    queue = broker.subscribe("u@example.com")
+    broker.publish([{"user_email": "u@example.com", "message": "one"}, {"user_email": "u@example.com", "message": "two"}])
+    assert queue.qsize() == 1
+    broker.unsubscribe("u@example.com", queue)
+    broker.publish([{"user_email": "u@example.com", "message": "three"}])
+    assert queue.qsize() == 1
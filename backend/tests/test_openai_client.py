@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+import pytest
+import backend.AIService as ai_service
+import backend.main as main
+import backend.openai_client as openai_client
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def fresh_client(monkeypatch):
+    openai_client.reset_openai_client()
+    yield
+    openai_client.reset_openai_client()
+
+
+def imported_modules(module: str) -> set:
+    """Names of every module loaded by `import module` in a fresh interpreter."""
+    env = {**os.environ, "OPENAI_API_KEY": "sk-test"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    # Lines read "import time: <self us> | <cumulative us> | <indented name>"
+    return {line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines()
+            if line.startswith("import time:") and "cumulative" not in line}
+
+
+def test_app_import_does_not_load_openai():
+    modules = imported_modules("backend.main")
+    assert "backend.main" in modules
+    assert not [name for name in modules if name == "openai" or name.startswith("openai.")]
+
+
+def test_client_is_created_once_and_shared(fresh_client, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    first = openai_client.get_openai_client()
+    assert first is not None
+    assert openai_client.get_openai_client() is first
+
+
+def test_no_client_without_api_key(fresh_client, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert openai_client.get_openai_client() is None
+    assert openai_client.openai_configured() is False
+
+
+@pytest.mark.asyncio
+async def test_chatbot_and_news_use_the_shared_client(fresh_client, monkeypatch):
+    completion = MagicMock()
+    completion.choices = [MagicMock(message=MagicMock(content="HEADLINE: shared"))]
+    completion.model = "gpt-4o-mini"
+    shared = MagicMock()
+    shared.chat.completions.create = AsyncMock(return_value=completion)
+    monkeypatch.setattr(openai_client, "_client", shared)
+    monkeypatch.setattr(main, "OPENAI_AVAILABLE", True)
+    monkeypatch.setattr(ai_service, "OPENAI_AVAILABLE", True)
+
+    news = await main.generate_news_content(main.NEWS_CATEGORIES[0])
+    chat = await ai_service.call_openai_api("something unusual", "en")
+
+    assert news["source"] == "openai_direct" and news["content"] == "HEADLINE: shared"
+    assert chat["source"] == "openai"
+    assert shared.chat.completions.create.await_count == 2
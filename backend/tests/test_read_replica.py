@@ -0,0 +1,107 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+import backend.db_connection as db_connection
+from backend.db_connection import Base, Users, get_session, get_read_session
+from backend.main import app
+
+
+async def make_database(path, email):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(Users(email=email, first_name="A", last_name="B", hashed_password="x", role="student"))
+        await session.commit()
+    return engine, factory
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path, monkeypatch):
+    # The two files stand in for a primary and a replica that hasn't caught up
+    primary, primary_factory = await make_database(tmp_path / "primary.db", "primary@example.com")
+    replica, replica_factory = await make_database(tmp_path / "replica.db", "replica@example.com")
+    monkeypatch.setattr(db_connection, "async_session", primary_factory)
+    monkeypatch.setattr(db_connection, "read_async_session", replica_factory)
+    monkeypatch.setattr(db_connection, "_recent_writes", {})
+    yield
+    await primary.dispose()
+    await replica.dispose()
+
+
+def make_request(token=None):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "headers": headers, "client": ("127.0.0.1", 1234)})
+
+
+async def read_emails(request):
+    primary_gen = get_session(request)
+    primary_session = await primary_gen.__anext__()
+    read_gen = get_read_session(request, primary_session)
+    session = await read_gen.__anext__()
+    result = await session.execute(Users.__table__.select())
+    emails = [row.email for row in result]
+    await read_gen.aclose()
+    await primary_gen.aclose()
+    return emails
+
+
+async def write_user(request, email):
+    gen = get_session(request)
+    session = await gen.__anext__()
+    session.add(Users(email=email, first_name="C", last_name="D", hashed_password="x", role="student"))
+    await session.commit()
+    await gen.aclose()
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica(databases):
+    assert await read_emails(make_request("alice")) == ["replica@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_client_reads_its_own_writes_from_primary(databases):
+    alice, bob = make_request("alice"), make_request("bob")
+    await write_user(alice, "new@example.com")
+
+    assert "new@example.com" in await read_emails(alice)
+    # Other clients are not pinned to the primary
+    assert await read_emails(bob) == ["replica@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_pin_expires_after_window(databases, monkeypatch):
+    monkeypatch.setattr(db_connection, "READ_YOUR_WRITES_SECONDS", 0)
+    alice = make_request("alice")
+    await write_user(alice, "new@example.com")
+    assert await read_emails(alice) == ["replica@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_write_does_not_pin(databases):
+    alice = make_request("alice")
+    gen = get_session(alice)
+    session = await gen.__anext__()
+    session.add(Users(email="tmp@example.com", first_name="C", last_name="D", hashed_password="x", role="student"))
+    await session.flush()
+    await session.rollback()
+    await session.commit()
+    await gen.aclose()
+    assert await read_emails(alice) == ["replica@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_without_replica_reads_use_primary(databases, monkeypatch):
+    monkeypatch.setattr(db_connection, "read_async_session", None)
+    assert await read_emails(make_request("alice")) == ["primary@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_read_endpoint_is_served_by_replica(databases):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/users")
+    assert [user["email"] for user in response.json()] == ["replica@example.com"]
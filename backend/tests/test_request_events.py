@@ -0,0 +1,91 @@
+from datetime import date
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.db_connection import (
+    Base, Requests, RequestEvents, Students,
+    add_request, add_professor_response, build_timeline, load_request_timelines, record_request_event
+)
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(Students(email="s@example.com"))
+        await session.commit()
+        yield session
+
+
+@pytest.mark.asyncio
+async def test_new_request_records_created_event(session):
+    req = await add_request(session, "General Request", "s@example.com", "details", status="pending")
+    events = (await session.execute(select(RequestEvents))).scalars().all()
+    assert [(e.request_id, e.event_type, e.to_status) for e in events] == [(req.id, "created", "pending")]
+    assert req.timeline is None
+
+    timeline = (await load_request_timelines(session, [req]))[req.id]
+    assert timeline["created"] == events[0].created_at.isoformat()
+    assert timeline["status_changes"] == [{"status": "pending", "date": timeline["created"]}]
+
+
+@pytest.mark.asyncio
+async def test_each_change_is_one_insert_and_leaves_the_request_row_alone(engine, session):
+    req = await add_request(session, "General Request", "s@example.com", "details", status="pending")
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0].upper()))
+
+    req.status = "approved"
+    record_request_event(session, req, "status_change", actor_email="sec@example.com",
+                         from_status="pending", to_status="approved")
+    await session.commit()
+    statements.clear()
+
+    record_request_event(session, req, "edit", actor_email="s@example.com", details="more details")
+    await session.commit()
+    assert statements == ["INSERT"]
+
+    timeline = (await load_request_timelines(session, [req]))[req.id]
+    change = timeline["status_changes"][-1]
+    assert (change["status"], change["from"], change["to"]) == ("approved", "pending", "approved")
+    assert timeline["edits"][-1]["details"] == "more details"
+
+
+@pytest.mark.asyncio
+async def test_legacy_timeline_is_kept_before_new_events(session):
+    legacy = {"created": "2025-01-01T00:00:00", "status_changes": [{"status": "pending", "date": "2025-01-01"}]}
+    req = Requests(title="General Request", student_email="s@example.com", details="old", status="pending",
+                   created_date=date(2025, 1, 1), timeline=legacy)
+    session.add(req)
+    await session.commit()
+
+    await add_professor_response(session, req.id, "prof@example.com", "Looks fine")
+    timeline = (await load_request_timelines(session, [req]))[req.id]
+    assert timeline["created"] == "2025-01-01T00:00:00"
+    assert timeline["status_changes"] == legacy["status_changes"]
+    assert timeline["responses"][0]["professor_email"] == "prof@example.com"
+    assert timeline["responses"][0]["response_text"] == "Looks fine"
+
+
+def test_build_timeline_normalises_legacy_shapes():
+    assert build_timeline('[{"status": "response added"}]', [])["status_changes"] == [{"status": "response added"}]
+    assert build_timeline("not json", [], date(2025, 2, 3)) == {
+        "created": "2025-02-03", "status_changes": [], "responses": [], "edits": []
+    }
+
+
+def test_unknown_event_type_is_rejected():
+    with pytest.raises(ValueError):
+        record_request_event(None, Requests(id=1), "deleted")
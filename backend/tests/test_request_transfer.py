@@ -0,0 +1,124 @@
+from datetime import date
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.main import app, get_session, create_access_token
+from backend.db_connection import (
+    Base, Notifications, RequestEvents, Requests, Secretaries, StudentCourses, Students, transfer_requests
+)
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([
+            Students(email="cs@example.com", department_id="CS"),
+            Students(email="math@example.com", department_id="MATH"),
+            Secretaries(email="cs-sec@example.com", department_id="CS"),
+            StudentCourses(student_email="cs@example.com", course_id="CS101", professor_email="prof@example.com"),
+        ])
+        session.add_all([
+            Requests(id=i, title="General Request", student_email=email, details="d", status="pending",
+                     created_date=date.today())
+            for i, email in [(1, "cs@example.com"), (2, "math@example.com"), (3, "cs@example.com")]
+        ])
+        await session.commit()
+        yield session
+
+
+async def notifications_by_user(session):
+    rows = (await session.execute(select(Notifications))).scalars().all()
+    return sorted((n.user_email, n.request_id) for n in rows)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_one_select_and_one_commit(engine, session):
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0]))
+
+    transferred = await transfer_requests(session, [1, 2, 3, 99], new_course_id="CS101", reason="Moved",
+                                          actor_email="cs-sec@example.com")
+
+    assert [r.id for r in transferred] == [1, 2, 3]
+    assert statements.count("SELECT") == 1
+    assert await notifications_by_user(session) == [
+        ("cs@example.com", 1), ("cs@example.com", 3), ("math@example.com", 2),
+        ("prof@example.com", 1), ("prof@example.com", 3)
+    ]
+    events = (await session.execute(select(RequestEvents))).scalars().all()
+    assert {(e.request_id, e.actor_email, e.payload["new_course_id"]) for e in events} == {
+        (1, "cs-sec@example.com", "CS101"), (2, "cs-sec@example.com", "CS101"), (3, "cs-sec@example.com", "CS101")
+    }
+
+
+@pytest.mark.asyncio
+async def test_without_a_course_the_department_secretary_is_notified(session):
+    await transfer_requests(session, [1, 2], reason="Back to the office")
+
+    assert await notifications_by_user(session) == [
+        ("cs-sec@example.com", 1), ("cs@example.com", 1), ("math@example.com", 2)
+    ]
+    student_message = (await session.execute(
+        select(Notifications.message).where(Notifications.user_email == "cs@example.com")
+    )).scalar()
+    assert "transferred to Department Secretary" in student_message
+    assert (await session.get(Requests, 1)).course_id is None
+
+
+@pytest_asyncio.fixture
+async def client(session):
+    app.dependency_overrides[get_session] = lambda: session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(get_session, None)
+
+
+def auth(role, email="cs-sec@example.com"):
+    return {"Authorization": f"Bearer {create_access_token({'user_email': email, 'role': role})}"}
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint(client):
+    response = await client.put("/requests/transfer", headers=auth("secretary"),
+                                json={"request_ids": [3, 1, 42], "new_course_id": "CS101", "reason": "Moved"})
+    assert response.json() == {"transferred": [1, 3], "not_found": [42]}
+
+    forbidden = await client.put("/requests/transfer", headers=auth("student"), json={"request_ids": [1]})
+    assert forbidden.status_code == 403
+    empty = await client.put("/requests/transfer", headers=auth("admin"), json={"request_ids": []})
+    assert empty.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_secretary_cannot_transfer_another_departments_requests(session, client):
+    session.add(Secretaries(email="math-sec@example.com", department_id="MATH"))
+    await session.commit()
+    response = await client.put("/requests/transfer", headers=auth("secretary", "math-sec@example.com"),
+                                json={"request_ids": [1, 2, 3], "new_course_id": "CS101", "reason": "Moved"})
+    assert response.json() == {"transferred": [2], "not_found": [1, 3]}
+    assert (await session.get(Requests, 1)).course_id is None
+
+    admin = await client.put("/requests/transfer", headers=auth("admin", "admin@example.com"),
+                             json={"request_ids": [1, 2], "reason": "Moved"})
+    assert admin.json() == {"transferred": [1, 2], "not_found": []}
+
+
+@pytest.mark.asyncio
+async def test_single_transfer_endpoint(client):
+    response = await client.put("/request/2/transfer", json={"reason": "Wrong course"})
+    assert response.json() == {"message": "Request transferred successfully"}
+    assert (await client.put("/request/99/transfer", json={"reason": "x"})).status_code == 404
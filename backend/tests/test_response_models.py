@@ -0,0 +1,79 @@
+from datetime import date
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.db_connection import (
+    Base, Users, Students, Courses, Professors, ProfessorUnavailability, Requests, RequestRoutingRules, get_session
+)
+from backend.main import app
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/app.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([
+            Users(email="s@example.com", first_name="S", last_name="T", hashed_password="$2b$secret", role="student"),
+            Students(email="s@example.com"),
+            Courses(id="CS101", name="Intro", credits=3.0),
+            RequestRoutingRules(type="General Request", destination="secretary"),
+            Professors(email="p@example.com"),
+            ProfessorUnavailability(professor_email="p@example.com", start_date=date(2025, 1, 1),
+                                    end_date=date(2025, 1, 7), reason="Conference"),
+            Requests(title="General Request", student_email="s@example.com", details="d", status="pending",
+                     created_date=date(2025, 1, 1)),
+        ])
+        await session.commit()
+
+    async def override():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = override
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_session, None)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, path", [
+    ("get", "/users"),
+    ("post", "/Users/getUsers"),
+    ("post", "/Users/getUser/s@example.com"),
+    ("get", "/courses"),
+    ("get", "/api/request_routing_rules"),
+    ("get", "/requests/s@example.com"),
+    ("get", "/professor/unavailability/p@example.com"),
+])
+async def test_responses_do_not_leak_orm_state(client, method, path):
+    response = await getattr(client, method)(path)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "_sa_instance_state" not in response.text
+    assert "hashed_password" not in response.text and "$2b$secret" not in response.text
+
+
+@pytest.mark.asyncio
+async def test_get_user_includes_role_data(client):
+    response = await client.post("/Users/getUser/s@example.com")
+    data = response.json()
+    assert data["email"] == "s@example.com"
+    assert data["student_data"] == {"email": "s@example.com", "department_id": None}
+
+
+@pytest.mark.asyncio
+async def test_request_and_unavailability_shapes(client):
+    (request,) = (await client.get("/requests/s@example.com")).json()
+    assert set(request) == {"id", "title", "student_email", "details", "files", "status", "created_date",
+                            "timeline", "deadline_date", "is_expired"}
+    assert request["created_date"] == "2025-01-01" and isinstance(request["timeline"], dict)
+
+    periods = (await client.get("/professor/unavailability/p@example.com")).json()["periods"]
+    assert periods == [{"id": periods[0]["id"], "professor_email": "p@example.com", "start_date": "2025-01-01",
+                        "end_date": "2025-01-07", "reason": "Conference", "created_at": periods[0]["created_at"]}]
@@ -0,0 +1,203 @@
+import asyncio
+from datetime import datetime, timedelta, date
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.db_connection import (
+    Base, ScheduledJobLeases, ScheduledJobRuns, Requests, Students, RequestDeadlineConfig,
+    expire_overdue_requests, load_request_timelines
+)
+from backend.scheduler import CronSchedule, JobScheduler
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    # A file database so every session (worker) sees the same rows
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/scheduler.db", future=True)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _runs(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(select(ScheduledJobRuns))).scalars().all()
+
+
+async def _lease(session_factory, name):
+    async with session_factory() as session:
+        return await session.get(ScheduledJobLeases, name)
+
+
+def test_cron_schedule_next_after():
+    every_quarter = CronSchedule("*/15 * * * *")
+    assert every_quarter.next_after(datetime(2025, 1, 1, 10, 7)) == datetime(2025, 1, 1, 10, 15)
+    assert every_quarter.next_after(datetime(2025, 1, 1, 10, 45)) == datetime(2025, 1, 1, 11, 0)
+
+    nightly = CronSchedule("30 2 * * *")
+    assert nightly.next_after(datetime(2025, 1, 1, 3, 0)) == datetime(2025, 1, 2, 2, 30)
+
+    # 2025-01-05 is a Sunday (day 0)
+    sundays = CronSchedule("0 9 * * 0")
+    assert sundays.next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 5, 9, 0)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "61 * * * *", "*/0 * * * *", "5-2 * * * *"])
+def test_cron_schedule_rejects_invalid(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_add_job_requires_one_schedule(session_factory):
+    scheduler = JobScheduler(session_factory)
+
+    async def job(session):
+        return None
+
+    with pytest.raises(ValueError):
+        scheduler.add_job("job", job)
+    with pytest.raises(ValueError):
+        scheduler.add_job("job", job, every=timedelta(minutes=1), cron="* * * * *")
+    scheduler.add_job("job", job, every=timedelta(minutes=1))
+    with pytest.raises(ValueError):
+        scheduler.add_job("job", job, cron="* * * * *")
+
+
+@pytest.mark.asyncio
+async def test_only_one_worker_runs_a_due_job(session_factory):
+    calls = []
+
+    async def job(session):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    workers = []
+    for i in range(3):
+        worker = JobScheduler(session_factory, worker_id=f"worker-{i}")
+        worker.add_job("news", job, every=timedelta(hours=1), run_on_start=True)
+        workers.append(worker)
+
+    await workers[0]._ensure_lease_row(workers[0].jobs["news"])
+    ran = await asyncio.gather(*(w.run_pending(w.jobs["news"]) for w in workers))
+
+    assert sum(ran) == 1 and len(calls) == 1
+    runs = await _runs(session_factory)
+    assert [(r.status, r.detail) for r in runs] == [("success", "done")]
+    lease = await _lease(session_factory, "news")
+    assert lease.owner is None and lease.locked_until is None
+    assert lease.next_run_at > datetime.now() + timedelta(minutes=59)
+
+    # Not due again until the next interval
+    assert await workers[1].run_pending(workers[1].jobs["news"]) is False
+
+
+@pytest.mark.asyncio
+async def test_failed_run_is_recorded_and_lease_released(session_factory):
+    async def job(session):
+        raise RuntimeError("boom")
+
+    scheduler = JobScheduler(session_factory, worker_id="w")
+    scheduler.add_job("sweep", job, cron="*/15 * * * *", run_on_start=True)
+    await scheduler._ensure_lease_row(scheduler.jobs["sweep"])
+
+    assert await scheduler.run_pending(scheduler.jobs["sweep"]) is True
+    runs = await _runs(session_factory)
+    assert runs[0].status == "failed" and "boom" in runs[0].detail
+    assert (await _lease(session_factory, "sweep")).owner is None
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_can_be_taken_over(session_factory):
+    async def job(session):
+        return None
+
+    scheduler = JobScheduler(session_factory, worker_id="new")
+    scheduler.add_job("news", job, every=timedelta(hours=1))
+    async with session_factory() as session:
+        session.add(ScheduledJobLeases(job_name="news", owner="dead-worker",
+                                       locked_until=datetime.now() - timedelta(seconds=1),
+                                       next_run_at=datetime.now() - timedelta(hours=2)))
+        await session.commit()
+
+    assert await scheduler.try_acquire(scheduler.jobs["news"]) is True
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_running_job(session_factory):
+    started = asyncio.Event()
+
+    async def job(session):
+        started.set()
+        await asyncio.sleep(30)
+
+    scheduler = JobScheduler(session_factory, worker_id="w", poll_seconds=0.01)
+    scheduler.add_job("slow", job, every=timedelta(hours=1), run_on_start=True)
+    scheduler.start()
+    await asyncio.wait_for(started.wait(), timeout=5)
+    assert scheduler.running
+
+    await scheduler.stop()
+    assert not scheduler.running
+    runs = await _runs(session_factory)
+    assert runs[0].status == "cancelled" and runs[0].finished_at is not None
+    lease = await _lease(session_factory, "slow")
+    assert lease.owner is None and lease.next_run_at <= datetime.now()
+
+
+@pytest.mark.asyncio
+async def test_lease_row_creation_is_retried(session_factory, capsys):
+    ran = asyncio.Event()
+
+    async def job(session):
+        ran.set()
+
+    scheduler = JobScheduler(session_factory, worker_id="w", poll_seconds=0.01)
+    scheduler.add_job("flaky", job, every=timedelta(hours=1), run_on_start=True)
+    ensure_lease_row, attempts = scheduler._ensure_lease_row, []
+
+    async def fail_once(job):
+        attempts.append(job.name)
+        if len(attempts) == 1:
+            raise ConnectionError("database unavailable")
+        await ensure_lease_row(job)
+
+    scheduler._ensure_lease_row = fail_once
+    scheduler.start()
+    try:
+        await asyncio.wait_for(ran.wait(), timeout=5)
+    finally:
+        await scheduler.stop()
+    assert attempts == ["flaky", "flaky"]
+    assert "Scheduler error for job flaky: database unavailable" in capsys.readouterr().out
+
+
+@pytest.mark.asyncio
+async def test_expire_overdue_requests(session_factory):
+    async with session_factory() as session:
+        session.add(Students(email="s@x.com"))
+        session.add(RequestDeadlineConfig(request_type="General Request", deadline_days=5, created_by="admin@x.com"))
+        session.add_all([
+            Requests(title="General Request", student_email="s@x.com", details="old", status="pending",
+                     created_date=date.today() - timedelta(days=10), timeline={"status_changes": []}),
+            Requests(title="General Request", student_email="s@x.com", details="list timeline", status="pending",
+                     created_date=date.today() - timedelta(days=10), timeline=[{"status": "response added"}]),
+            Requests(title="General Request", student_email="s@x.com", details="new", status="pending",
+                     created_date=date.today()),
+            Requests(title="Other", student_email="s@x.com", details="no config", status="pending",
+                     created_date=date.today() - timedelta(days=100)),
+        ])
+        await session.commit()
+
+        assert await expire_overdue_requests(session) == 2
+
+        rows = {r.details: r for r in (await session.execute(select(Requests))).scalars().all()}
+        assert rows["old"].status == "expired"
+        timelines = await load_request_timelines(session, list(rows.values()))
+        assert timelines[rows["old"].id]["status_changes"][-1]["reason"] == "deadline_passed"
+        assert timelines[rows["list timeline"].id]["status_changes"][-1]["to"] == "expired"
+        assert timelines[rows["list timeline"].id]["status_changes"][0] == {"status": "response added"}
+        assert rows["new"].status == "pending" and rows["no config"].status == "pending"
@@ -0,0 +1,136 @@
+from datetime import date
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.main import app, get_read_session, create_access_token
+from backend.db_connection import Base, Courses, Requests, Responses, Secretaries, Students, encode_cursor
+from backend.search import InvertedIndex, mysql_search_query, search_requests
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([
+            Students(email="cs@example.com", department_id="CS"),
+            Students(email="math@example.com", department_id="MATH"),
+            Secretaries(email="cs-sec@example.com", department_id="CS"),
+            Courses(id="CS101", name="Intro", credits=3, professor_email="prof@example.com"),
+            Courses(id="MATH1", name="Calculus", credits=3, professor_email="other@example.com"),
+        ])
+        rows = [
+            (1, "Exam Extension", "Sick during the exam", "cs@example.com", "CS101"),
+            (2, "General Request", "I need an exam extension", "cs@example.com", "CS101"),
+            (3, "Grade Appeal", "Question 4 was graded wrong", "math@example.com", "MATH1"),
+            (4, "General Request", "Parking permit", "math@example.com", "MATH1"),
+        ]
+        session.add_all([
+            Requests(id=i, title=title, details=details, student_email=email, course_id=course,
+                     status="pending", created_date=date.today())
+            for i, title, details, email, course in rows
+        ])
+        session.add(Responses(request_id=4, professor_email="other@example.com",
+                              response_text="Approved, the extension is granted"))
+        await session.commit()
+        yield session
+
+
+async def ids(session, text, role="admin", email="admin@example.com", **kwargs):
+    hits, _ = await search_requests(session, text, role, email, **kwargs)
+    return [request.id for request, _ in hits]
+
+
+@pytest.mark.asyncio
+async def test_title_hits_rank_first_and_responses_are_searched(session):
+    assert await ids(session, "extension") == [1, 4, 2]  # 4 and 2 tie on one body hit; higher id first
+    assert await ids(session, "GRANTED") == [4]
+    assert await ids(session, "nothing matches") == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("role, email, expected", [
+    ("student", "cs@example.com", [1, 2]),
+    ("professor", "other@example.com", [4]),
+    ("secretary", "cs-sec@example.com", [1, 2]),
+])
+async def test_results_are_scoped_to_the_role(session, role, email, expected):
+    assert await ids(session, "extension", role, email) == expected
+
+
+@pytest.mark.asyncio
+async def test_pages_follow_the_cursor(session):
+    first, cursor = await search_requests(session, "extension request", "admin", "a@example.com", limit=2)
+    second, last = await search_requests(session, "extension request", "admin", "a@example.com", limit=2,
+                                         cursor=cursor)
+    assert last is None
+    assert [r.id for r, _ in first + second] == await ids(session, "extension request")
+    assert first[-1][1] >= second[0][1]
+
+
+@pytest.mark.asyncio
+async def test_bad_input_is_rejected(session):
+    for kwargs in ({"text": "  ?! "}, {"text": "exam", "cursor": "zzz"}, {"text": "exam", "role": "guest"}):
+        kwargs = {"role": "admin", **kwargs}
+        with pytest.raises(ValueError):
+            await search_requests(session, kwargs.pop("text"), kwargs.pop("role"), "a@example.com", **kwargs)
+
+
+def test_inverted_index_ties_break_on_id():
+    index = InvertedIndex()
+    for doc_id in (3, 1, 2):
+        index.add(doc_id, "same words")
+    assert [doc_id for _, doc_id in index.search("words")] == [3, 2, 1]
+
+
+def test_mysql_statement_ranks_on_fulltext_and_pages_on_rounded_scores():
+    query = mysql_search_query("exam extension", "professor", "prof@example.com", 20, encode_cursor(1.5, 7))
+    compiled = query.compile(dialect=mysql.dialect())
+    sql = " ".join(str(compiled).split())
+
+    assert "MATCH (requests.title, requests.details) AGAINST (%s IN NATURAL LANGUAGE MODE)" in sql
+    assert "max(MATCH (responses.response_text) AGAINST (%s IN NATURAL LANGUAGE MODE))" in sql
+    assert " UNION SELECT responses.request_id" in sql
+    assert "round(" in sql and "coalesce(" in sql
+    assert "requests.course_id IN (SELECT courses.id FROM courses WHERE courses.professor_email = %s)" in sql
+    assert "anon_1.score < %s OR anon_1.score = %s AND anon_1.id < %s" in sql
+    assert sql.endswith("ORDER BY anon_1.score DESC, anon_1.id DESC LIMIT %s")
+    params = compiled.params
+    assert 1.5 in params.values() and 7 in params.values() and 21 in params.values()
+    assert 6 in params.values()  # round(score, SCORE_DIGITS)
+
+
+@pytest_asyncio.fixture
+async def client(session):
+    app.dependency_overrides[get_read_session] = lambda: session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(get_read_session, None)
+
+
+def auth(email, role):
+    return {"Authorization": f"Bearer {create_access_token({'user_email': email, 'role': role})}"}
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint(client):
+    response = await client.get("/api/search/requests?q=extension&limit=2", headers=auth("cs@example.com", "student"))
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [1, 2]
+    assert body["items"][0]["score"] > body["items"][1]["score"]
+    assert body["next_cursor"] is None
+
+    assert (await client.get("/api/search/requests?q=%20", headers=auth("a@example.com", "admin"))).status_code == 400
+    bad = await client.get("/api/search/requests?q=exam&cursor=zzz", headers=auth("a@example.com", "admin"))
+    assert bad.status_code == 400
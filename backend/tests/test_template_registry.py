@@ -0,0 +1,161 @@
+import pytest
+import pytest_asyncio
+from datetime import date, timedelta
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.main import app, get_session
+from backend.db_connection import (
+    Base, Courses, RequestRoutingRules, Requests, Students, Secretaries, Users,
+    create_request_template, update_request_template, delete_request_template,
+    create_or_update_deadline_config, is_request_expired, template_registry
+)
+
+
+FIELDS = [
+    {"field_name": "reason", "field_label": "Reason", "field_type": "text", "field_order": 2},
+    {"field_name": "unit", "field_label": "Unit", "field_type": "text", "field_order": 1, "is_required": True},
+]
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(RequestRoutingRules(type="Military Service Request", destination="secretary"))
+        await session.commit()
+        await create_request_template(session, "Military Service Request", "Reserve duty", "admin@example.com", FIELDS)
+        yield session
+
+
+@pytest_asyncio.fixture
+async def client(session):
+    app.dependency_overrides[get_session] = lambda: session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(get_session, None)
+
+
+def statements_on(engine):
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_loaded_once_with_sorted_fields(engine, session):
+    statements = statements_on(engine)
+    first = await template_registry.get(session)
+    loads = len(statements)
+    second = await template_registry.get(session)
+
+    assert second is first and len(statements) == loads
+    template = first.by_name["Military Service Request"]
+    assert first.by_id[template["id"]] is template
+    assert [f["field_name"] for f in template["fields"]] == ["unit", "reason"]
+    assert first.routing_rules == {"Military Service Request": "secretary"}
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_and_change_the_version(session):
+    before = await template_registry.get(session)
+    template_id = before.by_name["Military Service Request"]["id"]
+
+    await update_request_template(session, template_id, description="Reserve duty (updated)")
+    updated = await template_registry.get(session)
+    assert updated.by_id[template_id]["description"] == "Reserve duty (updated)"
+    assert updated.version != before.version
+    assert updated.template_versions[template_id] != before.template_versions[template_id]
+
+    await create_or_update_deadline_config(session, "Military Service Request", 7, "admin@example.com")
+    assert (await template_registry.get(session)).deadline_configs["Military Service Request"].deadline_days == 7
+
+    await delete_request_template(session, template_id)
+    assert (await template_registry.get(session)).by_id[template_id]["is_active"] is False
+
+
+@pytest.mark.asyncio
+async def test_deadline_rules_work_with_expiry_helpers(session):
+    await create_or_update_deadline_config(session, "Military Service Request", 3, "admin@example.com")
+    rule = (await template_registry.get(session)).deadline_configs["Military Service Request"]
+    old = Requests(title="Military Service Request", created_date=date.today() - timedelta(days=5))
+    assert is_request_expired(old, rule)
+
+
+@pytest.mark.asyncio
+async def test_form_endpoints_serve_etags_and_304(session, client):
+    response = await client.get("/api/request_templates/by_name/Military Service Request")
+    assert response.status_code == 200
+    assert set(response.json()) == {"id", "name", "description", "fields"}
+    etag = response.headers["etag"]
+
+    cached = await client.get("/api/request_templates/by_name/Military Service Request",
+                              headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+
+    full = await client.get("/api/request_template_by_name/Military Service Request")
+    assert full.json()["is_active"] is True
+    assert (await client.get("/api/request_template_by_name/Unknown")).status_code == 404
+    assert (await client.get("/api/request_templates/999")).status_code == 404
+    assert (await client.get("/api/request_templates/by_name/General Request")).json() is None
+
+    listing = await client.get("/api/request_templates")
+    assert [t["name"] for t in listing.json()] == ["Military Service Request"]
+    list_etag = listing.headers["etag"]
+    assert (await client.get("/api/request_templates", headers={"If-None-Match": list_etag})).status_code == 304
+    assert (await client.get("/api/request_templates?active_only=false",
+                             headers={"If-None-Match": list_etag})).status_code == 200
+
+    template_id = response.json()["id"]
+    await update_request_template(session, template_id, description="Changed")
+    changed = await client.get("/api/request_templates/by_name/Military Service Request",
+                               headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()["description"] == "Changed"
+
+
+@pytest.mark.asyncio
+async def test_routing_rule_update_reaches_request_creation(engine, session, client):
+    session.add(Students(email="s@example.com", department_id="CS"))
+    session.add(Secretaries(email="sec@example.com", department_id="CS"))
+    await session.commit()
+
+    await client.put("/api/request_routing_rules/General Request", json={"destination": "secretary"})
+    assert (await template_registry.get(session)).routing_rules["General Request"] == "secretary"
+
+    statements = statements_on(engine)
+    response = await client.post("/submit_request/create", json={
+        "title": "General Request", "student_email": "s@example.com", "details": "Please help"
+    })
+    assert response.status_code == 200
+    assert not any("request_routing_rules" in s for s in statements)
+
+
+@pytest.mark.asyncio
+async def test_request_lists_take_deadlines_from_the_registry(engine, session, client):
+    session.add_all([
+        Users(email="s@example.com", first_name="S", last_name="T", role="student", hashed_password="x"),
+        Courses(id="CS101", name="Intro", credits=3, professor_email="prof@example.com"),
+        Requests(title="Military Service Request", student_email="s@example.com", details="d", status="pending",
+                 course_id="CS101", created_date=date.today() - timedelta(days=5)),
+    ])
+    await session.commit()
+    await create_or_update_deadline_config(session, "Military Service Request", 3, "admin@example.com")
+    await template_registry.get(session)
+
+    statements = statements_on(engine)
+    for path in ("/requests/s@example.com", "/requests/professor/prof@example.com"):
+        (request,) = (await client.get(path)).json()
+        assert request["is_expired"] is True and request["deadline_date"]
+    assert request["status"] == "expired"
+    assert not any("request_deadline_config" in s for s in statements)
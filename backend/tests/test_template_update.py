@@ -0,0 +1,100 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.db_connection import (
+    Base, RequestTemplateFields, create_request_template, update_request_template, template_registry
+)
+
+
+def field(name, label=None, order=0, **extra):
+    return {"field_name": name, "field_label": label or name.title(), "field_type": "text", "field_order": order, **extra}
+
+
+FIELDS = [field(f"field{i}", order=i) for i in range(50)]
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def template(session):
+    return await create_request_template(session, "Big Form", None, "admin@example.com", FIELDS)
+
+
+async def stored_fields(session, template_id):
+    result = await session.execute(
+        select(RequestTemplateFields.id, RequestTemplateFields.field_name, RequestTemplateFields.field_label)
+        .where(RequestTemplateFields.template_id == template_id)
+    )
+    return {name: (id, label) for id, name, label in result.all()}
+
+
+def writes_on(engine):
+    writes = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statement.split()[0] in ("INSERT", "UPDATE", "DELETE")
+                 and writes.append(statement.split()[0]))
+    return writes
+
+
+@pytest.mark.asyncio
+async def test_one_label_change_is_one_update_and_keeps_ids(engine, session, template):
+    before = await stored_fields(session, template.id)
+    writes = writes_on(engine)
+
+    edited = [dict(f) for f in FIELDS]
+    edited[7]["field_label"] = "Renamed"
+    await update_request_template(session, template.id, fields=edited)
+
+    after = await stored_fields(session, template.id)
+    assert writes == ["UPDATE", "UPDATE"]  # The template row, then the one field
+    assert {name: id for name, (id, _) in after.items()} == {name: id for name, (id, _) in before.items()}
+    assert after["field7"][1] == "Renamed"
+
+
+@pytest.mark.asyncio
+async def test_adds_and_removals_are_bulk_statements(engine, session, template):
+    before = await stored_fields(session, template.id)
+    writes = writes_on(engine)
+
+    edited = [f for f in FIELDS if f["field_name"] not in ("field1", "field2")] + [field("extra", order=99)]
+    updated = await update_request_template(session, template.id, fields=edited)
+
+    assert sorted(writes) == ["DELETE", "INSERT", "UPDATE"]
+    after = await stored_fields(session, template.id)
+    assert set(after) == set(before) - {"field1", "field2"} | {"extra"}
+    assert after["field3"][0] == before["field3"][0]
+    assert {f.field_name for f in updated.fields} == set(after)
+
+
+@pytest.mark.asyncio
+async def test_unchanged_fields_write_nothing_but_the_template(engine, session, template):
+    writes = writes_on(engine)
+    await update_request_template(session, template.id, description="Same fields", fields=[dict(f) for f in FIELDS])
+    assert writes == ["UPDATE"]
+
+
+@pytest.mark.asyncio
+async def test_registry_sees_the_updated_fields(session, template):
+    await template_registry.get(session)
+    edited = [dict(f) for f in FIELDS[:2]]
+    edited[0]["field_label"] = "First"
+    await update_request_template(session, template.id, fields=edited)
+
+    fields = (await template_registry.get(session)).by_id[template.id]["fields"]
+    assert [(f["field_name"], f["field_label"]) for f in fields] == [("field0", "First"), ("field1", "Field1")]
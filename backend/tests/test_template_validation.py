@@ -0,0 +1,135 @@
+import pytest
+import pytest_asyncio
+from datetime import date
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.main import app, get_session
+from backend.db_connection import Base, Students, create_request_template, update_request_template
+from backend.template_validation import (
+    TemplateFieldsError, TemplateValidatorCache, template_validators, validate_template_fields
+)
+
+
+TEMPLATE = {
+    "id": 7,
+    "name": "Military Service Request",
+    "fields": [
+        {"field_name": "unit", "field_label": "Unit", "field_type": "text", "is_required": True,
+         "validation_rules": {"min_length": 3, "max_length": 10}},
+        {"field_name": "days served", "field_label": "Days served", "field_type": "number",
+         "validation_rules": {"min": 1, "max": 60}},
+        {"field_name": "start", "field_label": "Start date", "field_type": "date"},
+        {"field_name": "branch", "field_label": "Branch", "field_type": "select",
+         "field_options": {"options": ["Army", "Navy"]}},
+        {"field_name": "contact", "field_label": "Contact email", "field_type": "email"},
+        {"field_name": "phone", "field_label": "Phone", "field_type": "tel"},
+        {"field_name": "orders", "field_label": "Orders", "field_type": "file", "is_required": True},
+        {"field_name": "code", "field_label": "Code", "field_type": "text", "validation_rules": {"pattern": "["}},
+    ]
+}
+
+
+def test_valid_submission_is_parsed():
+    values = validate_template_fields(TEMPLATE, "v1", {
+        "unit": "Golani", "days served": "14", "start": "2025-03-01", "branch": "Army",
+        "contact": "s@example.com", "phone": "+972 50 123 4567", "orders": [{}], "code": "[x", "extra": 1
+    })
+    assert values["days served"] == 14.0
+    assert values["start"] == date(2025, 3, 1)
+    assert "extra" not in values
+
+
+def test_blank_optional_fields_are_allowed():
+    values = validate_template_fields(TEMPLATE, "v1", {"unit": "Golani", "days served": "", "orders": ["a.pdf"]})
+    assert values["days served"] is None and values["branch"] is None
+
+
+@pytest.mark.parametrize("values, label", [
+    ({"unit": "", "orders": ["a.pdf"]}, "Unit"),
+    ({"unit": "ab", "orders": ["a.pdf"]}, "Unit"),
+    ({"unit": "Golani", "orders": []}, "Orders"),
+    ({"unit": "Golani", "orders": ["a.pdf"], "days served": 90}, "Days served"),
+    ({"unit": "Golani", "orders": ["a.pdf"], "days served": "many"}, "Days served"),
+    ({"unit": "Golani", "orders": ["a.pdf"], "start": "yesterday"}, "Start date"),
+    ({"unit": "Golani", "orders": ["a.pdf"], "branch": "Air Force"}, "Branch"),
+    ({"unit": "Golani", "orders": ["a.pdf"], "contact": "not-an-email"}, "Contact email"),
+    ({"unit": "Golani", "orders": ["a.pdf"], "phone": "call me"}, "Phone"),
+])
+def test_invalid_submission_names_the_field(values, label):
+    with pytest.raises(TemplateFieldsError) as e:
+        validate_template_fields(TEMPLATE, "v1", values)
+    assert [error_label for error_label, _ in e.value.errors] == [label]
+
+
+def test_models_are_compiled_once_per_version():
+    cache = TemplateValidatorCache()
+    model = cache.get(TEMPLATE, "v1")
+    assert cache.get(TEMPLATE, "v1") is model
+    assert cache.get(TEMPLATE, "v2") is not model
+    cache.invalidate(TEMPLATE["id"])
+    assert cache.get(TEMPLATE, "v2") is not model
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(Students(email="s@example.com"))
+        await session.commit()
+        await create_request_template(session, "Leave Request", None, "admin@example.com", [
+            {"field_name": "reason", "field_label": "Reason", "field_type": "text", "is_required": True,
+             "validation_rules": {"min_length": 10}}
+        ])
+        template_validators.invalidate()
+        yield session
+
+
+@pytest_asyncio.fixture
+async def client(session):
+    app.dependency_overrides[get_session] = lambda: session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(get_session, None)
+
+
+def submission(reason):
+    return {"title": "Leave Request", "student_email": "s@example.com", "details": "d", "custom_fields": {"reason": reason}}
+
+
+@pytest.mark.asyncio
+async def test_invalid_submission_is_rejected_before_any_write(engine, client):
+    await client.get("/api/request_templates")  # Warm the registry
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    response = await client.post("/submit_request/create", json=submission("short"))
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid request fields: Reason:")
+    assert statements == []
+
+    response = await client.post("/submit_request/create", json=submission("A long enough reason"))
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_template_update_replaces_the_compiled_model(session, client):
+    assert (await client.post("/submit_request/create", json=submission("A long enough reason"))).status_code == 200
+    template_id = (await client.get("/api/request_templates")).json()[0]["id"]
+
+    await update_request_template(session, template_id, fields=[
+        {"field_name": "reason", "field_label": "Reason", "field_type": "text", "is_required": True,
+         "validation_rules": {"min_length": 50}}
+    ])
+    assert (await client.post("/submit_request/create", json=submission("A long enough reason"))).status_code == 400
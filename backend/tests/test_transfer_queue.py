@@ -0,0 +1,133 @@
+from datetime import date, timedelta
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.main import app, get_session, create_access_token
+from backend.db_connection import (
+    Base, Requests, Secretaries, Students, Users, decode_cursor, encode_cursor, get_transfer_queue
+)
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        for department in ("CS", "MATH"):
+            email = f"{department.lower()}@example.com"
+            session.add(Users(email=email, first_name=department, last_name="Student", role="student",
+                               hashed_password="x"))
+            session.add(Students(email=email, department_id=department))
+            session.add(Secretaries(email=f"{department.lower()}-sec@example.com", department_id=department))
+        # Ten requests per department over five days, so created_date ties need the id tiebreak
+        today = date.today()
+        session.add_all([
+            Requests(title="Grade Appeal Request" if i % 2 else "General Request", details="d",
+                     student_email=email, status="approved" if i == 9 else "pending",
+                     created_date=today - timedelta(days=i // 2))
+            for i in range(10) for email in ("cs@example.com", "math@example.com")
+        ])
+        await session.commit()
+        yield session
+
+
+async def all_pages(session, **kwargs):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = await get_transfer_queue(session, cursor=cursor, **kwargs)
+        pages.append([row[0].id for row in rows])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_the_queue_once_in_order(session):
+    pages = await all_pages(session, limit=4)
+    ids = [i for page in pages for i in page]
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 2]
+    assert len(set(ids)) == 18  # Everything but the two approved requests
+
+    rows, _ = await get_transfer_queue(session, limit=100)
+    expected = sorted(rows, key=lambda row: (row[0].created_date, row[0].id), reverse=True)
+    assert ids == [row[0].id for row in expected]
+
+
+@pytest.mark.asyncio
+async def test_department_filter_sorting_and_title(session):
+    rows, _ = await get_transfer_queue(session, secretary_email="cs-sec@example.com", limit=100)
+    assert {row[0].student_email for row in rows} == {"cs@example.com"}
+    assert rows[0][1:] == ("CS", "Student", "CS")
+
+    pages = await all_pages(session, title="General Request", sort="id", descending=False, limit=3)
+    ids = [i for page in pages for i in page]
+    assert ids == sorted(ids) and len(ids) == 10
+
+    approved, _ = await get_transfer_queue(session, status="approved")
+    assert len(approved) == 2
+
+
+@pytest.mark.asyncio
+async def test_bad_sort_or_cursor_is_rejected(session):
+    with pytest.raises(ValueError):
+        await get_transfer_queue(session, sort="details")
+    with pytest.raises(ValueError):
+        await get_transfer_queue(session, cursor="not a cursor")
+    with pytest.raises(ValueError):
+        await get_transfer_queue(session, cursor=encode_cursor("yesterday", 1))
+    assert decode_cursor(encode_cursor("2025-01-01", 7)) == ["2025-01-01", 7]
+
+
+@pytest_asyncio.fixture
+async def client(session):
+    app.dependency_overrides[get_session] = lambda: session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(get_session, None)
+
+
+def auth(email, role):
+    return {"Authorization": f"Bearer {create_access_token({'user_email': email, 'role': role})}"}
+
+
+@pytest.mark.asyncio
+async def test_admin_queue_is_two_queries_per_page(engine, client):
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    response = await client.get("/admin/transfer-requests?limit=5", headers=auth("admin@example.com", "admin"))
+    body = response.json()
+    assert len(body["items"]) == 5 and body["next_cursor"]
+    assert body["items"][0]["student_name"].endswith("Student") and body["items"][0]["department_id"]
+    assert "created" in body["items"][0]["timeline"]
+    assert len(statements) == 2  # The page, then its timelines
+
+    second = await client.get(f"/admin/transfer-requests?limit=5&cursor={body['next_cursor']}",
+                              headers=auth("admin@example.com", "admin"))
+    assert not {i["id"] for i in body["items"]} & {i["id"] for i in second.json()["items"]}
+
+    bad = await client.get("/admin/transfer-requests?cursor=zzz", headers=auth("admin@example.com", "admin"))
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_secretary_queue(client):
+    response = await client.get("/secretary/transfer-requests/math-sec@example.com?title=General Request",
+                                headers=auth("math-sec@example.com", "secretary"))
+    items = response.json()["items"]
+    assert len(items) == 5 and {i["student_email"] for i in items} == {"math@example.com"}
+
+    missing = await client.get("/secretary/transfer-requests/nobody@example.com",
+                               headers=auth("math-sec@example.com", "secretary"))
+    assert missing.status_code == 404
@@ -0,0 +1,120 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.main import app, get_session
+from backend.db_connection import Base, Professors, Secretaries, Students, Users, get_user_directory
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        # Twelve students sharing three last names, so pages break inside a name
+        for i in range(12):
+            email = f"s{i:02d}@example.com"
+            session.add(Users(email=email, first_name=f"Student{i}", last_name=("Cohen", "Levi", "Mizrahi")[i % 3],
+                              role="student", hashed_password="$2b$secret"))
+            session.add(Students(email=email, department_id="CS" if i < 8 else "MATH"))
+        session.add_all([
+            Users(email="prof@example.com", first_name="Dana", last_name="Avraham", role="professor",
+                  hashed_password="$2b$secret"),
+            Professors(email="prof@example.com", department_id="CS"),
+            Users(email="sec@example.com", first_name="Noa", last_name="Ben_Ami", role="secretary",
+                  hashed_password="$2b$secret"),
+            Secretaries(email="sec@example.com", department_id="MATH"),
+        ])
+        await session.commit()
+        yield session
+
+
+async def all_pages(session, **kwargs):
+    emails, cursor = [], None
+    while True:
+        rows, cursor, _ = await get_user_directory(session, cursor=cursor, **kwargs)
+        emails += [row[0] for row in rows]
+        if cursor is None:
+            return emails
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_everyone_once_in_name_order(session):
+    everyone, _, total = await get_user_directory(session, limit=None, include_total=True)
+    assert total == 14
+    assert [(row[3], row[0]) for row in everyone] == sorted((row[3], row[0]) for row in everyone)
+    assert await all_pages(session, limit=5) == [row[0] for row in everyone]
+
+
+@pytest.mark.asyncio
+async def test_filters(session):
+    cs, _, total = await get_user_directory(session, department_id="CS", limit=3, include_total=True)
+    assert total == 9 and len(cs) == 3
+    assert cs[0] == ("prof@example.com", None, "Dana", "Avraham", "professor", "CS")
+
+    math_staff, _, _ = await get_user_directory(session, role="secretary", department_id="MATH")
+    assert [row[0] for row in math_staff] == ["sec@example.com"]
+
+    assert len(await all_pages(session, name_prefix="levi", limit=2)) == 4
+    assert [row[0] for row in (await get_user_directory(session, name_prefix="Student1"))[0]] == [
+        "s01@example.com", "s10@example.com", "s11@example.com"
+    ]
+    # LIKE wildcards in the prefix are literal
+    assert [row[0] for row in (await get_user_directory(session, name_prefix="Ben_"))[0]] == ["sec@example.com"]
+    assert (await get_user_directory(session, name_prefix="%"))[0] == []
+
+
+@pytest.mark.asyncio
+async def test_bad_cursor_is_rejected(session):
+    for cursor in ("zzz", "WzEsIDJd"):  # Not base64 JSON; [1, 2]
+        with pytest.raises(ValueError):
+            await get_user_directory(session, cursor=cursor)
+
+
+@pytest_asyncio.fixture
+async def client(session):
+    app.dependency_overrides[get_session] = lambda: session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(get_session, None)
+
+
+@pytest.mark.asyncio
+async def test_directory_endpoint_never_reads_password_hashes(engine, client):
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+
+    response = await client.post("/Users/getUsers", json={"role": "student", "limit": 5, "include_total": True})
+    body = response.json()
+    assert len(body["items"]) == 5 and body["total"] == 12 and body["next_cursor"]
+    assert body["items"][0]["department_id"] == "CS"
+    assert not any("hashed_password" in statement for statement in statements)
+
+    second = await client.post("/Users/getUsers", json={"role": "student", "limit": 5, "cursor": body["next_cursor"]})
+    assert second.json()["total"] is None
+    assert not {u["email"] for u in body["items"]} & {u["email"] for u in second.json()["items"]}
+
+    assert (await client.post("/Users/getUsers", json={"limit": 0})).status_code == 400
+    assert (await client.post("/Users/getUsers", json={"cursor": "zzz"})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_users_list_pages_through_headers(client):
+    everyone = await client.get("/users?role=student")
+    assert len(everyone.json()) == 12 and "x-next-cursor" not in everyone.headers
+
+    first = await client.get("/users?role=student&limit=10&include_total=true")
+    assert len(first.json()) == 10 and first.headers["x-total-count"] == "12"
+    rest = await client.get(f"/users?role=student&limit=10&cursor={first.headers['x-next-cursor']}")
+    assert len(rest.json()) == 2 and "x-next-cursor" not in rest.headers
@@ -52,10 +52,34 @@ const NotificationBell = () => {
     }
   };
 
+  // The badge only needs the count, which is a single indexed query
+  const fetchUnreadCount = async () => {
+    try {
+      if (!getToken()) {
+        setUnreadCount(0);
+        return;
+      }
+      const response = await fetch(
+        "http://localhost:8000/notifications/unread_count",
+        {
+          headers: {
+            Authorization: `Bearer ${getToken()}`,
+          },
+        }
+      );
+      if (response.ok) {
+        const data = await response.json();
+        setUnreadCount(data.unread_count);
+      }
+    } catch (error) {
+      console.error("Error fetching unread notification count:", error);
+    }
+  };
+
   // Effect for initial fetch and polling
   useEffect(() => {
     fetchNotifications();
-    const interval = setInterval(fetchNotifications, 30000); // Poll every 30 seconds
+    const interval = setInterval(fetchUnreadCount, 30000); // Poll every 30 seconds
     return () => clearInterval(interval);
   }, []);
 
@@ -90,6 +114,7 @@ const NotificationBell = () => {
 
   const handleBellClick = (event) => {
     setAnchorEl(event.currentTarget);
+    fetchNotifications();
   };
 
   const handleMenuClose = () => {
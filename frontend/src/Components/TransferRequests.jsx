@@ -8,6 +8,7 @@ import "../CSS/TransferRequests.css";
 const TransferRequests = () => {
   const navigate = useNavigate();
   const [requests, setRequests] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [filteredRequests, setFilteredRequests] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -129,34 +130,26 @@ const TransferRequests = () => {
     };
   }, [navigate]);
 
-  const fetchRequests = async (userData) => {
+  // Pages come newest first; passing the previous page's cursor appends the next one
+  const fetchRequests = async (userData, cursor = null) => {
     try {
       const token = getToken();
-      let response;
-
-      if (userData.role === "admin") {
-        // Admin endpoint to get all requests
-        response = await axios.get(
-          `http://localhost:8000/admin/transfer-requests`,
-          {
-            headers: {
-              Authorization: `Bearer ${token}`,
-            },
-          }
-        );
-      } else {
-        // Secretary endpoint to get department-specific requests
-        response = await axios.get(
-          `http://localhost:8000/secretary/transfer-requests/${userData.user_email}`,
-          {
-            headers: {
-              Authorization: `Bearer ${token}`,
-            },
-          }
-        );
-      }
+      const url =
+        userData.role === "admin"
+          ? `http://localhost:8000/admin/transfer-requests` // Admin endpoint to get all requests
+          : `http://localhost:8000/secretary/transfer-requests/${userData.user_email}`; // Department-specific requests
+
+      const response = await axios.get(url, {
+        params: cursor ? { cursor } : {},
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      });
 
-      setRequests(response.data);
+      setRequests((prev) =>
+        cursor ? [...prev, ...response.data.items] : response.data.items
+      );
+      setNextCursor(response.data.next_cursor);
       setLoading(false);
     } catch (err) {
       console.error("Error fetching requests:", err);
@@ -448,6 +441,17 @@ const TransferRequests = () => {
         )}
       </div>
 
+      {nextCursor && (
+        <div className="load-more">
+          <button
+            className="transfer-button"
+            onClick={() => fetchRequests(user, nextCursor)}
+          >
+            <strong>Load More</strong>
+          </button>
+        </div>
+      )}
+
       {showTransferModal && (
         <div className="modal-overlay">
           <div className="modal-content">
@@ -2,22 +2,41 @@ import { useEffect, useState } from "react";
 import { Trash2 } from "lucide-react";
 import "../CSS/UsersList.css";
 
+const PAGE_SIZE = 50;
+const NO_FILTERS = { role: "", department_id: "", name_prefix: "" };
+
 export default function UsersList() {
     const [users, setUsers] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [total, setTotal] = useState(null);
+    const [filters, setFilters] = useState(NO_FILTERS);
+    // The filters of the list on screen; its cursor is only valid with these
+    const [appliedFilters, setAppliedFilters] = useState(NO_FILTERS);
     const [loading, setLoading] = useState(false);
     const [selectedUser, setSelectedUser] = useState(null);
     const [newRole, setNewRole] = useState("");
 
-    const fetchUsers = async () => {
+    // Without a cursor this starts over from the first page and asks for the total
+    const fetchUsers = async (cursor = null, query = appliedFilters) => {
         setLoading(true);
         try {
             const response = await fetch("http://localhost:8000/Users/getUsers", {
                 method: "POST",
-                headers: { "Content-Type": "application/json" }
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({
+                    role: query.role || null,
+                    department_id: query.department_id.trim() || null,
+                    name_prefix: query.name_prefix.trim() || null,
+                    limit: PAGE_SIZE,
+                    cursor,
+                    include_total: !cursor
+                })
             });
             if (!response.ok) throw new Error("Failed to fetch users");
             const data = await response.json();
-            setUsers(data);
+            setUsers(prev => cursor ? [...prev, ...data.items] : data.items);
+            setNextCursor(data.next_cursor);
+            if (!cursor) setTotal(data.total);
         } catch (error) {
             console.error("Error fetching users:", error);
         } finally {
@@ -64,6 +83,16 @@ export default function UsersList() {
         }
     };
 
+    const handleFilterChange = (e) => {
+        setFilters({ ...filters, [e.target.name]: e.target.value });
+    };
+
+    const handleSearch = (e) => {
+        e.preventDefault();
+        setAppliedFilters(filters);
+        fetchUsers(null, filters);
+    };
+
     useEffect(() => {
         fetchUsers();
     }, []);
@@ -71,9 +100,33 @@ export default function UsersList() {
     return (
         <div className="users-container">
             <h1 className="users-title"><strong>Users List</strong></h1>
-            <button onClick={fetchUsers} disabled={loading} className="refresh-button">
-                {loading ? "Loading..." : "Refresh Users"}
-            </button>
+            <form className="users-filters" onSubmit={handleSearch}>
+                <input
+                    name="name_prefix"
+                    value={filters.name_prefix}
+                    onChange={handleFilterChange}
+                    placeholder="Name or email starts with..."
+                />
+                <select name="role" value={filters.role} onChange={handleFilterChange}>
+                    <option value="">All roles</option>
+                    <option value="admin">Admin</option>
+                    <option value="professor">Professor</option>
+                    <option value="student">Student</option>
+                    <option value="secretary">Secretary</option>
+                </select>
+                <input
+                    name="department_id"
+                    value={filters.department_id}
+                    onChange={handleFilterChange}
+                    placeholder="Department"
+                />
+                <button type="submit" disabled={loading} className="refresh-button">
+                    {loading ? "Loading..." : "Search"}
+                </button>
+            </form>
+            {total !== null && (
+                <p className="users-count">Showing {users.length} of {total} users</p>
+            )}
             <table className="users-table">
                 <thead>
                 <tr>
@@ -81,6 +134,7 @@ export default function UsersList() {
                     <th>First Name</th>
                     <th>Last Name</th>
                     <th>Role</th>
+                    <th>Department</th>
                     <th>Actions</th>
                 </tr>
                 </thead>
@@ -92,6 +146,7 @@ export default function UsersList() {
                             <td>{user.first_name}</td>
                             <td>{user.last_name}</td>
                             <td>{user.role}</td>
+                            <td>{user.department_id || "-"}</td>
                             <td>
                                 <button
                                     className="delete-button"
@@ -105,11 +160,16 @@ export default function UsersList() {
                     ))
                 ) : (
                     <tr>
-                        <td colSpan={4} className="no-users">No users found</td>
+                        <td colSpan={6} className="no-users">No users found</td>
                     </tr>
                 )}
                 </tbody>
             </table>
+            {nextCursor && (
+                <button onClick={() => fetchUsers(nextCursor)} disabled={loading} className="refresh-button">
+                    {loading ? "Loading..." : "Load More"}
+                </button>
+            )}
 
             {selectedUser && (
                 <div className="popup">
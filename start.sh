@@ -1,5 +1,8 @@
 #!/bin/bash
 
+echo "Migrating database schema..."
+python -m backend.manage_db init || exit 1
+
 echo "Starting FastAPI Backend..."
 uvicorn backend.main:app --host 0.0.0.0 --port 8000 --reload &
 